@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hot paths, with regression tracking.
+
+Each benchmark times a callable several times and records the median,
+min and max seconds per call. Results are written as JSON and compared
+against a stored baseline; a benchmark whose median is slower than the
+baseline by more than the threshold is a regression (exit status 1).
+
+Usage:
+    python benchmark.py                     # run and compare
+    python benchmark.py --filter graph      # only matching benchmarks
+    python benchmark.py --threshold 0.5     # allow 50% slowdowns
+    python benchmark.py --update-baseline   # store results as the baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json"
+)
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below this many seconds per call are timer noise
+NOISE_FLOOR = 0.00002
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=7, number=1):
+    """Register a benchmark.
+
+    The decorated function does the setup and returns the callable to
+    time; it is called number times per measurement, repeat times.
+    """
+
+    def register(setup):
+        BENCHMARKS.append((name, setup, repeat, number))
+        return setup
+
+    return register
+
+
+@benchmark("parse_system_readings", repeat=7, number=2000)
+def bench_parse_system_readings():
+    from fake_hardware import NBFC_STATUS, SENSORS_OUTPUT
+    from src.app.system_utils import parse_nbfc_status, parse_sensors_power
+
+    state = {
+        "config": "GPD Win Mini 2024",
+        "temperature": 61.5,
+        "fan_speed": 42.0,
+        "power": 14.25,
+    }
+    nbfc_output, sensors_output = NBFC_STATUS, SENSORS_OUTPUT
+    for key, value in state.items():
+        nbfc_output = nbfc_output.replace("{" + key + "}", str(value))
+        sensors_output = sensors_output.replace("{" + key + "}", str(value))
+
+    def run():
+        parse_nbfc_status(nbfc_output)
+        parse_sensors_power(sensors_output)
+
+    return run
+
+
+def _graph_benchmark(points):
+    def setup():
+        from src.app.graphs import CombinedGraph
+
+        graph = CombinedGraph(max_points=points)
+        graph.time_points = list(range(points))
+        graph.sample_times = [time.time()] * points
+        graph.temperature_readings = [50.0 + i % 30 for i in range(points)]
+        graph.fanspeed_readings = [float(i % 100) for i in range(points)]
+        _keep.append(graph)
+
+        def run():
+            graph.update_data("65.0", "40.0")
+
+        return run
+
+    return setup
+
+
+# Widgets must outlive their setup function while being timed
+_keep = []
+
+benchmark("graph_update_data_60", number=20)(_graph_benchmark(60))
+benchmark("graph_update_data_3600", number=10)(_graph_benchmark(3600))
+benchmark("graph_update_data_86400", repeat=5, number=2)(_graph_benchmark(86400))
+
+
+@benchmark("gauge_paint", number=50)
+def bench_gauge_paint():
+    from PyQt6.QtGui import QPixmap
+    from src.app.gauge_widget import CircularGauge
+
+    gauge = CircularGauge(title="Watts")
+    gauge.resize(200, 200)
+    gauge.set_max_value(30)
+    gauge.set_value(17.5)
+    pixmap = QPixmap(gauge.size())
+    _keep.append(gauge)
+
+    def run():
+        gauge.render(pixmap)
+
+    return run
+
+
+def _profile_manager(count):
+    """A ProfileManager over count generated profiles in a scratch dir."""
+    from src.app.profile_manager import ProfileManager
+
+    directory = tempfile.mkdtemp(prefix="rmc-bench-")
+    profiles_dir = os.path.join(directory, "tdp_profiles")
+    os.makedirs(profiles_dir)
+    for i in range(count):
+        with open(os.path.join(profiles_dir, f"profile-{i:04d}.json"), "w") as f:
+            json.dump(
+                {
+                    "name": f"Profile {i}",
+                    "fast-limit": 25,
+                    "slow-limit": 15,
+                    "slow-time": 60,
+                    "tctl-temp": 95,
+                    "apu-skin-temp": 45,
+                    "max-performance": False,
+                    "power-saving": False,
+                },
+                f,
+            )
+    cwd = os.getcwd()
+    os.chdir(directory)  # ProfileManager looks for ./tdp_profiles first
+    try:
+        manager = ProfileManager()
+    finally:
+        os.chdir(cwd)
+    # The store keeps the relative path; pin it to the scratch directory
+    manager.profiles_directory = profiles_dir
+    manager.profile_store.directory = profiles_dir
+    return manager
+
+
+@benchmark("load_profiles_1000_cold", repeat=5)
+def bench_load_profiles_cold():
+    manager = _profile_manager(1000)
+
+    def run():
+        manager.profile_store.index = {}
+        manager.load_profiles()
+
+    return run
+
+
+@benchmark("load_profiles_1000_unchanged", repeat=7, number=5)
+def bench_load_profiles_unchanged():
+    manager = _profile_manager(1000)
+    return manager.load_profiles
+
+
+def _catalog_dir(count):
+    directory = tempfile.mkdtemp(prefix="rmc-bench-nbfc-")
+    for i in range(count):
+        with open(os.path.join(directory, f"Vendor Model {i:03d}.json"), "w") as f:
+            json.dump(
+                {
+                    "NotebookModel": f"Vendor Model {i:03d}",
+                    "EcPollInterval": 3000,
+                    "FanConfigurations": [
+                        {
+                            "ReadRegister": 122,
+                            "WriteRegister": 122,
+                            "TemperatureThresholds": [
+                                {"UpThreshold": t, "DownThreshold": t - 5, "FanSpeed": t}
+                                for t in range(40, 100, 10)
+                            ],
+                        }
+                    ],
+                },
+                f,
+            )
+    return directory
+
+
+@benchmark("nbfc_catalog_500_cold", repeat=5)
+def bench_catalog_cold():
+    from src.app.nbfc_catalog import NBFCCatalog
+
+    directory = _catalog_dir(500)
+
+    def run():
+        NBFCCatalog(config_dirs=[directory], cache_path=None)
+
+    return run
+
+
+@benchmark("nbfc_catalog_500_rescan", repeat=7, number=5)
+def bench_catalog_rescan():
+    from src.app.nbfc_catalog import NBFCCatalog
+
+    catalog = NBFCCatalog(config_dirs=[_catalog_dir(500)], cache_path=None)
+    return catalog.refresh
+
+
+@benchmark("apply_tdp_end_to_end", repeat=7)
+def bench_apply_end_to_end():
+    from fake_hardware import FakeHardware, wait_for
+    from src.app.system_utils import apply_tdp_settings
+
+    hardware = FakeHardware(tempfile.mkdtemp(prefix="rmc-bench-hw-"))
+    os.environ.update(hardware.environment())
+
+    def run():
+        done = []
+        apply_tdp_settings(
+            {"fast-limit": 25, "slow-limit": 15},
+            lambda success, message: done.append(success),
+        )
+        if not wait_for(lambda: done, timeout=10) or not done[0]:
+            raise RuntimeError("apply_tdp_settings did not succeed")
+
+    return run
+
+
+def run_benchmarks(name_filter=""):
+    """Run the registered benchmarks and return {name: stats}."""
+    results = {}
+    for name, setup, repeat, number in BENCHMARKS:
+        if name_filter not in name:
+            continue
+        run = setup()
+        run()  # Warm up caches and lazy imports
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                run()
+            timings.append((time.perf_counter() - start) / number)
+        results[name] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "repeat": repeat,
+            "number": number,
+        }
+        print(f"{name:32s} {results[name]['median_s'] * 1000:10.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare results with a baseline.
+
+    Returns:
+        List of (name, baseline median, result median) for benchmarks that
+        slowed down by more than threshold (a fraction, 0.25 = 25%)
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        before, after = reference["median_s"], result["median_s"]
+        if after > before * (1 + threshold) and after - before > NOISE_FLOOR:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = run_benchmarks(args.filter)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(
+            f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms "
+            f"(+{(after / before - 1) * 100:.0f}%)"
+        )
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from fake_hardware import FakeHardware, wait_for
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The QApplication for tests that need Qt objects or an event loop."""
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    yield app
+
+
+@pytest.fixture
+def fake_hardware(tmp_path, monkeypatch, qapp):
+    """A FakeHardware whose commands are first on PATH.
+
+    The shared NBFC catalog is pointed at the fake config directory, and
+    every telemetry source starts out with unknown health.
+    """
+    from src.app import nbfc_catalog, system_utils
+    from src.app.source_health import SourceHealth
+
+    hardware = FakeHardware(tmp_path)
+    for name, value in hardware.environment().items():
+        monkeypatch.setenv(name, value)
+    catalog = nbfc_catalog.NBFCCatalog(
+        config_dirs=[hardware.nbfc_configs_dir], cache_path=None
+    )
+    monkeypatch.setattr(nbfc_catalog, "_catalog", catalog)
+    for name, health in system_utils.source_health.items():
+        monkeypatch.setitem(
+            system_utils.source_health,
+            name,
+            SourceHealth(name, probe=health.probe),
+        )
+    yield hardware
+    # Config loads still running on the thread pool would otherwise signal
+    # through objects freed along with the catalog
+    wait_for(lambda: not catalog.pending_loads)
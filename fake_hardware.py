@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-ins for the hardware and tools the app drives.
+
+FakeHardware installs fake `nbfc`, `ryzenadj`, `sensors` and a
+pass-through `pkexec` into a bin directory to put first on PATH, and
+builds a fake /sys (hwmon, powercap, power_supply, dmi, cpufreq) and
+/proc/stat tree. Every fake command logs its arguments and follows
+scripted rules: output, exit code, latency, or hanging forever. Tests
+get it through the fake_hardware fixture in conftest.py.
+"""
+
+import json
+import os
+import stat
+import sys
+import time
+
+COMMANDS = ("nbfc", "ryzenadj", "sensors", "pkexec")
+
+# Run by every fake command; NAME and HARNESS are filled in on install
+COMMAND_TEMPLATE = '''#!{python}
+import json, os, sys, time
+
+NAME = {name!r}
+HARNESS = {harness!r}
+
+
+def main():
+    args = sys.argv[1:]
+    with open(os.path.join(HARNESS, "calls.jsonl"), "a") as f:
+        f.write(json.dumps({{"command": NAME, "args": args}}) + "\\n")
+    with open(os.path.join(HARNESS, "scripts.json")) as f:
+        rules = json.load(f).get(NAME, [])
+    with open(os.path.join(HARNESS, "state.json")) as f:
+        state = json.load(f)
+
+    rule = {{}}
+    for candidate in rules:
+        if args[: len(candidate["args"])] == candidate["args"]:
+            rule = candidate
+            break
+
+    time.sleep(rule.get("latency", 0))
+    if rule.get("hang"):
+        while True:
+            time.sleep(3600)
+
+    key = rule.get("store_arg")
+    if key:
+        state[key] = args[len(rule["args"])]
+        with open(os.path.join(HARNESS, "state.json"), "w") as f:
+            json.dump(state, f)
+
+    if rule.get("exec"):
+        os.execvp(args[0], args)
+
+    output = rule.get("stdout", "")
+    for key, value in state.items():
+        output = output.replace("{{" + key + "}}", str(value))
+    sys.stdout.write(output)
+    sys.stderr.write(rule.get("stderr", ""))
+    sys.exit(rule.get("exit_code", 0))
+
+
+main()
+'''
+
+NBFC_STATUS = """Service enabled               : true
+Selected Config Name          : {config}
+Temperature                   : {temperature}
+
+Fan Display Name              : Fan
+Auto Control Enabled          : true
+Current Fan Speed             : {fan_speed}
+Target Fan Speed              : {fan_speed}
+"""
+
+SENSORS_OUTPUT = """k10temp-pci-00c3
+Adapter: PCI adapter
+Tctl:         +{temperature}°C
+
+amdgpu-pci-0400
+Adapter: PCI adapter
+PPT:          {power} W
+power1:       {power} W
+"""
+
+DEFAULT_RULES = {
+    "nbfc": [
+        {"args": ["status", "-a"], "stdout": NBFC_STATUS},
+        {"args": ["status"], "stdout": NBFC_STATUS},
+        {"args": ["config", "-s"], "store_arg": "config"},
+        {"args": ["config", "-a"], "store_arg": "config"},
+        {"args": ["config", "-r"], "stdout": "{config}\n"},
+        {"args": ["--version"], "stdout": "nbfc 0.2.0\n"},
+        {"args": [], "stdout": ""},
+    ],
+    "ryzenadj": [{"args": [], "stdout": "Sucessfully set the limits\n"}],
+    "sensors": [{"args": [], "stdout": SENSORS_OUTPUT}],
+    # Authorization always succeeds and runs the command as-is
+    "pkexec": [{"args": [], "exec": True}],
+}
+
+
+def _write(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+class FakeHardware:
+    """A fake machine rooted in a scratch directory.
+
+    Attributes:
+        bin_dir: Directory with the fake commands, to prepend to PATH
+        sysfs_root: Root of the fake /sys tree
+        proc_root: Root of the fake /proc tree
+        nbfc_configs_dir: Directory holding fake NBFC model configs
+    """
+
+    def __init__(self, root, cores=4):
+        self.root = str(root)
+        self.harness_dir = os.path.join(self.root, "harness")
+        self.bin_dir = os.path.join(self.root, "bin")
+        self.sysfs_root = os.path.join(self.root, "sys")
+        self.proc_root = os.path.join(self.root, "proc")
+        self.nbfc_configs_dir = os.path.join(self.root, "nbfc", "configs")
+        for directory in (
+            self.harness_dir,
+            self.bin_dir,
+            self.proc_root,
+            self.nbfc_configs_dir,
+        ):
+            os.makedirs(directory, exist_ok=True)
+
+        self.rules = {name: list(rules) for name, rules in DEFAULT_RULES.items()}
+        self._save_rules()
+        self.state = {}
+        self.set_state(
+            config="GPD Win Mini 2024", temperature=55.0, fan_speed=30.0, power=12.5
+        )
+        open(os.path.join(self.harness_dir, "calls.jsonl"), "w").close()
+        for name in COMMANDS:
+            self._install(name)
+
+        self.cores = cores
+        self._jiffies = [[0] * 8 for _ in range(cores)]
+        self._build_sysfs()
+
+    def _install(self, name):
+        path = os.path.join(self.bin_dir, name)
+        with open(path, "w") as f:
+            f.write(
+                COMMAND_TEMPLATE.format(
+                    python=sys.executable, name=name, harness=self.harness_dir
+                )
+            )
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    def _save_rules(self):
+        with open(os.path.join(self.harness_dir, "scripts.json"), "w") as f:
+            json.dump(self.rules, f)
+
+    # --- Commands -------------------------------------------------------
+
+    def script(
+        self,
+        command,
+        args=(),
+        stdout="",
+        stderr="",
+        exit_code=0,
+        latency=0.0,
+        hang=False,
+    ):
+        """Make command behave as given when its arguments start with args.
+
+        The newest rule wins over older and default ones. stdout may use
+        {config}, {temperature}, {fan_speed} and {power} placeholders.
+        """
+        self.rules[command].insert(
+            0,
+            {
+                "args": list(args),
+                "stdout": stdout,
+                "stderr": stderr,
+                "exit_code": exit_code,
+                "latency": latency,
+                "hang": hang,
+            },
+        )
+        self._save_rules()
+
+    def delay(self, command, latency, args=()):
+        """Add latency to a command while keeping its default behaviour."""
+        for rule in self.rules[command]:
+            if rule["args"][: len(args)] == list(args):
+                rule["latency"] = latency
+        self._save_rules()
+
+    def deny_authorization(self):
+        """Make pkexec behave like a dismissed authentication dialog."""
+        self.script(
+            "pkexec",
+            stderr="Error executing command as another user: Not authorized\n",
+            exit_code=126,
+        )
+
+    def calls(self, command=None):
+        """Return the argument lists the fake commands were called with."""
+        with open(os.path.join(self.harness_dir, "calls.jsonl")) as f:
+            calls = [json.loads(line) for line in f if line.strip()]
+        return [
+            call["args"]
+            for call in calls
+            if command is None or call["command"] == command
+        ]
+
+    def set_state(self, **values):
+        """Update the values reported by nbfc and sensors."""
+        self.state.update(values)
+        with open(os.path.join(self.harness_dir, "state.json"), "w") as f:
+            json.dump(self.state, f)
+
+    def read_state(self):
+        """Return the state, including changes made by fake commands."""
+        with open(os.path.join(self.harness_dir, "state.json")) as f:
+            self.state = json.load(f)
+        return dict(self.state)
+
+    def environment(self):
+        """Environment variables that route the app to the fakes."""
+        return {"PATH": f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+    # --- sysfs and procfs -----------------------------------------------
+
+    def _sys(self, *parts):
+        return os.path.join(self.sysfs_root, *parts)
+
+    def _build_sysfs(self):
+        _write(self._sys("class/hwmon/hwmon0/name"), "k10temp")
+        _write(self._sys("class/hwmon/hwmon1/name"), "amdgpu")
+        _write(self._sys("class/powercap/intel-rapl:0/name"), "package-0")
+        _write(self._sys("class/powercap/intel-rapl:0/energy_uj"), 0)
+        _write(
+            self._sys("class/powercap/intel-rapl:0/max_energy_range_uj"),
+            65532610987,
+        )
+        _write(self._sys("class/power_supply/ADP1/type"), "Mains")
+        _write(self._sys("class/power_supply/BAT0/type"), "Battery")
+        self.set_temperature(self.state["temperature"])
+        self.set_package_power(self.state["power"])
+        self.set_ac_online(True)
+        self.set_battery("Full", energy_wh=50.0, power_w=0.0, energy_full_wh=50.0)
+        self.set_dmi("GPD", "G1617-01", "G1617-01")
+        for cpu in range(self.cores):
+            cpufreq = self._sys(f"devices/system/cpu/cpu{cpu}/cpufreq")
+            _write(os.path.join(cpufreq, "cpuinfo_max_freq"), 5100000)
+            _write(os.path.join(cpufreq, "scaling_cur_freq"), 1600000)
+        self._write_proc_stat()
+
+    def set_temperature(self, celsius):
+        _write(self._sys("class/hwmon/hwmon0/temp1_input"), int(celsius * 1000))
+        self.set_state(temperature=celsius)
+
+    def set_package_power(self, watts):
+        _write(
+            self._sys("class/hwmon/hwmon1/power1_average"), int(watts * 1000000)
+        )
+        self.set_state(power=watts)
+
+    def add_package_energy(self, joules):
+        """Advance the RAPL package energy counter."""
+        path = self._sys("class/powercap/intel-rapl:0/energy_uj")
+        with open(path) as f:
+            energy = int(f.read())
+        _write(path, energy + int(joules * 1000000))
+
+    def set_ac_online(self, online):
+        _write(self._sys("class/power_supply/ADP1/online"), int(bool(online)))
+
+    def set_battery(self, status, energy_wh, power_w, energy_full_wh=50.0):
+        battery = self._sys("class/power_supply/BAT0")
+        _write(os.path.join(battery, "status"), status)
+        _write(os.path.join(battery, "energy_now"), int(energy_wh * 1000000))
+        _write(os.path.join(battery, "energy_full"), int(energy_full_wh * 1000000))
+        _write(os.path.join(battery, "power_now"), int(power_w * 1000000))
+
+    def set_dmi(self, vendor, product, board):
+        for key, value in (
+            ("sys_vendor", vendor),
+            ("product_name", product),
+            ("board_name", board),
+        ):
+            _write(self._sys("class/dmi/id", key), value)
+
+    def set_core_frequencies(self, mhz):
+        """Set each core's scaling_cur_freq (one value per core, in MHz)."""
+        for cpu, value in enumerate(mhz):
+            _write(
+                self._sys(f"devices/system/cpu/cpu{cpu}/cpufreq/scaling_cur_freq"),
+                int(value * 1000),
+            )
+
+    def run_cores(self, busy, idle):
+        """Advance /proc/stat by per-core busy and idle jiffies."""
+        for cpu in range(self.cores):
+            self._jiffies[cpu][0] += busy[cpu]  # user
+            self._jiffies[cpu][3] += idle[cpu]  # idle
+        self._write_proc_stat()
+
+    def _write_proc_stat(self):
+        totals = [sum(column) for column in zip(*self._jiffies)]
+        lines = ["cpu  " + " ".join(map(str, totals)) + " 0 0"]
+        for cpu, jiffies in enumerate(self._jiffies):
+            lines.append(f"cpu{cpu} " + " ".join(map(str, jiffies)) + " 0 0")
+        lines.append("intr 0")
+        lines.append("ctxt 0")
+        _write(os.path.join(self.proc_root, "stat"), "\n".join(lines))
+
+    def add_nbfc_config(self, name, config=None):
+        """Install an NBFC model config, returning its path."""
+        config = config or {
+            "NotebookModel": name,
+            "FanConfigurations": [
+                {
+                    "TemperatureThresholds": [
+                        {"UpThreshold": 60, "DownThreshold": 0, "FanSpeed": 0},
+                        {"UpThreshold": 80, "DownThreshold": 55, "FanSpeed": 100},
+                    ]
+                }
+            ],
+        }
+        path = os.path.join(self.nbfc_configs_dir, f"{name}.json")
+        with open(path, "w") as f:
+            json.dump(config, f)
+        return path
+
+
+def wait_for(predicate, timeout=5.0):
+    """Run the Qt event loop until predicate() is true or timeout passes.
+
+    Returns:
+        The final value of predicate()
+    """
+    from PyQt6.QtCore import QCoreApplication
+
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return predicate()
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+    return True
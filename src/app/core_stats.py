@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+
+
+class CoreStatsSource:
+    """Per-core utilization and clock speed, read in one pass.
+
+    /proc/stat is re-read through a file kept open and parsed into one
+    integer array for all cores, so utilization is a vectorized difference
+    of busy and total jiffies against the previous read. Each core's
+    scaling_cur_freq is read with a single pread() on a descriptor opened
+    once.
+    """
+
+    def __init__(self, proc_root="/proc", sysfs_root="/sys"):
+        self.proc_root = proc_root
+        self.sysfs_root = sysfs_root
+        self.stat_file = open(os.path.join(proc_root, "stat"), "rb")
+        self.cpu_ids = None
+        self.freq_fds = []
+        self.max_freq = None
+        self.previous = None  # (busy, total) jiffies of the last read
+
+    def _read_stat(self):
+        """Return (cpu ids, jiffies array of shape (cores, 8))."""
+        self.stat_file.seek(0)
+        ids, rows = [], []
+        for line in self.stat_file.read().splitlines():
+            if line.startswith(b"cpu") and line[3:4].isdigit():
+                fields = line.split()
+                ids.append(int(fields[0][3:]))
+                # user nice system idle iowait irq softirq steal
+                rows.append(fields[1:9])
+        return ids, np.array(rows, dtype=np.int64)
+
+    def _open_frequencies(self):
+        """(Re)open the cpufreq files for the current set of cores."""
+        self.close_frequencies()
+        max_freq = []
+        for cpu in self.cpu_ids:
+            cpufreq = os.path.join(
+                self.sysfs_root, f"devices/system/cpu/cpu{cpu}/cpufreq"
+            )
+            try:
+                self.freq_fds.append(
+                    os.open(os.path.join(cpufreq, "scaling_cur_freq"), os.O_RDONLY)
+                )
+                with open(os.path.join(cpufreq, "cpuinfo_max_freq")) as f:
+                    max_freq.append(int(f.read()))
+            except (OSError, ValueError):
+                self.freq_fds.append(None)
+                max_freq.append(0)
+        self.max_freq = np.array(max_freq, dtype=np.float64) / 1000.0
+
+    def _read_frequencies(self):
+        """Return current clocks in MHz (NaN where unavailable)."""
+        freq = np.full(len(self.freq_fds), np.nan)
+        for i, fd in enumerate(self.freq_fds):
+            if fd is None:
+                continue
+            try:
+                freq[i] = int(os.pread(fd, 32, 0)) / 1000.0
+            except (OSError, ValueError):
+                pass
+        return freq
+
+    def read(self):
+        """Sample all cores.
+
+        Returns:
+            Dict with "cpus" (ids), "utilization" (0..1, None on the first
+            read), "frequency" (MHz) and "max_frequency" (MHz) arrays
+        """
+        ids, jiffies = self._read_stat()
+        if ids != self.cpu_ids:
+            # First read or cores went on/offline
+            self.cpu_ids = ids
+            self.previous = None
+            self._open_frequencies()
+
+        idle = jiffies[:, 3] + jiffies[:, 4]
+        total = jiffies.sum(axis=1)
+        busy = total - idle
+
+        utilization = None
+        if self.previous is not None:
+            delta_total = total - self.previous[1]
+            utilization = np.divide(
+                busy - self.previous[0],
+                delta_total,
+                out=np.zeros(len(ids)),
+                where=delta_total > 0,
+            )
+        self.previous = (busy, total)
+
+        return {
+            "cpus": ids,
+            "utilization": utilization,
+            "frequency": self._read_frequencies(),
+            "max_frequency": self.max_freq,
+        }
+
+    def close_frequencies(self):
+        for fd in self.freq_fds:
+            if fd is not None:
+                os.close(fd)
+        self.freq_fds = []
+
+    def close(self):
+        self.close_frequencies()
+        self.stat_file.close()
@@ -0,0 +1,128 @@
+"""Leveled, rate-limited diagnostics kept in an in-memory ring buffer.
+
+Every message carries a key naming its call site or condition (for
+example "nbfc.missing"). A key is emitted at most once per interval;
+repeats in between are only counted, and the next emitted entry says how
+many were suppressed. Emitted entries go into a ring buffer that the
+settings dialog shows and exports, and those at or above the console
+level are also printed.
+"""
+
+import collections
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+RING_SIZE = 1000
+DEFAULT_INTERVAL = 60.0
+
+
+class Diagnostics:
+    def __init__(
+        self,
+        capacity=RING_SIZE,
+        interval=DEFAULT_INTERVAL,
+        console_level=INFO,
+        clock=time.monotonic,
+    ):
+        # (wall time, level, key, message, repeats suppressed before it)
+        self.entries = collections.deque(maxlen=capacity)
+        self.interval = interval
+        self.console_level = console_level
+        self.clock = clock
+        self.keys = {}  # Key -> [occurrences, last emitted at, suppressed]
+
+    def log(self, level, key, message):
+        """Record a message; returns False if it was rate limited."""
+        now = self.clock()
+        state = self.keys.get(key)
+        if state is None:
+            state = self.keys[key] = [0, None, 0]
+        state[0] += 1
+        if state[1] is not None and now - state[1] < self.interval:
+            state[2] += 1
+            return False
+
+        entry = (time.time(), level, key, message, state[2])
+        state[1] = now
+        state[2] = 0
+        self.entries.append(entry)
+        if level >= self.console_level:
+            print(format_entry(entry))
+        return True
+
+    def counters(self):
+        """Return {key: total occurrences, including suppressed ones}."""
+        return {key: state[0] for key, state in self.keys.items()}
+
+    def export(self, path):
+        """Write the buffered entries and the counters as plain text."""
+        with open(path, "w") as f:
+            for entry in self.entries:
+                f.write(format_entry(entry) + "\n")
+            f.write("\nOccurrences by key:\n")
+            for key, count in sorted(self.counters().items()):
+                f.write(f"{count:8d}  {key}\n")
+
+
+def format_entry(entry):
+    timestamp, level, key, message, suppressed = entry
+    text = (
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} "
+        f"{LEVEL_NAMES.get(level, level)} [{key}] {message}"
+    )
+    if suppressed:
+        text += f" (repeated {suppressed} more times since last shown)"
+    return text
+
+
+class Backoff:
+    """Exponentially growing retry delay for a source that keeps failing.
+
+    ready() is true until the first failure; after n consecutive failures
+    the next attempt waits initial * 2^(n-1) seconds, capped at maximum.
+    """
+
+    def __init__(self, initial=5.0, maximum=300.0, clock=time.monotonic):
+        self.initial = initial
+        self.maximum = maximum
+        self.clock = clock
+        self.failures = 0
+        self.retry_at = None
+
+    def ready(self):
+        return self.retry_at is None or self.clock() >= self.retry_at
+
+    def failed(self):
+        """Record a failure and return the delay before the next attempt."""
+        self.failures += 1
+        delay = min(self.maximum, self.initial * 2 ** (self.failures - 1))
+        self.retry_at = self.clock() + delay
+        return delay
+
+    def succeeded(self):
+        self.failures = 0
+        self.retry_at = None
+
+
+diagnostics = Diagnostics()
+
+
+def debug(key, message):
+    return diagnostics.log(DEBUG, key, message)
+
+
+def info(key, message):
+    return diagnostics.log(INFO, key, message)
+
+
+def warning(key, message):
+    return diagnostics.log(WARNING, key, message)
+
+
+def error(key, message):
+    return diagnostics.log(ERROR, key, message)
@@ -0,0 +1,283 @@
+import glob
+import json
+import math
+import os
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.app import session_recording
+from src.app.sampler import read_sysfs_number
+from src.app.settings_store import get_settings
+
+
+# Sampling interval requested from the sampler for energy accounting
+ENERGY_INTERVAL_MS = 2000
+
+# Samples closer than this to the last one handled are skipped, so faster
+# sampling for the graph does not re-read the battery every time; the
+# slack keeps timer jitter from skipping the requested samples
+MIN_SAMPLE_SPACING = ENERGY_INTERVAL_MS / 1000 * 0.9
+
+# Samples further apart than this (suspend, stalls) are not integrated
+MAX_SAMPLE_GAP = 30.0
+
+# Time constant of the discharge power average behind the runtime estimate
+RUNTIME_TIME_CONSTANT = 60.0
+
+# How often the per-profile totals are handed to the settings store
+SAVE_INTERVAL = 60.0
+
+
+def read_battery(sysfs_root="/sys"):
+    """Read the first battery's state from /sys/class/power_supply.
+
+    Batteries reporting charge (µAh/µA) instead of energy (µWh/µW) are
+    converted with voltage_now.
+
+    Returns:
+        Dict with status, energy_wh, energy_full_wh and power_w (None when
+        not reported), or None if there is no battery
+    """
+    pattern = os.path.join(sysfs_root, "class/power_supply/*")
+    for supply in sorted(glob.glob(pattern)):
+        supply_type = session_recording.read_text(os.path.join(supply, "type"))
+        if supply_type is None or supply_type.strip() != "Battery":
+            continue
+        status = session_recording.read_text(os.path.join(supply, "status"))
+        if status is None:
+            continue
+        status = status.strip()
+
+        def attribute(name):
+            return read_sysfs_number(os.path.join(supply, name), 1000000.0)
+
+        energy = attribute("energy_now")
+        energy_full = attribute("energy_full")
+        power = attribute("power_now")
+        if energy is None:
+            voltage = attribute("voltage_now")
+            charge = attribute("charge_now")
+            if voltage is not None and charge is not None:
+                energy = charge * voltage
+                charge_full = attribute("charge_full")
+                if charge_full is not None:
+                    energy_full = charge_full * voltage
+                current = attribute("current_now")
+                if power is None and current is not None:
+                    power = current * voltage
+        return {
+            "status": status,
+            "energy_wh": energy,
+            "energy_full_wh": energy_full,
+            "power_w": abs(power) if power is not None else None,
+        }
+    return None
+
+
+class EnergyAccountant:
+    """Integrate power over time and attribute the energy to profiles.
+
+    Each sample closes the interval since the previous one, which is
+    charged to the profile that was active during it (trapezoidal rule).
+    Package energy comes from the APU power sensor; battery energy is only
+    counted while discharging and covers the whole system.
+    """
+
+    def __init__(self, stats=None, max_gap=MAX_SAMPLE_GAP):
+        self.stats = stats or {}  # Profile name -> totals, see _totals()
+        self.max_gap = max_gap
+        self.last = None  # (time, profile, package W, battery W or None)
+
+    def _totals(self, profile):
+        return self.stats.setdefault(
+            profile,
+            {
+                "seconds": 0.0,
+                "package_wh": 0.0,
+                "battery_seconds": 0.0,
+                "battery_wh": 0.0,
+            },
+        )
+
+    def add(self, now, profile, package_power, battery_power=None):
+        """Record a sample.
+
+        Args:
+            now: Monotonic time in seconds
+            profile: Name of the profile active since the previous sample
+            package_power: APU package power in W, or None if unknown
+            battery_power: Battery discharge power in W, None when not
+                discharging or unknown
+        """
+        if self.last is not None:
+            last_time, last_profile, last_package, last_battery = self.last
+            dt = now - last_time
+            if 0 < dt <= self.max_gap:
+                totals = self._totals(last_profile)
+                if package_power is not None and last_package is not None:
+                    totals["seconds"] += dt
+                    totals["package_wh"] += (
+                        (package_power + last_package) / 2 * dt / 3600
+                    )
+                if battery_power is not None and last_battery is not None:
+                    totals["battery_seconds"] += dt
+                    totals["battery_wh"] += (
+                        (battery_power + last_battery) / 2 * dt / 3600
+                    )
+        self.last = (now, profile, package_power, battery_power)
+
+    def summary(self):
+        """Return {profile: {"package_wh", "package_avg_w", "battery_wh",
+        "battery_avg_w", "hours"}}, averages None without data."""
+        result = {}
+        for profile, totals in self.stats.items():
+            result[profile] = {
+                "package_wh": totals["package_wh"],
+                "package_avg_w": (
+                    totals["package_wh"] * 3600 / totals["seconds"]
+                    if totals["seconds"]
+                    else None
+                ),
+                "battery_wh": totals["battery_wh"],
+                "battery_avg_w": (
+                    totals["battery_wh"] * 3600 / totals["battery_seconds"]
+                    if totals["battery_seconds"]
+                    else None
+                ),
+                "hours": totals["seconds"] / 3600,
+            }
+        return result
+
+
+class RuntimeEstimator:
+    """Estimate remaining battery runtime from a smoothed discharge rate.
+
+    The discharge power is an exponentially weighted average with a time
+    constant in seconds, updated per sample in constant time. Batteries
+    that do not report power_now are followed through the drop in
+    energy_now instead.
+    """
+
+    def __init__(self, time_constant=RUNTIME_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.reset()
+
+    def reset(self):
+        self.average_power = None
+        self.power_time = None
+        self.reference = None  # (time, energy) to measure energy drops from
+
+    def update(self, now, energy_wh, power_w=None):
+        """Add a discharging sample and return the runtime in hours, or None."""
+        if power_w is None and energy_wh is not None:
+            if self.reference is None:
+                self.reference = (now, energy_wh)
+            elif energy_wh < self.reference[1]:
+                # energy_now only changes every few seconds to minutes
+                since, energy = self.reference
+                power_w = (energy - energy_wh) * 3600 / (now - since)
+                self.reference = (now, energy_wh)
+
+        if power_w is not None and power_w > 0:
+            dt = None if self.power_time is None else now - self.power_time
+            if self.average_power is None or dt is None:
+                self.average_power = power_w
+            else:
+                alpha = 1 - math.exp(-dt / self.time_constant)
+                self.average_power += alpha * (power_w - self.average_power)
+            self.power_time = now
+
+        if energy_wh is None or not self.average_power:
+            return None
+        return energy_wh / self.average_power
+
+
+def format_hours(hours):
+    """Format a duration in hours as e.g. "2h 05m"."""
+    minutes = int(round(hours * 60))
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class EnergyMonitor(QObject):
+    """Feed sampler readings and battery state into the energy estimators.
+
+    Emits updated with a dict holding "battery" (see read_battery, or
+    None), "runtime_hours" (None unless discharging) and "profiles"
+    (EnergyAccountant.summary()). Per-profile totals persist in QSettings.
+    """
+
+    updated = pyqtSignal(dict)
+
+    def __init__(self, sampler, profile_name, parent=None, sysfs_root="/sys"):
+        """
+        Args:
+            sampler: Sampler providing package power
+            profile_name: Function returning the active profile's name
+        """
+        super().__init__(parent)
+        self.sampler = sampler
+        self.profile_name = profile_name
+        self.sysfs_root = sysfs_root
+        self.settings = get_settings()
+
+        try:
+            stats = json.loads(
+                self.settings.value("energy/profile_stats", "{}", type=str)
+            )
+        except ValueError:
+            stats = {}
+        self.accountant = EnergyAccountant(stats)
+        self.estimator = RuntimeEstimator()
+        self.saved_at = None
+        self.handled_at = None
+        self.stopped = False
+
+        self.sampler.sample_ready.connect(self.on_sample)
+        self.sampler.request_interval(self, ENERGY_INTERVAL_MS)
+
+    def on_sample(self, sample):
+        now = sample["monotonic"]
+        if self.handled_at is not None and now - self.handled_at < MIN_SAMPLE_SPACING:
+            return
+        self.handled_at = now
+        battery = read_battery(self.sysfs_root)
+        discharging = battery is not None and battery["status"] == "Discharging"
+
+        battery_power = battery["power_w"] if discharging else None
+        self.accountant.add(
+            now, self.profile_name(), sample.get("power"), battery_power
+        )
+
+        runtime = None
+        if discharging:
+            runtime = self.estimator.update(
+                now, battery["energy_wh"], battery["power_w"]
+            )
+        else:
+            self.estimator.reset()
+
+        if self.saved_at is None or now - self.saved_at >= SAVE_INTERVAL:
+            self.save()
+            self.saved_at = now
+
+        self.updated.emit(
+            {
+                "battery": battery,
+                "runtime_hours": runtime,
+                "profiles": self.accountant.summary(),
+            }
+        )
+
+    def save(self):
+        self.settings.set_value(
+            "energy/profile_stats", json.dumps(self.accountant.stats)
+        )
+
+    def stop(self):
+        """Stop accounting and save the totals; safe to call twice."""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.sampler.sample_ready.disconnect(self.on_sample)
+        self.sampler.release(self)
+        self.save()
@@ -0,0 +1,188 @@
+import csv
+from datetime import datetime
+
+import numpy as np
+
+# Samples evaluated per pass; bounds the relays x samples working arrays
+CHUNK_SAMPLES = 4096
+
+
+def thresholds_from_points(points):
+    """Build NBFC TemperatureThresholds entries from sorted curve points.
+
+    Each point becomes an UpThreshold at its temperature. The DownThreshold
+    sits one degree above the previous point (or 5 degrees below the first
+    point), which gives NBFC some hysteresis between neighbouring speeds.
+    """
+    thresholds = []
+    if points:
+        t_0, s_0 = points[0]
+        thresholds.append(
+            {
+                "UpThreshold": int(t_0),
+                "DownThreshold": int(max(0, t_0 - 5)),
+                "FanSpeed": float(s_0),
+            }
+        )
+        for i in range(1, len(points)):
+            t_curr, s_curr = points[i]
+            t_prev, _ = points[i - 1]
+            down_thresh = min(int(t_prev + 1), int(t_curr))
+            down_thresh = max(0, down_thresh)
+            thresholds.append(
+                {
+                    "UpThreshold": int(t_curr),
+                    "DownThreshold": down_thresh,
+                    "FanSpeed": float(s_curr),
+                }
+            )
+    return thresholds
+
+
+def simulate_fan_curve(timestamps, temperatures, thresholds, chunk_size=CHUNK_SAMPLES):
+    """Replay a temperature trace through NBFC threshold hysteresis.
+
+    NBFC steps up to threshold k once the temperature reaches its
+    UpThreshold and steps back down once it falls to its DownThreshold.
+    With monotonic thresholds that is the same as one on/off relay per
+    threshold above the first, so the active level is the number of relays
+    switched on. Each relay is evaluated a chunk of samples at a time by
+    forward-filling the last sample that decided its state; samples before
+    the first deciding one keep the state the previous chunk ended in.
+
+    Args:
+        timestamps: Sample times in seconds (any monotonic origin)
+        temperatures: Temperatures in °C, same length as timestamps
+        thresholds: List of dicts with UpThreshold/DownThreshold/FanSpeed
+        chunk_size: Samples per pass, to bound memory on long traces
+
+    Returns:
+        Dict with "fan_speeds" (array, %), "speed_changes" (int),
+        "time_at_or_above" (list of (speed, seconds)) and "duration".
+    """
+    times = np.asarray(timestamps, dtype=float)
+    temps = np.asarray(temperatures, dtype=float)
+    n = temps.size
+    if n == 0 or not thresholds:
+        return {
+            "fan_speeds": np.zeros(n),
+            "speed_changes": 0,
+            "time_at_or_above": [],
+            "duration": 0.0,
+        }
+
+    ups = np.array([t["UpThreshold"] for t in thresholds], dtype=float)
+    downs = np.array([t["DownThreshold"] for t in thresholds], dtype=float)
+    speeds = np.array([t["FanSpeed"] for t in thresholds], dtype=float)
+
+    levels = np.zeros(n, dtype=int)
+    if ups.size > 1:
+        state = np.zeros(ups.size - 1, dtype=bool)  # Relays start off
+        for start in range(0, n, chunk_size):
+            chunk = temps[None, start : start + chunk_size]
+            switch_on = chunk >= ups[1:, None]
+            decided = switch_on | (chunk <= downs[1:, None])
+            last_decided = np.where(decided, np.arange(chunk.shape[1]), -1)
+            np.maximum.accumulate(last_decided, axis=1, out=last_decided)
+            relay_on = np.take_along_axis(
+                switch_on, np.maximum(last_decided, 0), axis=1
+            )
+            relay_on = np.where(last_decided >= 0, relay_on, state[:, None])
+            state = relay_on[:, -1]
+            levels[start : start + chunk_size] = relay_on.sum(axis=0)
+
+    fan_speeds = speeds[levels]
+
+    # Each sample holds until the next one; the last holds for a typical step
+    if n > 1:
+        steps = np.diff(times)
+        durations = np.append(steps, np.median(steps))
+    else:
+        durations = np.ones(1)
+    durations = np.clip(durations, 0, None)
+
+    time_at_or_above = [
+        (float(speed), float(durations[fan_speeds >= speed].sum()))
+        for speed in np.unique(speeds)
+    ]
+
+    return {
+        "fan_speeds": fan_speeds,
+        "speed_changes": int(np.count_nonzero(np.diff(fan_speeds))),
+        "time_at_or_above": time_at_or_above,
+        "duration": float(durations.sum()),
+    }
+
+
+def _parse_time(value):
+    """Parse a CSV time cell as epoch seconds or an ISO 8601 timestamp."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.strip()).timestamp()
+
+
+def load_temperature_csv(path):
+    """Load a temperature trace from a CSV file.
+
+    The file may have a header naming a time column ("timestamp"/"time")
+    and a temperature column ("temperature"/"temp"). Without a header a
+    single column is read as temperatures sampled once per second, and two
+    columns as time, temperature.
+
+    Returns:
+        Tuple of (timestamps, temperatures) as float arrays
+    """
+    with open(path, newline="") as f:
+        rows = [row for row in csv.reader(f) if row]
+
+    if not rows:
+        return np.array([]), np.array([])
+
+    time_col, temp_col = None, None
+    header = [cell.strip().lower() for cell in rows[0]]
+    try:
+        float(header[-1])
+    except ValueError:
+        for i, name in enumerate(header):
+            if time_col is None and name in ("timestamp", "time", "t"):
+                time_col = i
+            elif temp_col is None and name.startswith("temp"):
+                temp_col = i
+        if temp_col is None:
+            raise ValueError("CSV header has no temperature column")
+        rows = rows[1:]
+    else:
+        if len(rows[0]) >= 2:
+            time_col, temp_col = 0, 1
+        else:
+            temp_col = 0
+
+    temperatures, timestamps = [], []
+    for row in rows:
+        try:
+            temp = float(row[temp_col])
+            stamp = _parse_time(row[time_col]) if time_col is not None else None
+        except (ValueError, IndexError):
+            continue  # Skip gaps and malformed lines
+        temperatures.append(temp)
+        timestamps.append(stamp)
+
+    temps = np.array(temperatures, dtype=float)
+    if time_col is None:
+        times = np.arange(temps.size, dtype=float)
+    else:
+        times = np.array(timestamps, dtype=float)
+    return times, temps
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as a compact h/m/s string."""
+    seconds = int(round(seconds))
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
@@ -1,5 +1,4 @@
 import os
-import glob
 import json
 import subprocess
 from PyQt6.QtWidgets import (
@@ -13,18 +12,40 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QLineEdit,
     QMessageBox,
+    QFileDialog,
 )
-from PyQt6.QtCore import Qt, QPointF, QEvent, QProcess
+from PyQt6.QtCore import Qt, QEvent, QProcess, QTimer
 
 # from PyQt6.QtGui import QCursor
 
+import numpy as np
 import pyqtgraph as pg
 
+from src.app.nbfc_catalog import get_catalog
+from src.app.system_utils import install_files
+from src.app.tracing import trace_process
+from src.app.fan_curve_simulator import (
+    thresholds_from_points,
+    simulate_fan_curve,
+    load_temperature_csv,
+    format_duration,
+)
+
 
 class FanProfileEditor(QMainWindow):
-    def __init__(self, current_nbfc_profile_name=None):
+    def __init__(self, current_nbfc_profile_name=None, temperature_history=None):
         super().__init__()
         self.current_nbfc_profile_name_from_main = current_nbfc_profile_name
+        # Callable returning (timestamps, temperatures) of recent telemetry
+        self.temperature_history = temperature_history
+        # Rescanned once per editor; searching only reads the cached index
+        self.catalog = get_catalog()
+        self.catalog.refresh()
+
+        # Temperature trace replayed through the curve, if one is loaded
+        self.sim_times = None
+        self.sim_temps = None
+        self.simulated_points = None
 
         self.points = [(20, 0), (40, 30), (60, 60), (80, 100)]
         self.current_config = None
@@ -36,6 +57,11 @@ class FanProfileEditor(QMainWindow):
         self.nbfc_configs_dir = "/usr/share/nbfc/configs/"
         self.view_box = None
 
+        # Screen-space hit-test cache: viewport pixel position of each point
+        # and the data->pixel scale/offset, rebuilt when the view transforms
+        self.screen_points = None
+        self.view_transform = None
+
         self.init_ui()
 
     def init_ui(self):
@@ -58,6 +84,11 @@ class FanProfileEditor(QMainWindow):
         # Profile Selection Group
         profiles_group = QGroupBox("Available Profiles")
         profiles_layout = QHBoxLayout(profiles_group)
+        self.profile_search = QLineEdit()
+        self.profile_search.setPlaceholderText("Search...")
+        self.profile_search.setClearButtonEnabled(True)
+        self.profile_search.textChanged.connect(self.filter_profiles)
+        profiles_layout.addWidget(self.profile_search)
         profiles_layout.addWidget(QLabel("Select Profile:"))
         self.profiles_list = self.get_available_profiles()
         self.profile_dropdown = QComboBox()
@@ -112,6 +143,20 @@ class FanProfileEditor(QMainWindow):
         # Install event filter for direct mouse event handling
         self.plot_widget.viewport().installEventFilter(self)
 
+        # Invalidate the hit-test cache whenever the view moves or resizes.
+        # The transform signal only comes with the next paint, so range
+        # changes invalidate it right away too.
+        self.view_box.sigTransformChanged.connect(self._invalidate_hit_cache)
+        self.view_box.sigRangeChanged.connect(self._invalidate_hit_cache)
+        self.view_box.sigResized.connect(self._invalidate_hit_cache)
+
+        # Drag redraws are coalesced to one per display frame
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        refresh_rate = self.screen().refreshRate() if self.screen() else 0
+        self.redraw_timer.setInterval(int(1000 / (refresh_rate or 60)))
+        self.redraw_timer.timeout.connect(self._redraw_drag)
+
         # Curve Controls Group
         controls_group = QGroupBox("Curve Controls")
         controls_layout = QVBoxLayout(controls_group)
@@ -136,6 +181,43 @@ class FanProfileEditor(QMainWindow):
         controls_layout.addLayout(reset_layout)
         main_layout.addWidget(controls_group)
 
+        # Simulation Group - replay a recorded trace through the curve
+        sim_group = QGroupBox("Simulate Recorded Temperatures")
+        sim_layout = QVBoxLayout(sim_group)
+        sim_buttons_layout = QHBoxLayout()
+        history_btn = QPushButton("Use Recent History")
+        history_btn.clicked.connect(self.load_history_trace)
+        history_btn.setEnabled(self.temperature_history is not None)
+        sim_buttons_layout.addWidget(history_btn)
+        csv_btn = QPushButton("Load Trace CSV...")
+        csv_btn.clicked.connect(self.load_csv_trace)
+        sim_buttons_layout.addWidget(csv_btn)
+        clear_sim_btn = QPushButton("Clear")
+        clear_sim_btn.clicked.connect(self.clear_simulation)
+        sim_buttons_layout.addWidget(clear_sim_btn)
+        sim_layout.addLayout(sim_buttons_layout)
+
+        self.sim_plot = pg.PlotWidget()
+        self.sim_plot.setMinimumHeight(160)
+        self.sim_plot.setLabel("left", "°C / Fan %")
+        self.sim_plot.setLabel("bottom", "Time (s)")
+        self.sim_plot.showGrid(x=True, y=True, alpha=0.3)
+        self.sim_plot.setMouseEnabled(x=True, y=False)
+        self.sim_plot.setClipToView(True)
+        self.sim_plot.setDownsampling(auto=True, mode="peak")
+        self.sim_temp_curve = self.sim_plot.plot(
+            [], [], pen=pg.mkPen("#3498db", width=1)
+        )
+        self.sim_fan_curve = self.sim_plot.plot(
+            [], [], pen=pg.mkPen("#e74c3c", width=2)
+        )
+        self.sim_stats_item = pg.TextItem(anchor=(0, 0))
+        self.sim_stats_item.setParentItem(self.sim_plot.plotItem.vb)
+        self.sim_stats_item.setPos(5, 5)
+        sim_layout.addWidget(self.sim_plot)
+        self.sim_plot.hide()
+        main_layout.addWidget(sim_group)
+
         # Save Profile Group
         save_group = QGroupBox("Save Profile")
         save_layout = QHBoxLayout(save_group)
@@ -157,9 +239,8 @@ class FanProfileEditor(QMainWindow):
 
             # Handle double click separately
             if event_type == QEvent.Type.MouseButtonDblClick and event.button() == Qt.MouseButton.LeftButton:
-                scene_pos = self.plot_widget.mapToScene(event.pos())
-                data_pos = self.view_box.mapSceneToView(scene_pos)
-                self._add_point_at(data_pos.x(), data_pos.y())
+                data_x, data_y = self._viewport_to_data(event.position())
+                self._add_point_at(data_x, data_y)
                 return True
 
             # Mouse press - start drag operation
@@ -167,32 +248,23 @@ class FanProfileEditor(QMainWindow):
                 event_type == QEvent.Type.MouseButtonPress
                 and event.button() == Qt.MouseButton.LeftButton
             ):
-                scene_pos = self.plot_widget.mapToScene(event.pos())
-                idx = self._get_point_at_scene_pos(scene_pos)
+                idx = self._get_point_at_viewport_pos(event.position())
                 if idx is not None:
                     self.drag_point_index = idx
                     self.is_dragging = True
-                    self._update_hover_point(scene_pos)
+                    self._update_hover_point(event.position())
                     return True  # Event handled
-                # Check for double click to add point
-                elif (
-                    event.type() == QEvent.Type.MouseButtonDblClick
-                ):  # Changed from doubleClick() method
-                    data_pos = self.view_box.mapSceneToView(scene_pos)
-                    self._add_point_at(data_pos.x(), data_pos.y())
-                    return True
 
             # Mouse move - update point position during drag
             elif event_type == QEvent.Type.MouseMove:
-                scene_pos = self.plot_widget.mapToScene(event.pos())
                 if self.is_dragging and self.drag_point_index is not None:
-                    data_pos = self.view_box.mapSceneToView(scene_pos)
+                    data_x, data_y = self._viewport_to_data(event.position())
                     self._update_point_position(
-                        self.drag_point_index, data_pos.x(), data_pos.y()
+                        self.drag_point_index, data_x, data_y
                     )
                     return True
                 else:
-                    self._update_hover_point(scene_pos)
+                    self._update_hover_point(event.position())
 
             # Mouse release - end drag operation
             elif (
@@ -200,21 +272,23 @@ class FanProfileEditor(QMainWindow):
                 and event.button() == Qt.MouseButton.LeftButton
             ):
                 if self.is_dragging:
-                    scene_pos = self.plot_widget.mapToScene(event.pos())
-                    data_pos = self.view_box.mapSceneToView(scene_pos)
-
                     # Finalize position if still dragging
                     if self.drag_point_index is not None:
+                        data_x, data_y = self._viewport_to_data(
+                            event.position()
+                        )
                         self._update_point_position(
-                            self.drag_point_index, data_pos.x(), data_pos.y()
+                            self.drag_point_index, data_x, data_y
                         )
 
-                    # Reset drag state
+                    # Reset drag state and flush the pending redraw
                     self.is_dragging = False
                     self.drag_point_index = None
+                    self.redraw_timer.stop()
+                    self.update_plot()
 
                     # Update hover for current position
-                    self._update_hover_point(scene_pos)
+                    self._update_hover_point(event.position())
                     return True
 
             # Right-click to remove a point
@@ -222,8 +296,7 @@ class FanProfileEditor(QMainWindow):
                 event_type == QEvent.Type.MouseButtonPress
                 and event.button() == Qt.MouseButton.RightButton
             ):
-                scene_pos = self.plot_widget.mapToScene(event.pos())
-                idx = self._get_point_at_scene_pos(scene_pos)
+                idx = self._get_point_at_viewport_pos(event.position())
                 if idx is not None:
                     self._remove_point_at_index(idx)
                     return True
@@ -240,18 +313,44 @@ class FanProfileEditor(QMainWindow):
             self.update_plot()
 
     def _update_point_position(self, idx, x, y):
-        """Update the position of a point at the given index."""
+        """Move a single point, keeping it between its neighbours.
+
+        Clamping the temperature to the neighbouring points keeps the list
+        sorted, so a drag never needs a re-sort and the dragged index stays
+        valid. Only the point's cache entry is refreshed; the plot itself is
+        redrawn at most once per display frame.
+        """
         if 0 <= idx < len(self.points):
-            new_temp = round(max(0, min(100, x)))
+            low = self.points[idx - 1][0] if idx > 0 else 0
+            high = (
+                self.points[idx + 1][0] if idx < len(self.points) - 1 else 100
+            )
+            new_temp = round(max(low, min(high, x)))
             new_speed = round(max(0, min(100, y)))
+            if self.points[idx] == (new_temp, new_speed):
+                return
             self.points[idx] = (new_temp, new_speed)
 
-            # Update coordinate label
-            self.coord_text_item.setText(f"({new_temp}, {new_speed})")
-            self.coord_text_item.setPos(new_temp, new_speed)
-            self.coord_text_item.show()
+            if self.screen_points is not None:
+                sx, ox, sy, oy = self.view_transform
+                self.screen_points[idx] = (
+                    new_temp * sx + ox,
+                    new_speed * sy + oy,
+                )
 
-            self.update_plot()
+            if not self.redraw_timer.isActive():
+                self.redraw_timer.start()
+
+    def _redraw_drag(self):
+        """Redraw the curve and the dragged point's label."""
+        self._set_curve_data()
+        self._update_highlight()
+        if self.drag_point_index is not None:
+            pt_x, pt_y = self.points[self.drag_point_index]
+            self.coord_text_item.setText(f"({pt_x}, {pt_y})")
+            self.coord_text_item.setPos(pt_x, pt_y)
+            self.coord_text_item.show()
+        self.update_simulation()
 
     def _remove_point_at_index(self, idx):
         """Remove the point at the given index if possible."""
@@ -275,10 +374,11 @@ class FanProfileEditor(QMainWindow):
                     "Fan curve must have at least 2 points.",
                 )
 
-    def _update_hover_point(self, scene_pos):
+    def _update_hover_point(self, viewport_pos):
         """Update the hover point based on cursor position."""
-        idx = self._get_point_at_scene_pos(scene_pos)
-        old_hover_idx = self.hover_point_index
+        idx = self._get_point_at_viewport_pos(viewport_pos)
+        if idx == self.hover_point_index and not self.is_dragging:
+            return
         self.hover_point_index = idx
 
         if idx is not None and 0 <= idx < len(self.points):
@@ -293,37 +393,65 @@ class FanProfileEditor(QMainWindow):
             # Reset cursor to default
             self.plot_widget.setCursor(Qt.CursorShape.ArrowCursor)
 
-        if old_hover_idx != self.hover_point_index:
-            self.update_plot()
-
-    def _get_point_at_scene_pos(self, scene_pos, sensitivity_pixels=12):
-        """Find the index of the point near the given scene position."""
-        if not self.view_box:
+        self._update_highlight()
+
+    def _invalidate_hit_cache(self, *args):
+        """Drop cached screen positions; rebuilt lazily on the next hit-test."""
+        self.screen_points = None
+        self.view_transform = None
+
+    def _ensure_hit_cache(self):
+        """Build the data->viewport transform and screen positions of points.
+
+        The view box maps data linearly onto the viewport, so mapping two
+        corners of the view rectangle is enough to get a scale and offset
+        per axis, which are then applied to all points at once.
+        """
+        if self.view_transform is None:
+            view_rect = self.view_box.viewRect()
+            to_viewport = self.plot_widget.viewportTransform()
+            top_left = to_viewport.map(
+                self.view_box.mapViewToScene(view_rect.topLeft())
+            )
+            bottom_right = to_viewport.map(
+                self.view_box.mapViewToScene(view_rect.bottomRight())
+            )
+            if view_rect.width() == 0 or view_rect.height() == 0:
+                return False
+            sx = (bottom_right.x() - top_left.x()) / view_rect.width()
+            sy = (bottom_right.y() - top_left.y()) / view_rect.height()
+            ox = top_left.x() - view_rect.left() * sx
+            oy = top_left.y() - view_rect.top() * sy
+            if sx == 0 or sy == 0:
+                return False
+            self.view_transform = (sx, ox, sy, oy)
+
+        if self.screen_points is None:
+            sx, ox, sy, oy = self.view_transform
+            data = np.array(self.points, dtype=float).reshape(-1, 2)
+            self.screen_points = data * (sx, sy) + (ox, oy)
+        return True
+
+    def _viewport_to_data(self, viewport_pos):
+        """Map a viewport position to data coordinates."""
+        if self.view_box is None or not self._ensure_hit_cache():
+            return 0.0, 0.0
+        sx, ox, sy, oy = self.view_transform
+        return (viewport_pos.x() - ox) / sx, (viewport_pos.y() - oy) / sy
+
+    def _get_point_at_viewport_pos(self, viewport_pos, sensitivity_pixels=12):
+        """Find the index of the point near the given viewport position."""
+        if not self.view_box or not self.points:
+            return None
+        if not self._ensure_hit_cache():
             return None
 
-        mouse_data_pos = self.view_box.mapSceneToView(scene_pos)
-
-        # Convert sensitivity from pixels to data units
-        offset_scene_pos = QPointF(
-            scene_pos.x() + sensitivity_pixels, scene_pos.y()
-        )
-        offset_data_pos = self.view_box.mapSceneToView(offset_scene_pos)
-        data_sensitivity = abs(offset_data_pos.x() - mouse_data_pos.x())
-
-        mx, my = mouse_data_pos.x(), mouse_data_pos.y()
-
-        # Find the closest point within sensitivity range
-        closest_idx = None
-        closest_dist = float("inf")
-
-        for i, (px, py) in enumerate(self.points):
-            # Calculate distance between mouse position and point
-            dist = ((mx - px) ** 2 + (my - py) ** 2) ** 0.5
-            if dist < data_sensitivity and dist < closest_dist:
-                closest_dist = dist
-                closest_idx = i
-
-        return closest_idx
+        deltas = self.screen_points - (viewport_pos.x(), viewport_pos.y())
+        distances = np.einsum("ij,ij->i", deltas, deltas)
+        closest_idx = int(np.argmin(distances))
+        if distances[closest_idx] < sensitivity_pixels ** 2:
+            return closest_idx
+        return None
 
     def select_initial_profile(self):
         """Selects the initial profile in the dropdown, if applicable."""
@@ -355,19 +483,21 @@ class FanProfileEditor(QMainWindow):
             self.load_selected_profile()
 
     def get_available_profiles(self):
-        """Scans the NBFC configs directory for .json files and returns their names."""
-        try:
-            system_profiles = glob.glob(
-                os.path.join(self.nbfc_configs_dir, "*.json")
-            )
-            profile_names = [
-                os.path.splitext(os.path.basename(p))[0]
-                for p in system_profiles
-            ]
-            return sorted(profile_names)
-        except Exception as e:
-            print(f"Error getting available profiles: {e}")
-            return []
+        """Returns the names of the NBFC configs in the shared catalog."""
+        return self.catalog.names()
+
+    def filter_profiles(self, query):
+        """Limits the dropdown to profiles matching the search query."""
+        current = self.profile_dropdown.currentText()
+        matches = self.catalog.search(query)
+        self.profile_dropdown.blockSignals(True)
+        self.profile_dropdown.clear()
+        self.profile_dropdown.addItems(matches)
+        index = self.profile_dropdown.findText(current)
+        self.profile_dropdown.setCurrentIndex(index if index >= 0 else 0)
+        self.profile_dropdown.blockSignals(False)
+        if matches and self.profile_dropdown.currentText() != current:
+            self.load_selected_profile()
 
     def on_profile_selected(self, index):
         """Handles selection change in the profile dropdown."""
@@ -375,27 +505,46 @@ class FanProfileEditor(QMainWindow):
             self.load_selected_profile()
 
     def load_selected_profile(self):
-        """Loads fan curve data from the selected NBFC profile file."""
+        """Loads fan curve data from the selected NBFC profile file.
+
+        The config is parsed on a worker thread; the curve is updated when
+        it arrives, unless another profile was selected in the meantime.
+        """
         profile_name = self.profile_dropdown.currentText()
         if not profile_name:
             return
 
         self.custom_profile_name.setText(profile_name)
-        file_path = os.path.join(self.nbfc_configs_dir, f"{profile_name}.json")
+        file_path = self.catalog.path_for(profile_name)
+
+        if not file_path or not os.path.exists(file_path):
+            QMessageBox.critical(
+                self,
+                "Error",
+                f"Profile '{profile_name}' not found in {self.nbfc_configs_dir}.",
+            )
+            self.reset_curve(update_dropdown=False)
+            self.update_plot()
+            return
+
+        self.catalog.load_config_async(profile_name, self.on_profile_loaded)
+
+    def on_profile_loaded(self, profile_name, config, error):
+        """Applies a config parsed by the catalog worker to the curve."""
+        if profile_name != self.profile_dropdown.currentText():
+            return  # Superseded by a newer selection
 
-        if not os.path.exists(file_path):
+        if config is None:
             QMessageBox.critical(
                 self,
                 "Error",
-                f"Profile '{profile_name}' not found at {file_path}.",
+                f"Failed to load profile '{profile_name}': {error}",
             )
             self.reset_curve(update_dropdown=False)
             self.update_plot()
             return
 
         try:
-            with open(file_path, "r") as f:
-                config = json.load(f)
             self.current_config = config
 
             curve_points = []
@@ -514,6 +663,7 @@ class FanProfileEditor(QMainWindow):
             process.deleteLater()
 
         process.finished.connect(on_finished)
+        trace_process(process, "pkexec nbfc config -a")
         process.start("pkexec", ["nbfc", "config", "-a", profile_name])
 
     def save_custom_profile(self):
@@ -564,73 +714,39 @@ class FanProfileEditor(QMainWindow):
         if not config["FanConfigurations"]:
             config["FanConfigurations"].append({})
 
-        thresholds = []
-        if self.points:
-            t_0, s_0 = self.points[0]
-            thresholds.append(
-                {
-                    "UpThreshold": int(t_0),
-                    "DownThreshold": int(max(0, t_0 - 5)),
-                    "FanSpeed": float(s_0),
-                }
-            )
-            for i in range(1, len(self.points)):
-                t_curr, s_curr = self.points[i]
-                t_prev, _ = self.points[i - 1]
-                down_thresh = min(int(t_prev + 1), int(t_curr))
-                down_thresh = max(0, down_thresh)
-                thresholds.append(
-                    {
-                        "UpThreshold": int(t_curr),
-                        "DownThreshold": down_thresh,
-                        "FanSpeed": float(s_curr),
-                    }
-                )
+        thresholds = thresholds_from_points(self.points)
         config["FanConfigurations"][0]["TemperatureThresholds"] = thresholds
         config["FanConfigurations"][0].pop("FanSpeedPercentageOverrides", None)
 
-        try:
-            temp_dir = os.path.expanduser(
-                "~/.config/ryzen-master-commander/temp_profiles"
-            )
-            os.makedirs(temp_dir, exist_ok=True)
-            temp_file = os.path.join(temp_dir, f"{name}.json")
-            with open(temp_file, "w") as f:
-                json.dump(config, f, indent=2)
-            target_file = os.path.join(self.nbfc_configs_dir, f"{name}.json")
+        target_file = os.path.join(self.nbfc_configs_dir, f"{name}.json")
 
-            # Create QProcess for non-blocking execution with parent to prevent GC
-            process = QProcess(self)
-
-            def on_finished(exit_code, exit_status):
-                if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-                    QMessageBox.information(
-                        self, "Success", f"Saved profile to {target_file}"
-                    )
-                    self.refresh_ui_after_save(name)
-                else:
-                    stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
-                    stdout = process.readAllStandardOutput().data().decode('utf-8', errors='ignore')
-                    error_details = f"Error: {stderr or stdout or 'Unknown error'}"
-                    QMessageBox.critical(
-                        self,
-                        "Error",
-                        f"Failed to save profile with pkexec.\n{error_details}",
-                    )
-                # Clean up process after finished
-                process.deleteLater()
-
-            process.finished.connect(on_finished)
-            process.start("pkexec", ["cp", temp_file, target_file])
-
-        except Exception as e:
-            QMessageBox.critical(
-                self, "Error", f"Failed to save profile: {str(e)}"
+        def on_installed(results):
+            _, error = results[0]
+            if error:
+                QMessageBox.critical(
+                    self, "Error", f"Failed to save profile: {error}"
+                )
+                return
+            QMessageBox.information(
+                self, "Success", f"Saved profile to {target_file}"
             )
+            self.refresh_ui_after_save(name)
+
+        # The config directory is usually root-owned, so this normally
+        # asks for authorization once and writes the file atomically
+        install_files(
+            [(json.dumps(config, indent=2), target_file, 0o644)],
+            on_installed,
+            self,
+        )
 
     def refresh_ui_after_save(self, saved_profile_name):
         """Refreshes the profile list and selects the newly saved profile."""
+        self.catalog.refresh()
         self.profiles_list = self.get_available_profiles()
+        self.profile_search.blockSignals(True)
+        self.profile_search.clear()
+        self.profile_search.blockSignals(False)
         self.profile_dropdown.clear()
         self.profile_dropdown.addItems(self.profiles_list)
         if saved_profile_name in self.profiles_list:
@@ -644,10 +760,18 @@ class FanProfileEditor(QMainWindow):
             [(round(p[0]), round(p[1])) for p in self.points],
             key=lambda p: p[0],
         )
-        temps, speeds = zip(*self.points) if self.points else ([], [])
-        self.curve_item.setData(temps, speeds)
-
-        self.selected_point_item.clear()
+        self.screen_points = None
+        self._set_curve_data()
+        self._update_highlight()
+        self.update_simulation()
+
+    def _set_curve_data(self):
+        """Push the current points to the curve item."""
+        data = np.array(self.points, dtype=float).reshape(-1, 2)
+        self.curve_item.setData(data[:, 0], data[:, 1])
+
+    def _update_highlight(self):
+        """Highlight the dragged or hovered point."""
         highlight_idx = (
             self.drag_point_index
             if self.drag_point_index is not None
@@ -655,7 +779,82 @@ class FanProfileEditor(QMainWindow):
         )
         if highlight_idx is not None and 0 <= highlight_idx < len(self.points):
             px, py = self.points[highlight_idx]
-            self.selected_point_item.addPoints([px], [py])
+            self.selected_point_item.setData([px], [py])
+        else:
+            self.selected_point_item.clear()
+
+    def load_history_trace(self):
+        """Replay the main window's recent temperature history (up to 8 h)."""
+        if self.temperature_history is None:
+            return
+        times, temps = self.temperature_history()
+        if len(temps) < 2:
+            QMessageBox.information(
+                self, "Note", "Not enough temperature history recorded yet."
+            )
+            return
+        self.set_simulation_trace(times, temps)
+
+    def load_csv_trace(self):
+        """Replay a temperature trace loaded from a CSV file."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Temperature Trace", "", "CSV files (*.csv);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            times, temps = load_temperature_csv(path)
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Error", f"Failed to load trace: {str(e)}"
+            )
+            return
+        if temps.size == 0:
+            QMessageBox.warning(
+                self, "Warning", "No temperature samples found in file."
+            )
+            return
+        self.set_simulation_trace(times, temps)
+
+    def set_simulation_trace(self, times, temps):
+        """Set the trace replayed through the curve and show the overlay."""
+        times = np.asarray(times, dtype=float)
+        self.sim_times = times - times[0]
+        self.sim_temps = np.asarray(temps, dtype=float)
+        self.sim_temp_curve.setData(self.sim_times, self.sim_temps)
+        self.sim_plot.show()
+        self.update_simulation(force=True)
+        self.sim_plot.autoRange()
+
+    def clear_simulation(self):
+        """Drop the loaded trace and hide the overlay."""
+        self.sim_times = None
+        self.sim_temps = None
+        self.sim_temp_curve.setData([], [])
+        self.sim_fan_curve.setData([], [])
+        self.sim_plot.hide()
+
+    def update_simulation(self, force=False):
+        """Re-run the loaded trace through the current curve."""
+        if self.sim_temps is None:
+            return
+        # Hover changes redraw the plot too; only re-simulate on edits
+        if not force and self.points == self.simulated_points:
+            return
+        self.simulated_points = list(self.points)
+        result = simulate_fan_curve(
+            self.sim_times, self.sim_temps, thresholds_from_points(self.points)
+        )
+        self.sim_fan_curve.setData(self.sim_times, result["fan_speeds"])
+
+        lines = [
+            f"Duration: {format_duration(result['duration'])}",
+            f"Speed changes: {result['speed_changes']}",
+        ]
+        for speed, seconds in result["time_at_or_above"]:
+            if speed > 0:
+                lines.append(f">= {speed:g}%: {format_duration(seconds)}")
+        self.sim_stats_item.setText("\n".join(lines))
 
     def reset_curve(self, update_dropdown=True):
         """Resets the fan curve to a default state."""
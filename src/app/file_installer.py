@@ -0,0 +1,76 @@
+"""Atomically install a batch of files; run under pkexec when needed.
+
+Reads a JSON manifest from stdin:
+
+    {"files": [{"target": "/path/name.json", "mode": 420, "content": "..."}]}
+
+Each file is written to a temporary file in the target's directory,
+fsynced, given its mode and renamed over the target, so readers never
+see a partially written file. Writes a JSON result per file to stdout:
+
+    {"results": [{"target": "/path/name.json", "error": null}]}
+
+This module only uses the standard library so that it can run as root
+without the rest of the application.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+
+def install_file(content, target, mode=0o644):
+    """Atomically replace target with content (str or bytes)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Make the rename itself durable
+    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def install_batch(files):
+    """Install each manifest entry; returns [{"target", "error"}]."""
+    results = []
+    for entry in files:
+        try:
+            install_file(
+                entry["content"], entry["target"], entry.get("mode", 0o644)
+            )
+            error = None
+        except (OSError, KeyError, TypeError) as e:
+            error = str(e)
+        results.append({"target": entry.get("target"), "error": error})
+    return results
+
+
+def main():
+    manifest = json.load(sys.stdin)
+    results = install_batch(manifest["files"])
+    json.dump({"results": results}, sys.stdout)
+    return 0 if all(result["error"] is None for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,9 @@ from PyQt6.QtWidgets import QWidget
 from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QLinearGradient
 from PyQt6.QtCore import Qt, QRectF, QPointF, QRect
 
+from src.app import diagnostics
+from src.app.tracing import traced
+
 
 class CircularGauge(QWidget):
     def __init__(self, parent=None, min_value=0, max_value=100, title=""):
@@ -54,7 +57,9 @@ class CircularGauge(QWidget):
             self.value = max(self.min_value, min(self.max_value, numeric_value))
             self.update()
         except (ValueError, TypeError):
-            print(f"Invalid value for gauge: {value}")
+            diagnostics.debug(
+                f"gauge.{self.title}.value", f"Invalid value for gauge: {value}"
+            )
     
     def set_max_value(self, max_value):
         """Update the maximum value for the gauge"""
@@ -62,7 +67,10 @@ class CircularGauge(QWidget):
             self.max_value = float(max_value)
             self.update()
         except (ValueError, TypeError):
-            print(f"Invalid max value for gauge: {max_value}")
+            diagnostics.debug(
+                f"gauge.{self.title}.max",
+                f"Invalid max value for gauge: {max_value}",
+            )
     
     def draw_arc_with_gradient(self, painter, rect, start_angle, span_angle, pen_width):
         """Draw an arc with a color gradient"""
@@ -134,6 +142,7 @@ class CircularGauge(QWidget):
         painter.end()
         return pixmap
         
+    @traced("gauge.paint", "paint")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
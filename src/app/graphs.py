@@ -1,15 +1,94 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+import time
+
+from PyQt6.QtCore import QObject, QRectF, QTimer
+from PyQt6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QGridLayout,
+    QLabel,
+    QComboBox,
+    QPushButton,
+    QFileDialog,
+    QMessageBox,
+)
 import pyqtgraph as pg
+import numpy as np
 
-# import numpy as np
+from src.app import diagnostics
+from src.app.core_stats import CoreStatsSource
+from src.app.telemetry_export import export_range_async
+from src.app.tracing import span
+
+
+# Upper bound on redraws of the graph and gauges, whatever the sample rate
+MAX_FPS = 10
+
+
+class RenderThrottle(QObject):
+    """Coalesce redraw requests into at most max_fps calls of render().
+
+    A request made long enough after the last frame renders immediately;
+    requests arriving faster are folded into one frame at the end of the
+    frame interval, which then draws the latest buffered data.
+    """
+
+    def __init__(self, render, max_fps=MAX_FPS, parent=None):
+        super().__init__(parent)
+        self.render = render
+        self.interval = 1.0 / max_fps
+        self.last_frame = None
+        self.frames = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._frame)
+
+    def request(self):
+        if self.timer.isActive():
+            return
+        now = time.monotonic()
+        if self.last_frame is None or now - self.last_frame >= self.interval:
+            self._frame()
+        else:
+            wait = self.interval - (now - self.last_frame)
+            self.timer.start(max(1, int(wait * 1000)))
+
+    def _frame(self):
+        self.last_frame = time.monotonic()
+        self.frames += 1
+        self.render()
 
 
 class CombinedGraph(QWidget):
-    def __init__(self, parent=None):
+    # (label, seconds shown, seconds per point); None shows the live readings
+    RANGES = (
+        ("Live", None, None),
+        ("Last hour", 3600, 10),
+        ("Last 8 hours", 8 * 3600, 60),
+        ("Last 24 hours", 24 * 3600, 60),
+        ("Last 7 days", 7 * 24 * 3600, 600),
+    )
+    # Long ranges are redrawn from the history this often
+    HISTORY_REFRESH_MS = 10000
+    # Window and resolution of the temperature trace for the fan simulator
+    TRACE_SECONDS = 8 * 3600
+    TRACE_STEP = 10
+
+    def __init__(self, parent=None, max_points=60, history=None):
         super(CombinedGraph, self).__init__(parent)
+        # TelemetryHistory behind the long-range views and CSV export
+        self.history = history
+        # Number of readings kept and drawn
+        self.max_points = max_points
         self.temperature_readings = []
         self.fanspeed_readings = []
         self.time_points = []
+        # Wall-clock time of each sample, for replaying the recorded trace
+        self.sample_times = []
+        self.start_time = None
+        # Readings are buffered and drawn by render(), at most once a frame
+        self.dirty = False
+        self.antialias = True
 
         # Configure global PyQtGraph settings
         pg.setConfigOptions(antialias=True)
@@ -18,6 +97,21 @@ class CombinedGraph(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
+        if history is not None:
+            header = QHBoxLayout()
+            self.range_combo = QComboBox()
+            self.range_combo.addItems([label for label, _, _ in self.RANGES])
+            self.range_combo.currentIndexChanged.connect(self.set_range)
+            header.addWidget(self.range_combo)
+            header.addStretch()
+            export_button = QPushButton("Export...")
+            export_button.clicked.connect(self.export_history)
+            header.addWidget(export_button)
+            layout.addLayout(header)
+        self.range_index = 0
+        self.history_timer = QTimer(self)
+        self.history_timer.timeout.connect(self.render_history)
+
         # Create PlotWidget - use transparent background to respect app theme
         self.plot_widget = pg.PlotWidget(background=None)
         layout.addWidget(self.plot_widget)
@@ -70,10 +164,6 @@ class CombinedGraph(QWidget):
         # Create temperature plot
         self.temp_curve = pg.PlotCurveItem(
             pen=pg.mkPen(color=temp_color, width=3),
-            symbolBrush=temp_color,
-            symbolPen="w",
-            symbol="o",
-            symbolSize=7,
             name="Temperature",
         )
         self.plot_widget.addItem(self.temp_curve)
@@ -81,10 +171,6 @@ class CombinedGraph(QWidget):
         # Create fan speed plot (on secondary y-axis)
         self.fan_curve = pg.PlotCurveItem(
             pen=pg.mkPen(color=fan_color, width=3),
-            symbolBrush=fan_color,
-            symbolPen="w",
-            symbol="s",
-            symbolSize=7,
             name="Fan Speed",
         )
         self.fan_view.addItem(self.fan_curve)  # Add to the fan_view
@@ -131,72 +217,82 @@ class CombinedGraph(QWidget):
         )
 
     def update_data(self, temperature, fan_speed):
-        if temperature == "n/a" and fan_speed == "n/a":
-            return
-
-        # Add current time (seconds since start)
-        if not self.time_points:
-            self.time_points.append(0)
-        else:
-            self.time_points.append(self.time_points[-1] + 1)
-
-        # Keep only the last 60 points
-        if len(self.time_points) > 60:
-            self.time_points = self.time_points[-60:]
-
-        # Update temperature data
-        if temperature != "n/a":
-            self.temperature_readings.append(float(temperature))
-        else:
-            # If no reading, use the previous value or zero
-            self.temperature_readings.append(
-                self.temperature_readings[-1]
-                if self.temperature_readings
-                else 0
+        """Add a reading and redraw right away."""
+        if self.add_reading(temperature, fan_speed):
+            self.render()
+
+    def add_reading(self, temperature, fan_speed, timestamp=None):
+        """Buffer a reading without redrawing.
+
+        Args:
+            temperature: °C, or "n/a"/None to repeat the previous value
+            fan_speed: %, or "n/a"/None to repeat the previous value
+            timestamp: Epoch seconds of the reading (default: now)
+
+        Returns:
+            False if both values were missing and nothing was added
+        """
+        if temperature in ("n/a", None) and fan_speed in ("n/a", None):
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        if self.start_time is None:
+            self.start_time = timestamp
+
+        # Seconds since the first reading, so uneven rates plot correctly
+        self.time_points.append(timestamp - self.start_time)
+        self.sample_times.append(timestamp)
+
+        # If no reading, use the previous value or zero
+        if temperature in ("n/a", None):
+            temperature = (
+                self.temperature_readings[-1] if self.temperature_readings else 0
             )
-
-        # Keep only the last 60 points
-        if len(self.temperature_readings) > 60:
-            self.temperature_readings = self.temperature_readings[-60:]
-
-        # Update fan speed data
-        if fan_speed != "n/a":
-            self.fanspeed_readings.append(float(fan_speed))
-        else:
-            # If no reading, use the previous value or zero
-            self.fanspeed_readings.append(
-                self.fanspeed_readings[-1] if self.fanspeed_readings else 0
+        self.temperature_readings.append(float(temperature))
+        if fan_speed in ("n/a", None):
+            fan_speed = self.fanspeed_readings[-1] if self.fanspeed_readings else 0
+        self.fanspeed_readings.append(float(fan_speed))
+
+        # Keep only the last max_points points
+        excess = len(self.time_points) - self.max_points
+        if excess > 0:
+            del self.time_points[:excess]
+            del self.sample_times[:excess]
+            del self.temperature_readings[:excess]
+            del self.fanspeed_readings[:excess]
+        self.dirty = True
+        return True
+
+    def set_antialias(self, enabled):
+        """Antialiasing looks smoother but makes long curves slower to draw."""
+        self.antialias = enabled
+        self.dirty = True
+
+    def render(self):
+        """Draw the buffered readings if they changed since the last frame."""
+        if not self.dirty or self.range_index:
+            return  # Long-range views are drawn by render_history
+        self.dirty = False
+        time_data = np.asarray(self.time_points, dtype=float)
+        temp_data = np.asarray(self.temperature_readings, dtype=float)
+        fan_data = np.asarray(self.fanspeed_readings, dtype=float)
+
+        # Update plot data; the buffers never hold NaN or inf
+        with span("graph.setData", "paint", {"points": len(time_data)}):
+            self.temp_curve.setData(
+                time_data, temp_data, skipFiniteCheck=True, antialias=self.antialias
+            )
+            self.fan_curve.setData(
+                time_data, fan_data, skipFiniteCheck=True, antialias=self.antialias
             )
 
-        # Keep only the last 60 points
-        if len(self.fanspeed_readings) > 60:
-            self.fanspeed_readings = self.fanspeed_readings[-60:]
-
-        # Ensure all data arrays have the same length matching the shortest one
-        min_len = min(
-            len(self.time_points),
-            len(self.temperature_readings),
-            len(self.fanspeed_readings),
-        )
-        if min_len == 0:  # Avoid issues if no data yet
-            time_data, temp_data, fan_data = [], [], []
-        else:
-            time_data = self.time_points[-min_len:]
-            temp_data = self.temperature_readings[-min_len:]
-            fan_data = self.fanspeed_readings[-min_len:]
-
-        # Update plot data
-        self.temp_curve.setData(time_data, temp_data)
-        self.fan_curve.setData(time_data, fan_data)
-        if self.fan_proxy:  # Check if fan_proxy exists before setting data
-            self.fan_proxy.setData(
-                time_data, fan_data
-            )  # Update the legend proxy
+        self.scale_temperature_axis(temp_data)
 
+    def scale_temperature_axis(self, temp_data):
         # Auto-scale temperature y-axis
-        if temp_data:
-            max_temp = max(temp_data) + 5
-            min_temp = max(0, min(temp_data) - 5)
+        if len(temp_data):
+            max_temp = temp_data.max() + 5
+            min_temp = max(0, temp_data.min() - 5)
             # Ensure max_temp is at least a reasonable value like 50, and min_temp is not negative
             self.plot_widget.setYRange(min_temp, max(max_temp, 50.0))
         else:
@@ -207,3 +303,275 @@ class CombinedGraph(QWidget):
 
         # Update ViewBox to ensure correct sizing and linking
         self.updateViews()
+
+    def set_range(self, index):
+        """Show the live readings (0) or one of the long RANGES."""
+        self.range_index = index
+        bottom_axis = self.plot_widget.getAxis("bottom")
+        if index:
+            bottom_axis.setLabel("Time (hours)")
+            self.history_timer.start(self.HISTORY_REFRESH_MS)
+            self.render_history()
+        else:
+            bottom_axis.setLabel("Time (seconds)")
+            self.history_timer.stop()
+            self.plot_widget.enableAutoRange(x=True)
+            self.dirty = True
+            self.render()
+
+    def render_history(self):
+        """Draw per-window means of the selected range from the rollups."""
+        _, seconds, step = self.RANGES[self.range_index]
+        now = time.time()
+        curves = []
+        for name in ("temperature", "fan_speed"):
+            rows = self.history.series_range(name, now - seconds, now, step)
+            # Hours before now, at the middle of each window
+            x = np.array([row[0] + step / 2 - now for row in rows]) / 3600
+            curves.append((x, np.array([row[3] for row in rows], dtype=float)))
+        (temp_x, temp_data), (fan_x, fan_data) = curves
+
+        with span("graph.setData", "paint", {"points": len(temp_x)}):
+            self.temp_curve.setData(
+                temp_x, temp_data, skipFiniteCheck=True, antialias=self.antialias
+            )
+            self.fan_curve.setData(
+                fan_x, fan_data, skipFiniteCheck=True, antialias=self.antialias
+            )
+        self.plot_widget.setXRange(-seconds / 3600, 0, padding=0)
+        self.scale_temperature_axis(temp_data)
+
+    def export_history(self):
+        """Export the selected range (the last hour when live) in the background."""
+        _, seconds, step = self.RANGES[self.range_index or 1]
+        path, selected = QFileDialog.getSaveFileName(
+            self,
+            "Export History",
+            "telemetry.csv",
+            "CSV files (*.csv);;JSON Lines (*.jsonl);;Binary (*.rmct)",
+        )
+        if not path:
+            return
+        fmt = "csv"
+        if selected.startswith("JSON"):
+            fmt = "jsonl"
+        elif selected.startswith("Binary"):
+            fmt = "binary"
+        now = time.time()
+        export_range_async(
+            self.history, path, now - seconds, now, step, self.on_export_done, fmt
+        )
+
+    def on_export_done(self, path, rows, error):
+        if error:
+            QMessageBox.critical(self, "Error", f"Could not export history: {error}")
+        else:
+            QMessageBox.information(
+                self, "Export History", f"Wrote {rows} rows to {path}"
+            )
+
+    def get_temperature_trace(self):
+        """Return (timestamps, temperatures) of recent temperatures.
+
+        The last TRACE_SECONDS from the history as TRACE_STEP means, or the
+        buffered live readings while the history holds too little.
+        """
+        if self.history is not None:
+            now = time.time()
+            rows = self.history.series_range(
+                "temperature", now - self.TRACE_SECONDS, now, self.TRACE_STEP
+            )
+            if len(rows) >= 2:
+                return [row[0] for row in rows], [row[3] for row in rows]
+        count = min(len(self.sample_times), len(self.temperature_readings))
+        if count == 0:
+            return [], []
+        return (
+            self.sample_times[-count:],
+            self.temperature_readings[-count:],
+        )
+
+
+class CoreHeatmap(QWidget):
+    """Scrolling per-core heatmap of utilization or clock speed.
+
+    One ImageItem draws all cores: samples go into a (history, cores) ring
+    buffer and the image is re-set from it, instead of one curve per core.
+    Each column is a fixed slice of wall time holding the mean of the
+    samples in it, so the time span shown does not depend on how fast
+    other consumers make the sampler run. Redraws are capped by a
+    RenderThrottle. Per-core sampling only runs while the widget is
+    visible.
+    """
+
+    HISTORY = 120  # Columns kept
+    INTERVAL_MS = 1000
+    BUCKET_SECONDS = INTERVAL_MS / 1000  # Wall time per column
+
+    def __init__(self, sampler, parent=None):
+        super(CoreHeatmap, self).__init__(parent)
+        self.sampler = sampler
+        self.source = None
+        # Ring buffers of per-column sums, allocated on the first sample
+        self.utilization = None
+        self.clock = None
+        self.counts = None  # Samples per column
+        self.latest = None  # Index of the newest column's time bucket
+        self.throttle = RenderThrottle(self.render, parent=self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("Per-core:"))
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Utilization", "Clock (% of max)"])
+        self.mode_combo.currentIndexChanged.connect(self.throttle.request)
+        header.addWidget(self.mode_combo)
+        header.addStretch()
+        layout.addLayout(header)
+
+        self.plot_widget = pg.PlotWidget(background=None)
+        self.plot_widget.setMouseEnabled(x=False, y=False)
+        self.plot_widget.getAxis("left").setLabel("Core")
+        self.plot_widget.getAxis("bottom").setLabel("Time (seconds)")
+        self.image = pg.ImageItem(axisOrder="col-major")
+        self.image.setLookupTable(
+            pg.colormap.get("viridis").getLookupTable(nPts=256)
+        )
+        self.plot_widget.addItem(self.image)
+        layout.addWidget(self.plot_widget)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.source is None:
+            try:
+                self.source = CoreStatsSource()
+            except OSError as e:
+                diagnostics.warning(
+                    "heatmap.unavailable", f"Per-core statistics unavailable: {e}"
+                )
+                return
+            self.sampler.add_source("cores", self.source.read)
+            self.sampler.sample_ready.connect(self.on_sample)
+            self.sampler.request_interval(self, self.INTERVAL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.source is not None:
+            self.sampler.sample_ready.disconnect(self.on_sample)
+            self.sampler.release(self)
+            self.sampler.remove_source("cores")
+            self.source.close()
+            self.source = None
+
+    def on_sample(self, sample):
+        cores = sample.get("cores")
+        if not cores or cores["utilization"] is None:
+            return
+        core_count = len(cores["cpus"])
+        if self.utilization is None or self.utilization.shape[1] != core_count:
+            self.utilization = np.zeros((self.HISTORY, core_count), np.float32)
+            self.clock = np.zeros((self.HISTORY, core_count), np.float32)
+            self.counts = np.zeros(self.HISTORY, np.int32)
+            self.latest = None
+
+        bucket = int(sample["monotonic"] // self.BUCKET_SECONDS)
+        if self.latest is None or bucket - self.latest >= self.HISTORY:
+            self._clear_columns(slice(None))
+            self.latest = bucket
+        elif bucket > self.latest:
+            # Empty the columns skipped over since the last sample
+            skipped = np.arange(self.latest + 1, bucket + 1) % self.HISTORY
+            self._clear_columns(skipped)
+            self.latest = bucket
+        elif bucket <= self.latest - self.HISTORY:
+            return
+
+        slot = bucket % self.HISTORY
+        max_frequency = cores["max_frequency"]
+        self.utilization[slot] += np.nan_to_num(cores["utilization"])
+        self.clock[slot] += np.divide(
+            cores["frequency"],
+            max_frequency,
+            out=np.zeros(core_count),
+            where=max_frequency > 0,
+        )
+        self.counts[slot] += 1
+        self.throttle.request()
+
+    def _clear_columns(self, slots):
+        self.utilization[slots] = 0
+        self.clock[slots] = 0
+        self.counts[slots] = 0
+
+    def render(self, *args):
+        if self.latest is None:
+            return
+        ring = self.utilization if self.mode_combo.currentIndex() == 0 else self.clock
+        # Oldest column first, ending with the newest bucket
+        order = np.arange(self.latest + 1, self.latest + 1 + self.HISTORY) % self.HISTORY
+        counts = self.counts[order, None]
+        image = np.divide(
+            ring[order], counts, out=np.zeros(ring.shape, np.float32), where=counts > 0
+        )
+        width = self.HISTORY * self.BUCKET_SECONDS
+
+        with span("heatmap.setImage", "paint"):
+            self.image.setImage(image, levels=(0.0, 1.0), autoLevels=False)
+        # Columns end at "now" (x = 0); rows are cores
+        self.image.setRect(QRectF(-width, 0, width, image.shape[1]))
+
+
+def format_stat(value, digits=0):
+    return "–" if value is None else f"{value:.{digits}f}"
+
+
+class StatsPanel(QWidget):
+    """Compact table of windowed p50/p95/max and session means.
+
+    Reads TelemetryStats.summary() once a second while shown; nothing is
+    computed here beyond formatting.
+    """
+
+    INTERVAL_MS = 1000
+    ROWS = (("temperature", "Temp °C", 0), ("power", "Power W", 1))
+    COLUMNS = (("p50", "p50"), ("p95", "p95"), ("max", "max"), ("mean", "avg"))
+
+    def __init__(self, stats, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        layout = QGridLayout(self)
+        layout.setContentsMargins(4, 0, 4, 0)
+        hours = stats.window / 3600
+        layout.addWidget(QLabel(f"Last {hours:g} h"), 0, 0)
+        for column, (_, title) in enumerate(self.COLUMNS, start=1):
+            layout.addWidget(QLabel(title), 0, column)
+        self.labels = {}
+        for row, (series, title, _) in enumerate(self.ROWS, start=1):
+            layout.addWidget(QLabel(title), row, 0)
+            for column, (key, _) in enumerate(self.COLUMNS, start=1):
+                label = QLabel("–")
+                layout.addWidget(label, row, column)
+                self.labels[(series, key)] = label
+        self.setToolTip("avg is the mean over the whole session")
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(self.INTERVAL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        summary = self.stats.summary()
+        for series, _, digits in self.ROWS:
+            for key, _ in self.COLUMNS:
+                self.labels[(series, key)].setText(
+                    format_stat(summary[series][key], digits)
+                )
@@ -1,5 +1,6 @@
 import os
 import subprocess
+import time
 from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -17,17 +18,38 @@ from PyQt6.QtWidgets import (
     QSystemTrayIcon,
     QMenu,
     QMessageBox,
+    QFileDialog,
 )
 from PyQt6.QtCore import Qt, QTimer, QProcess
 from PyQt6.QtGui import QIcon, QAction
 
-from src.app.graphs import CombinedGraph
-from src.app.system_utils import get_system_readings
+from src.app.graphs import (
+    CombinedGraph,
+    CoreHeatmap,
+    RenderThrottle,
+    StatsPanel,
+    format_stat,
+)
+from src.app.system_utils import get_system_readings, source_health
+from src.app.source_health import UNAVAILABLE
 from src.app.profile_manager import ProfileManager
 from src.app.fan_profile_editor import FanProfileEditor
 from src.app.nbfc_manager import NBFCManager
 from src.app.settings_dialog import SettingsDialog
 from src.app.gauge_widget import CircularGauge
+from src.app.power_rules import PowerRuleController
+from src.app.process_watcher import ProcessWatcher
+from src.app.sampler import Sampler
+from src.app.session_recording import SessionReplay
+from src.app.settings_store import get_settings
+from src.app.telemetry_archive import TelemetryArchive
+from src.app.telemetry_export import LiveExport, default_log_path
+from src.app.telemetry_history import TelemetryHistory
+from src.app.telemetry_stats import TelemetryStats
+from src.app.single_instance import parse_arguments
+from src.app.energy import EnergyMonitor, format_hours
+from src.app import diagnostics, session_recording, tracing
+from src.app.tracing import trace_process, TraceSignalHandler
 from src.version import __version__
 
 
@@ -36,14 +58,18 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         # Initialize instance variables
-        self.profile_manager = ProfileManager()
+        self.sampler = Sampler(self)
+        self.profile_manager = ProfileManager(sampler=self.sampler)
         self.fan_speed_adjustment_delay = None
 
         # Store QProcess references to prevent garbage collection
         self.active_processes = []
 
-        # Default refresh interval is 5 seconds
-        self.refresh_interval = 5
+        # Window, monitoring and fan state from the last session
+        self.settings = get_settings()
+        self.refresh_interval = self.settings.value(
+            "monitoring/refresh_interval", 5, type=int
+        )
 
         NBFCManager.setup_nbfc(self)
 
@@ -53,9 +79,45 @@ class MainWindow(QMainWindow):
         # Set up system tray
         self.setup_system_tray()
 
-        # Set auto control by default
-        self.radio_auto_control.setChecked(True)
-        self.update_fan_control_visibility()
+        # Switch profiles when the power source changes
+        self.power_rules = PowerRuleController(self.profile_manager, self)
+
+        # Apply per-application profiles while matching games run
+        self.process_watcher = ProcessWatcher(self.profile_manager, self)
+        self.process_watcher.set_profiles(self.profile_manager.cached_profiles)
+        self.profile_manager.profile_store.profiles_changed.connect(
+            lambda *args: self.process_watcher.set_profiles(
+                self.profile_manager.cached_profiles
+            )
+        )
+
+        # Per-profile energy use and battery runtime
+        self.energy_monitor = EnergyMonitor(
+            self.sampler,
+            lambda: self.profile_manager.active_profile_name,
+            self,
+        )
+        self.energy_monitor.updated.connect(self.update_energy_display)
+
+        self.restore_window_state()
+
+        # Readings are buffered as they arrive and drawn at a capped rate
+        self.display_values = {}
+        self.display_throttle = RenderThrottle(self.render_display, parent=self)
+        # Samples carry the last nbfc fan speed, for the telemetry log
+        self.sampler.add_source(
+            "fan_speed", lambda: self.display_values.get("fan_speed")
+        )
+        self.combined_graph.set_antialias(
+            self.settings.value("display/antialias", True, type=bool)
+        )
+        self.sample_interval_ms = 0
+        self.sampler.sample_ready.connect(self.on_fast_sample)
+        self.set_sample_interval(
+            self.settings.value("monitoring/sample_interval_ms", 0, type=int)
+        )
+        self.live_export = None
+        self.set_live_log(self.settings.value("export/live_format", "", type=str))
 
         # Start reading system values
         self.refresh_timer = QTimer(self)
@@ -65,20 +127,36 @@ class MainWindow(QMainWindow):
         # Schedule first reading
         QTimer.singleShot(1000, self.update_readings)
 
+    def restore_window_state(self):
+        """Bring back the geometry and fan control of the last session"""
+        geometry = self.settings.value("window/geometry")
+        if geometry:
+            self.restoreGeometry(geometry)
+
+        manual_speed = self.settings.value("fan/manual_speed", 50, type=int)
+        self.fan_speed_control_slider.blockSignals(True)
+        self.fan_speed_control_slider.setValue(manual_speed)
+        self.fan_speed_control_slider.blockSignals(False)
+        self.manual_control_value_label.setText(f"{manual_speed}%")
+
+        # Auto control unless manual was chosen last time
+        if self.settings.value("fan/mode", "auto", type=str) == "manual":
+            self.radio_manual_control.setChecked(True)
+            self.apply_fan_speed()
+        else:
+            self.radio_auto_control.setChecked(True)
+        self.update_fan_control_visibility()
+
+    def save_window_state(self):
+        self.settings.set_value("window/geometry", self.saveGeometry())
+
     def check_nbfc_running(self):
         """Check if NBFC service is running"""
-        try:
-            result = subprocess.run(
-                ["nbfc", "status"], capture_output=True, text=True
-            )
-            return "ERROR: connect()" not in result.stderr
-        except Exception:
-            print(f"nbfc not running: {result.stderr}")
-            return False
+        return NBFCManager.is_nbfc_running()
 
     def start_nbfc_service(self):
         """Prompt user to start NBFC service"""
-        print("Attempting to start NBFC service...")
+        diagnostics.info("nbfc.start", "Attempting to start NBFC service...")
         try:
             subprocess.run(["pkexec", "nbfc", "start"], check=True)
         except subprocess.CalledProcessError:
@@ -127,6 +205,27 @@ class MainWindow(QMainWindow):
 
         tray_menu.addSeparator()
 
+        trace_action = QAction("Record Trace", self)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(tracing.is_enabled())
+        trace_action.toggled.connect(self.toggle_tracing)
+        tray_menu.addAction(trace_action)
+        save_trace_action = QAction("Save Trace...", self)
+        save_trace_action.triggered.connect(self.save_trace)
+        tray_menu.addAction(save_trace_action)
+
+        record_session_action = QAction("Record Session", self)
+        record_session_action.setCheckable(True)
+        record_session_action.setChecked(session_recording.is_recording())
+        record_session_action.toggled.connect(self.toggle_session_recording)
+        tray_menu.addAction(record_session_action)
+        self.record_session_action = record_session_action
+
+        # `kill -USR1` dumps the trace without going through the UI
+        self.trace_signal_handler = TraceSignalHandler(self)
+
+        tray_menu.addSeparator()
+
         quit_action = QAction("Quit", self)
         quit_action.triggered.connect(self.quit_application)
         tray_menu.addAction(quit_action)
@@ -153,6 +252,14 @@ class MainWindow(QMainWindow):
         power_text = self.power_label.text().replace("Power: ", "")
 
         tooltip = f"Ryzen Master Commander\n{temp_text} | {fan_text} | {power_text}\nProfile: {profile_text}"
+        summary = self.telemetry_stats.summary()
+        if summary["temperature"]["p95"] is not None:
+            tooltip += (
+                f"\nLast hour: p95 {format_stat(summary['temperature']['p95'])}°C, "
+                f"max {format_stat(summary['temperature']['max'])}°C"
+            )
+        if summary["power"]["mean"] is not None:
+            tooltip += f"\nSession avg: {format_stat(summary['power']['mean'], 1)} W"
         self.tray_icon.setToolTip(tooltip)
 
     def tray_icon_activated(self, reason):
@@ -169,6 +276,35 @@ class MainWindow(QMainWindow):
         self.activateWindow()
         self.raise_()
 
+    def handle_instance_command(self, arguments):
+        """Run the command line of a second launch in this instance.
+
+        Returns:
+            The reply sent back to the launching process
+        """
+        try:
+            options = parse_arguments(arguments)
+        except SystemExit:
+            return f"error: invalid arguments {arguments}"
+        if options.quit:
+            QTimer.singleShot(0, self.quit_application)
+            return "ok"
+        if options.replay:
+            return "error: --replay starts its own copy; quit this one first"
+        if options.record:
+            if not self.start_session_recording(options.record):
+                return f"error: cannot record to {options.record}"
+            return "ok"
+        if options.apply_profile:
+            if not self.profile_manager.apply_profile_by_name(
+                options.apply_profile
+            ):
+                return f"error: profile '{options.apply_profile}' not found"
+            return "ok"
+        if not options.minimized:
+            self.show_from_tray()
+        return "ok"
+
     def toggle_auto_control_from_tray(self, checked):
         """Toggle auto control from tray menu"""
         if checked:
@@ -179,10 +315,17 @@ class MainWindow(QMainWindow):
 
     def quit_application(self):
         """Quit the application"""
+        self.energy_monitor.stop()
+        self.set_live_log("")
+        session_recording.stop_recording()
+        self.telemetry_archive.flush()
+        self.save_window_state()
+        self.settings.flush()
         QApplication.quit()
 
     def closeEvent(self, event):
         """Override close event to minimize to tray instead of closing"""
+        self.save_window_state()
         if self.tray_icon.isVisible():
             self.hide()
             event.ignore()
@@ -212,8 +355,21 @@ class MainWindow(QMainWindow):
         # Add combined graph
         graph_group = QGroupBox("System Monitoring")
         graph_inner_layout = QVBoxLayout(graph_group)
-        self.combined_graph = CombinedGraph(self)
-        graph_inner_layout.addWidget(self.combined_graph)
+        graph_row = QHBoxLayout()
+        self.telemetry_history = TelemetryHistory(self.sampler, parent=self)
+        # Raw samples kept on disk for weeks; they also refill the rollups
+        self.telemetry_archive = TelemetryArchive()
+        self.sampler.sample_ready.connect(self.telemetry_archive.on_sample)
+        self.telemetry_history.load_archive_async(self.telemetry_archive)
+        self.combined_graph = CombinedGraph(self, history=self.telemetry_history)
+        graph_row.addWidget(self.combined_graph, 1)
+        self.telemetry_stats = TelemetryStats(self.sampler, parent=self)
+        self.stats_panel = StatsPanel(self.telemetry_stats, self)
+        graph_row.addWidget(self.stats_panel, 0, Qt.AlignmentFlag.AlignTop)
+        graph_inner_layout.addLayout(graph_row)
+        self.core_heatmap = CoreHeatmap(self.sampler, self)
+        self.core_heatmap.setMinimumHeight(120)
+        graph_inner_layout.addWidget(self.core_heatmap)
         graph_layout.addWidget(graph_group)
 
         splitter.addWidget(self.graph_widget)
@@ -319,6 +475,8 @@ class MainWindow(QMainWindow):
         self.fan_speed_label = QLabel("Fan Speed: --%")
         self.power_label = QLabel("Power: -- W")
         self.current_profile_label = QLabel("Current Profile: --")
+        # Last NBFC config reported by `nbfc status`, for the fan editor
+        self.nbfc_profile_name = None
         self.app_version_label = QLabel(f"v{__version__}")
 
         # Add separators between status items (as permanent widgets on right)
@@ -336,29 +494,131 @@ class MainWindow(QMainWindow):
         )
         self.status_bar.addPermanentWidget(self.current_profile_label)
 
+        # Battery runtime, only shown on machines with a battery
+        self.battery_separator = QFrame(frameShape=QFrame.Shape.VLine)
+        self.battery_label = QLabel("Battery: --")
+        self.status_bar.addPermanentWidget(self.battery_separator)
+        self.status_bar.addPermanentWidget(self.battery_label)
+        self.battery_separator.hide()
+        self.battery_label.hide()
+
+    def toggle_tracing(self, checked):
+        """Start or stop recording trace spans"""
+        if checked:
+            tracing.enable()
+        else:
+            tracing.disable()
+
+    def save_trace(self):
+        """Write the recorded spans as Chrome/Perfetto trace JSON"""
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Trace",
+            tracing.default_trace_path(),
+            "Trace JSON (*.json)",
+        )
+        if path:
+            count = tracing.export_chrome_trace(path)
+            self.status_bar.showMessage(f"Saved {count} spans to {path}", 5000)
+
+    def toggle_session_recording(self, checked):
+        """Start or stop recording raw source outputs for a replay"""
+        if checked:
+            if not session_recording.is_recording():
+                self.start_session_recording(
+                    session_recording.default_session_path()
+                )
+        elif session_recording.is_recording():
+            session_recording.stop_recording()
+            self.status_bar.showMessage("Session recording stopped", 5000)
+
+    def start_session_recording(self, path):
+        """Record raw source outputs to path; returns False if it cannot"""
+        try:
+            session_recording.start_recording(path, self.sampler.sensors.paths())
+        except OSError as e:
+            diagnostics.error("session.record", f"Cannot record session: {e}")
+            self.record_session_action.setChecked(False)
+            return False
+        self.record_session_action.setChecked(True)
+        self.status_bar.showMessage(f"Recording session to {path}", 5000)
+        return True
+
+    def start_replay(self, path, speed=1.0):
+        """Drive the window from a recorded session instead of the hardware.
+
+        Live reading stops for good. The replayed samples are not archived,
+        logged or counted into the energy totals, and go into a history of
+        their own, so they cannot mix with real telemetry. Power source and
+        application rules stop reacting to the live machine.
+
+        Raises:
+            OSError, ValueError: The recording cannot be read
+        """
+        self.replay = SessionReplay(path, speed, self)
+        self.refresh_timer.stop()
+        self.sampler.set_paused(True)
+        self.sampler.sample_ready.disconnect(self.telemetry_archive.on_sample)
+        self.sampler.sample_ready.disconnect(self.telemetry_history.on_sample)
+        self.telemetry_history = TelemetryHistory(self.sampler, parent=self)
+        self.combined_graph.history = self.telemetry_history
+        self.energy_monitor.stop()
+        self.power_rules.stop()
+        self.process_watcher.stop()
+        self.set_live_log("")
+        self.sampler.sensors.use_paths(self.replay.context)
+        self.replay.finished.connect(
+            lambda: self.status_bar.showMessage("Replay finished")
+        )
+        self.replay.start(self.update_readings, self.sampler.sample)
+        self.status_bar.showMessage(
+            f"Replaying {os.path.basename(path)} "
+            f"({self.replay.duration():.0f} s at {self.replay.speed:g}x)"
+        )
+
+    @tracing.traced("update_readings", "readings")
     def update_readings(self):
         temperature, fan_speed, current_profile, power = get_system_readings()
 
-        # Update status bar labels
-        self.temp_label.setText(f"Temperature: {temperature}°C")
-        self.fan_speed_label.setText(f"Fan Speed: {fan_speed}%")
-        self.power_label.setText(f"Power: {power} W")
-        self.current_profile_label.setText(
-            f"Current Profile: {current_profile}"
-        )
+        # Update status bar labels, saying why values are missing when
+        # their source is backing off
+        if source_health["nbfc"].is_available():
+            self.temp_label.setText(f"Temperature: {temperature}°C")
+            self.fan_speed_label.setText(f"Fan Speed: {fan_speed}%")
+            self.current_profile_label.setText(
+                f"Current Profile: {current_profile}"
+            )
+            if current_profile and current_profile not in ("--", "n/a"):
+                self.nbfc_profile_name = current_profile
+        else:
+            self.temp_label.setText(f"Temperature: {UNAVAILABLE}")
+            self.fan_speed_label.setText(f"Fan Speed: {UNAVAILABLE}")
+            self.current_profile_label.setText(f"Current Profile: {UNAVAILABLE}")
+        if source_health["sensors"].is_available():
+            self.power_label.setText(f"Power: {power} W")
+        else:
+            self.power_label.setText(f"Power: {UNAVAILABLE}")
 
-        # Update gauges
+        # Update gauge values; they are drawn by render_display
         if fan_speed != "n/a":
             try:
-                self.fan_gauge.set_value(float(fan_speed))
+                self.display_values["fan_speed"] = float(fan_speed)
+                self.telemetry_history.add(
+                    "fan_speed", time.time(), self.display_values["fan_speed"]
+                )
             except (ValueError, TypeError):
-                print(f"Could not convert fan speed to float: {fan_speed}")
+                diagnostics.debug(
+                    "readings.fan_speed",
+                    f"Could not convert fan speed to float: {fan_speed}",
+                )
         
-        if power != "n/a":
+        if power != "n/a" and not self.sample_interval_ms:
             try:
-                self.power_gauge.set_value(float(power))
+                self.display_values["power"] = float(power)
             except (ValueError, TypeError):
-                print(f"Could not convert power to float: {power}")
+                diagnostics.debug(
+                    "readings.power", f"Could not convert power to float: {power}"
+                )
             
         # Update the power gauge max value based on current profile's fast limit
         if hasattr(self, 'profile_manager') and hasattr(self.profile_manager, 'current_profile'):
@@ -367,8 +627,10 @@ class MainWindow(QMainWindow):
                 # Set gauge max to fast limit + 5W buffer
                 self.power_gauge.set_max_value(fast_limit + 5)
 
-        # Update combined graph
-        self.combined_graph.update_data(temperature, fan_speed)
+        # Update combined graph, unless fast sampling feeds it
+        if not self.sample_interval_ms:
+            self.combined_graph.add_reading(temperature, fan_speed)
+        self.display_throttle.request()
 
         # Update tray tooltip
         self.update_tray_tooltip()
@@ -380,13 +642,117 @@ class MainWindow(QMainWindow):
             )
             
 
+    def set_sample_interval(self, interval_ms):
+        """Sample the sysfs sensors every interval_ms (0 turns it off)"""
+        self.sample_interval_ms = interval_ms
+        if interval_ms:
+            self.sampler.request_interval(self, interval_ms)
+            # Keep about a minute of fast samples on the graph
+            self.combined_graph.max_points = max(60, 60000 // interval_ms)
+        else:
+            self.sampler.release(self)
+            self.combined_graph.max_points = 60
+
+    def set_live_log(self, fmt):
+        """Append every sample to the telemetry log ("csv"/"jsonl", "" = off)"""
+        if self.live_export is not None:
+            self.live_export.stop()
+            self.live_export = None
+        if not fmt:
+            return
+        export = LiveExport(self.sampler, default_log_path(fmt), fmt)
+        try:
+            export.start()
+        except OSError as e:
+            diagnostics.error("export.live_open", f"Cannot open telemetry log: {e}")
+            return
+        self.live_export = export
+
+    def on_fast_sample(self, sample):
+        """Buffer a sysfs sample when fast sampling is on"""
+        if not self.sample_interval_ms:
+            return  # Sampled for someone else, e.g. the energy monitor
+        temperature = sample.get("temperature")
+        if temperature is not None:
+            self.combined_graph.add_reading(
+                temperature, self.display_values.get("fan_speed"), sample["time"]
+            )
+        if sample.get("power") is not None:
+            self.display_values["power"] = sample["power"]
+        self.display_throttle.request()
+
+    def render_display(self):
+        """Draw the latest buffered values; called at most MAX_FPS times/s"""
+        if "fan_speed" in self.display_values:
+            self.fan_gauge.set_value(self.display_values["fan_speed"])
+        if "power" in self.display_values:
+            self.power_gauge.set_value(self.display_values["power"])
+        self.combined_graph.render()
+
+    def update_energy_display(self, energy):
+        """Show the runtime estimate and per-profile energy statistics"""
+        battery = energy["battery"]
+        self.battery_separator.setVisible(battery is not None)
+        self.battery_label.setVisible(battery is not None)
+        if battery is None:
+            return
+
+        if energy["runtime_hours"] is not None:
+            text = f"Battery: {format_hours(energy['runtime_hours'])} left"
+        else:
+            text = f"Battery: {battery['status']}"
+        self.battery_label.setText(text)
+
+        lines = ["Energy by TDP profile (package / battery):"]
+        for name, stats in sorted(energy["profiles"].items()):
+            line = f"{name}: {stats['package_wh']:.1f} Wh"
+            if stats["package_avg_w"] is not None:
+                line += f", avg {stats['package_avg_w']:.1f} W"
+            if stats["battery_avg_w"] is not None:
+                line += (
+                    f" / {stats['battery_wh']:.1f} Wh, "
+                    f"avg {stats['battery_avg_w']:.1f} W"
+                )
+            lines.append(line)
+        self.battery_label.setToolTip("\n".join(lines))
+
     def open_settings(self):
         """Open the settings dialog"""
-        dialog = SettingsDialog(self, self.refresh_interval)
+        dialog = SettingsDialog(
+            self,
+            self.refresh_interval,
+            sample_interval_ms=self.sample_interval_ms,
+            antialias=self.combined_graph.antialias,
+            live_log_format=self.live_export.fmt if self.live_export else "",
+            power_rules=self.power_rules.rules,
+            tdp_profiles=[
+                profile["name"]
+                for profile in self.profile_manager.cached_profiles
+            ],
+            fan_profiles=NBFCManager.get_available_configs(),
+        )
         if dialog.exec():
             self.refresh_interval = dialog.get_refresh_interval()
             self.refresh_timer.setInterval(self.refresh_interval * 1000)
-            print(f"Updated refresh interval to {self.refresh_interval} seconds")
+            self.settings.set_value(
+                "monitoring/refresh_interval", self.refresh_interval
+            )
+            diagnostics.info(
+                "settings.refresh_interval",
+                f"Updated refresh interval to {self.refresh_interval} seconds",
+            )
+            self.set_sample_interval(dialog.get_sample_interval())
+            self.settings.set_value(
+                "monitoring/sample_interval_ms", self.sample_interval_ms
+            )
+            self.combined_graph.set_antialias(dialog.get_antialias())
+            self.settings.set_value("display/antialias", dialog.get_antialias())
+            self.display_throttle.request()
+            live_log_format = dialog.get_live_log_format()
+            if live_log_format != (self.live_export.fmt if self.live_export else ""):
+                self.set_live_log(live_log_format)
+            self.settings.set_value("export/live_format", live_log_format)
+            self.power_rules.set_rules(dialog.get_power_rules())
 
     def delayed_fan_setting(self):
         # Cancel previous timer if it exists
@@ -408,53 +774,83 @@ class MainWindow(QMainWindow):
 
     def apply_fan_speed(self):
         slider_value = self.fan_speed_control_slider.value()
+        self.settings.set_value("fan/manual_speed", slider_value)
+        if self.replaying_fan_command(["nbfc", "set", "-s", str(slider_value)]):
+            return
 
         # Create QProcess for non-blocking execution
         process = QProcess(self)
 
         def on_finished(exit_code, exit_status):
-            if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-                print(f"Fan speed set to {slider_value}%")
+            stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
+            success = exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit
+            if success:
+                diagnostics.info("fan.speed", f"Fan speed set to {slider_value}%")
             else:
-                stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
                 error_msg = f"Error setting fan speed (exit code: {exit_code})"
                 if stderr:
                     error_msg += f": {stderr}"
-                print(error_msg)
+                diagnostics.error("fan.speed_failed", error_msg)
+            session_recording.record(
+                "apply_result", target="fan", success=success, message=stderr
+            )
             # Remove from active processes list
             if process in self.active_processes:
                 self.active_processes.remove(process)
 
         process.finished.connect(on_finished)
         self.active_processes.append(process)
+        trace_process(process, "pkexec nbfc set -s")
         process.start("pkexec", ["nbfc", "set", "-s", str(slider_value)])
 
     def set_auto_control(self):
         if self.radio_auto_control.isChecked():
+            self.settings.set_value("fan/mode", "auto")
+            if self.replaying_fan_command(["nbfc", "set", "-a"]):
+                self.update_fan_control_visibility()
+                return
             # Create QProcess for non-blocking execution
             process = QProcess(self)
 
             def on_finished(exit_code, exit_status):
-                if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-                    print("Auto fan control enabled")
+                stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
+                success = exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit
+                if success:
+                    diagnostics.info("fan.auto", "Auto fan control enabled")
                 else:
-                    stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
                     error_msg = f"Error setting automatic fan control (exit code: {exit_code})"
                     if stderr:
                         error_msg += f": {stderr}"
-                    print(error_msg)
+                    diagnostics.error("fan.auto_failed", error_msg)
+                session_recording.record(
+                    "apply_result", target="fan", success=success, message=stderr
+                )
                 # Remove from active processes list
                 if process in self.active_processes:
                     self.active_processes.remove(process)
 
             process.finished.connect(on_finished)
             self.active_processes.append(process)
+            trace_process(process, "pkexec nbfc set -a")
             process.start("pkexec", ["nbfc", "set", "-a"])
 
             self.update_fan_control_visibility()
 
+    def replaying_fan_command(self, command):
+        """Record a fan command; True if a replay answers it instead"""
+        session_recording.record("apply", target="fan", command=command)
+        if session_recording.backend is None:
+            return False
+        success, message = session_recording.backend.apply_result("fan")
+        diagnostics.info(
+            "session.replay_fan",
+            f"Replay: {' '.join(command)} -> {'ok' if success else message}",
+        )
+        return True
+
     def set_manual_control(self):
         if self.radio_manual_control.isChecked():
+            self.settings.set_value("fan/mode", "manual")
             self.update_fan_control_visibility()
 
     def update_fan_control_visibility(self):
@@ -465,22 +861,13 @@ class MainWindow(QMainWindow):
             self.manual_controls_widget.hide()
 
     def open_fan_profile_editor(self):
+        # Don't preselect a config NBFC can't currently confirm
         active_nbfc_profile = None
-        current_profile_text = (
-            self.current_profile_label.text()
-        )  # e.g. "Current Profile: SomeProfileName"
-
-        prefix = "Current Profile: "
-        if current_profile_text.startswith(prefix):
-            profile_name_part = current_profile_text[len(prefix) :].strip()
-            if (
-                profile_name_part
-                and profile_name_part != "--"
-                and profile_name_part != "n/a"
-            ):
-                active_nbfc_profile = profile_name_part
+        if source_health["nbfc"].is_available():
+            active_nbfc_profile = self.nbfc_profile_name
 
         self.fan_editor = FanProfileEditor(
-            current_nbfc_profile_name=active_nbfc_profile
+            current_nbfc_profile_name=active_nbfc_profile,
+            temperature_history=self.combined_graph.get_temperature_trace,
         )
         self.fan_editor.show()
\ No newline at end of file
@@ -0,0 +1,310 @@
+import json
+import math
+import os
+import re
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.app import diagnostics
+
+CONFIG_DIRS = ["/usr/share/nbfc/configs", "/etc/nbfc/configs"]
+CACHE_PATH = os.path.expanduser(
+    "~/.cache/ryzen-master-commander/nbfc_catalog.json"
+)
+CACHE_VERSION = 1
+
+# Minimum similarity for a DMI match to be trusted over `nbfc config -r`
+MIN_RECOMMEND_SCORE = 0.5
+
+
+def _tokenize(text):
+    """Split a model name into lowercase word and number tokens."""
+    return set(re.findall(r"[a-z]+|\d+", text.lower()))
+
+
+def _summarize_config(config):
+    """Extract the catalog metadata from a parsed NBFC config."""
+    fan_configs = config.get("FanConfigurations") or []
+    if not isinstance(fan_configs, list):
+        fan_configs = [fan_configs]
+
+    curve_type = "none"
+    if fan_configs and isinstance(fan_configs[0], dict):
+        if fan_configs[0].get("TemperatureThresholds"):
+            curve_type = "thresholds"
+        elif fan_configs[0].get("FanSpeedPercentageOverrides"):
+            curve_type = "overrides"
+
+    return {
+        "model": str(config.get("NotebookModel", "")),
+        "fan_count": len(fan_configs),
+        "curve_type": curve_type,
+    }
+
+
+def _fuzzy_score(query, key):
+    """Score an in-order subsequence match of query in key, or None.
+
+    Consecutive matching characters score higher, so "winmini" ranks
+    "GPD Win Mini" above models that merely contain the same letters.
+    """
+    score = 0
+    position = 0
+    run = 0
+    for char in query:
+        found = key.find(char, position)
+        if found < 0:
+            return None
+        run = run + 1 if found == position else 0
+        score += 1 + run
+        position = found + 1
+    return score
+
+
+class NBFCCatalog:
+    """Index of the NBFC model configs installed on this system.
+
+    Only metadata (model name, fan count, curve type and file mtime) is
+    kept. It is persisted to a small cache file and refreshed by mtime,
+    so a rescan only parses configs that were added or changed since the
+    last run. Full configs are parsed on demand on a worker thread.
+    """
+
+    def __init__(self, config_dirs=None, cache_path=CACHE_PATH):
+        self.config_dirs = list(config_dirs or CONFIG_DIRS)
+        self.cache_path = cache_path
+        self.entries = {}  # Config name -> metadata dict
+        self._search_keys = {}
+        self._entry_tokens = {}  # Config name -> token set
+        self._token_index = {}  # Token -> config names containing it
+        self._token_weights = {}  # Token -> inverse document frequency
+        self.pending_loads = set()
+        self._load_cache()
+        self.refresh()
+
+    def _load_cache(self):
+        """Read the metadata cache written by a previous run."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION:
+                self.entries = cache.get("entries", {})
+        except (OSError, ValueError) as e:
+            diagnostics.warning(
+                "catalog.cache_read", f"Ignoring unreadable NBFC catalog cache: {e}"
+            )
+
+    def _save_cache(self):
+        """Write the metadata cache atomically."""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(
+                    {"version": CACHE_VERSION, "entries": self.entries}, f
+                )
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            diagnostics.warning(
+                "catalog.cache_write", f"Could not write NBFC catalog cache: {e}"
+            )
+
+    def refresh(self):
+        """Rescan the config directories, parsing only changed files.
+
+        Later directories take precedence, so a config in /etc/nbfc/configs
+        shadows the packaged one of the same name.
+
+        Returns:
+            True if any entry was added, changed or removed
+        """
+        found = {}
+        for directory in self.config_dirs:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.endswith(".json") and entry.is_file():
+                            found[entry.name[:-5]] = (
+                                entry.path,
+                                entry.stat().st_mtime,
+                            )
+            except OSError:
+                continue
+
+        changed = set(self.entries) != set(found)
+        entries = {}
+        for name, (path, mtime) in found.items():
+            cached = self.entries.get(name)
+            if cached and cached["path"] == path and cached["mtime"] == mtime:
+                entries[name] = cached
+                continue
+            try:
+                with open(path, "r") as f:
+                    metadata = _summarize_config(json.load(f))
+            except (OSError, ValueError, AttributeError) as e:
+                diagnostics.warning(
+                    "catalog.config_unreadable",
+                    f"Skipping unreadable NBFC config '{path}': {e}",
+                )
+                metadata = {"model": "", "fan_count": 0, "curve_type": "none"}
+            metadata.update({"path": path, "mtime": mtime})
+            entries[name] = metadata
+            changed = True
+
+        self.entries = entries
+        self._search_keys = {
+            name: (name.lower(), "".join(c for c in name.lower() if c.isalnum()))
+            for name in entries
+        }
+        if changed or not self._entry_tokens:
+            self._build_token_index()
+        if changed:
+            self._save_cache()
+        return changed
+
+    def _build_token_index(self):
+        """Precompute the inverted token index used by recommend()."""
+        self._entry_tokens = {
+            name: _tokenize(f"{name} {entry.get('model', '')}")
+            for name, entry in self.entries.items()
+        }
+        self._token_index = {}
+        for name, tokens in self._entry_tokens.items():
+            for token in tokens:
+                self._token_index.setdefault(token, set()).add(name)
+        total = max(1, len(self._entry_tokens))
+        self._token_weights = {
+            token: math.log(1 + total / len(names))
+            for token, names in self._token_index.items()
+        }
+
+    def recommend(self, identity):
+        """Rank configs by similarity to a DMI identity string.
+
+        Candidates are taken from the inverted token index, so only configs
+        sharing at least one token are scored. The score is a Dice
+        coefficient over IDF-weighted tokens: rare tokens such as model
+        numbers count for much more than vendor names shared by many files.
+
+        Args:
+            identity: Text such as "GPD G1617-01 G1617-01 GPD"
+
+        Returns:
+            List of (config name, score in 0..1), best first
+        """
+        query = _tokenize(identity)
+        candidates = set()
+        for token in query:
+            candidates |= self._token_index.get(token, set())
+        if not candidates:
+            return []
+
+        # Tokens unknown to the catalog carry the highest weight
+        unknown_weight = math.log(1 + max(1, len(self._entry_tokens)))
+        weights = self._token_weights
+        query_weight = sum(weights.get(t, unknown_weight) for t in query)
+
+        ranked = []
+        for name in candidates:
+            tokens = self._entry_tokens[name]
+            shared = sum(weights[t] for t in query & tokens)
+            total = query_weight + sum(weights[t] for t in tokens)
+            ranked.append((name, 2 * shared / total))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked
+
+    def names(self):
+        """Return all config names, sorted."""
+        return sorted(self.entries)
+
+    def path_for(self, name):
+        """Return the file path of a config, or None if unknown."""
+        entry = self.entries.get(name)
+        return entry["path"] if entry else None
+
+    def search(self, query):
+        """Return config names matching query, best matches first.
+
+        Substring matches come first (prefix matches before the rest),
+        followed by fuzzy in-order matches ignoring spaces and punctuation.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.names()
+        compact_query = "".join(c for c in query if c.isalnum())
+
+        ranked = []
+        for name, (key, compact_key) in self._search_keys.items():
+            position = key.find(query)
+            if position >= 0:
+                ranked.append((0, position, len(key), name))
+                continue
+            if compact_query:
+                score = _fuzzy_score(compact_query, compact_key)
+                if score is not None:
+                    ranked.append((1, -score, len(key), name))
+        ranked.sort()
+        return [name for *_, name in ranked]
+
+    def load_config_async(self, name, callback):
+        """Parse a full config on a worker thread.
+
+        Args:
+            name: Config name as returned by names()/search()
+            callback: Function(name, config, error) called on the GUI
+                thread; config is None and error a message on failure
+        """
+        signals = _ConfigLoadSignals()
+        self.pending_loads.add(signals)
+
+        def on_done(loaded_name, config, error):
+            self.pending_loads.discard(signals)
+            callback(loaded_name, config, error)
+
+        signals.done.connect(on_done)
+        QThreadPool.globalInstance().start(
+            _ConfigLoadTask(name, self.path_for(name), signals)
+        )
+
+
+class _ConfigLoadSignals(QObject):
+    done = pyqtSignal(str, object, str)
+
+
+class _ConfigLoadTask(QRunnable):
+    def __init__(self, name, path, signals):
+        super().__init__()
+        self.name = name
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        if not self.path:
+            self.signals.done.emit(self.name, None, "Config not found")
+            return
+        try:
+            with open(self.path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            self.signals.done.emit(self.name, None, str(e))
+            return
+        self.signals.done.emit(self.name, config, "")
+
+
+_catalog = None
+
+
+def get_catalog():
+    """Return the shared catalog, scanned when first used.
+
+    Callers that need to see configs added since then (e.g. a dialog
+    opening) call refresh() on it themselves.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = NBFCCatalog()
+    return _catalog
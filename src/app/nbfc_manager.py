@@ -1,4 +1,3 @@
-import os
 import subprocess
 from PyQt6.QtWidgets import (
     QMessageBox,
@@ -7,9 +6,16 @@ from PyQt6.QtWidgets import (
     QListWidget,
     QPushButton,
     QLabel,
+    QLineEdit,
 )
 from PyQt6.QtCore import QProcess
 
+from src.app import diagnostics
+from src.app.nbfc_catalog import get_catalog, MIN_RECOMMEND_SCORE
+from src.app.source_health import HEALTHY
+from src.app.system_utils import read_dmi_info, read_nbfc_status, source_health
+from src.app.tracing import trace_process
+
 
 class NBFCManager:
     """Class to manage NBFC (Notebook Fan Control) setup and configuration"""
@@ -26,15 +32,21 @@ class NBFCManager:
             return False
 
     @staticmethod
-    def is_nbfc_running():
-        """Check if NBFC service is running"""
-        try:
-            result = subprocess.run(
-                ["nbfc", "status"], capture_output=True, text=True
-            )
-            return "ERROR: connect()" not in result.stderr
-        except Exception:
-            return False
+    def is_nbfc_running(refresh=False):
+        """Check if NBFC service is running.
+
+        This is a view of the nbfc source health kept up to date by the
+        regular readings; nbfc is only queried when nothing is known yet
+        or refresh is set. The daemon counts as running once it has
+        answered, until repeated failures open the circuit: a single
+        failed read (DEGRADED) does not mean it stopped. After a refresh
+        the answer is that of the fresh read.
+        """
+        health = source_health["nbfc"]
+        if refresh or health.state is None:
+            read_nbfc_status(force=True)
+            return health.state == HEALTHY
+        return health.is_available() and health.last_value is not None
 
     @staticmethod
     def is_nbfc_configured():
@@ -70,13 +82,55 @@ class NBFCManager:
             process.deleteLater()
 
         process.finished.connect(on_finished)
+        trace_process(process, "pkexec nbfc update")
         process.start("pkexec", ["nbfc", "update"])
 
         return None
 
     @staticmethod
-    def get_recommended_config():
-        """Get the recommended config for this system"""
+    def get_recommended_candidates(sysfs_root="/sys"):
+        """Rank installed configs against this machine's DMI identity.
+
+        Product and board names are matched separately (each with the
+        vendor) and the better score is kept, since either may carry the
+        marketing name the config files are named after.
+
+        Returns:
+            List of (config name, score in 0..1), best first
+        """
+        dmi = read_dmi_info(sysfs_root)
+        catalog = get_catalog()
+        catalog.refresh()
+        scores = {}
+        for key in ("product_name", "board_name"):
+            if not dmi[key]:
+                continue
+            identity = f"{dmi['sys_vendor']} {dmi[key]}"
+            for name, score in catalog.recommend(identity):
+                scores[name] = max(score, scores.get(name, 0))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    @staticmethod
+    def get_recommended_config(sysfs_root="/sys"):
+        """Get the recommended config for this system.
+
+        Matches DMI data against the local config catalog first and only
+        falls back to `nbfc config -r` (which needs pkexec) when no
+        candidate is close enough.
+        """
+        candidates = NBFCManager.get_recommended_candidates(sysfs_root)
+        if candidates and candidates[0][1] >= MIN_RECOMMEND_SCORE:
+            config_name, score = candidates[0]
+            diagnostics.info(
+                "nbfc.dmi_match",
+                f"Matched config from DMI: {config_name} (score {score:.2f})",
+            )
+            return config_name
+        return NBFCManager.get_recommended_config_from_cli()
+
+    @staticmethod
+    def get_recommended_config_from_cli():
+        """Ask `nbfc config -r` for the recommended config"""
         try:
             result = subprocess.run(
                 ["pkexec", "nbfc", "config", "-r"],
@@ -85,8 +139,7 @@ class NBFCManager:
             )
 
             stdout = result.stdout.strip()
-            # print("NBFC config -r output with pkexec:")
-            # print(repr(stdout))
+            diagnostics.debug("nbfc.recommend_output", repr(stdout))
 
             lines = stdout.split("\n")
             for line in lines:
@@ -103,28 +156,25 @@ class NBFCManager:
 
                     config_name = line.strip()
                     if config_name:
-                        print(f"Found possible config name: {config_name}")
+                        diagnostics.info(
+                            "nbfc.recommend",
+                            f"Found possible config name: {config_name}",
+                        )
                         return config_name
 
-            print("No recommended nbfc config found.")
+            diagnostics.warning("nbfc.recommend", "No recommended nbfc config found.")
             return None
         except Exception as e:
-            print(f"Error while getting recommended config: {str(e)}")
+            diagnostics.error(
+                "nbfc.recommend_failed",
+                f"Error while getting recommended config: {str(e)}",
+            )
             return None
 
     @staticmethod
     def get_available_configs():
         """Get list of all available NBFC configs"""
-        configs = []
-        config_dirs = ["/usr/share/nbfc/configs", "/etc/nbfc/configs"]
-
-        for directory in config_dirs:
-            if os.path.exists(directory):
-                for file in os.listdir(directory):
-                    if file.endswith(".json"):
-                        configs.append(file[:-5])  # Remove .json extension
-
-        return sorted(configs)
+        return get_catalog().names()
 
     @staticmethod
     def set_nbfc_config(config_name, parent=None, callback=None):
@@ -145,6 +195,7 @@ class NBFCManager:
             process.deleteLater()
 
         process.finished.connect(on_finished)
+        trace_process(process, "pkexec nbfc config -s")
         process.start("pkexec", ["nbfc", "config", "-s", config_name])
 
         return None
@@ -161,12 +212,13 @@ class NBFCManager:
 
         def on_finished(exit_code, exit_status):
             # Check if service is actually running after the command
-            success = NBFCManager.is_nbfc_running()
+            success = NBFCManager.is_nbfc_running(refresh=True)
             if callback:
                 callback(success)
             process.deleteLater()
 
         process.finished.connect(on_finished)
+        trace_process(process, "pkexec nbfc start")
         process.start("pkexec", ["nbfc", "start"])
 
         return None
@@ -186,13 +238,17 @@ class NBFCManager:
         # If NBFC is already running, we're good
         if NBFCManager.is_nbfc_running():
             return True
-        print("NBFC is not running, attempting to start it...")
+        diagnostics.info(
+            "nbfc.setup", "NBFC is not running, attempting to start it..."
+        )
 
         # Try to start the service first
         if NBFCManager.start_nbfc_service(parent):
             return True
 
-        print("NBFC service failed to start, checking configuration...")
+        diagnostics.warning(
+            "nbfc.setup", "NBFC service failed to start, checking configuration..."
+        )
         # If still not running, update configs silently
         NBFCManager.update_nbfc_configs()
 
@@ -202,12 +258,15 @@ class NBFCManager:
         if recommended:
             # Apply recommended config silently
             if NBFCManager.set_nbfc_config(recommended):
-                print(f"Applied recommended config: {recommended}")
+                diagnostics.info(
+                    "nbfc.setup_config", f"Applied recommended config: {recommended}"
+                )
                 return NBFCManager.start_nbfc_service()
 
         # Only show dialog if we couldn't find or apply a recommended config
-        print(
-            "No recommended config found or failed to apply, showing selection dialog..."
+        diagnostics.warning(
+            "nbfc.setup_config",
+            "No recommended config found or failed to apply, showing selection dialog...",
         )
         config_dialog = ConfigSelectionDialog(parent)
         if (
@@ -242,14 +301,21 @@ class ConfigSelectionDialog(QDialog):
         instructions.setWordWrap(True)
         layout.addWidget(instructions)
 
+        # Search box filtering the list as you type
+        self.catalog = get_catalog()
+        self.catalog.refresh()
+        self.search_entry = QLineEdit()
+        self.search_entry.setPlaceholderText("Search models...")
+        self.search_entry.setClearButtonEnabled(True)
+        self.search_entry.textChanged.connect(self.filter_configs)
+        layout.addWidget(self.search_entry)
+
         # Config list
         self.config_list = QListWidget()
         layout.addWidget(self.config_list)
 
         # Populate list
-        configs = NBFCManager.get_available_configs()
-        for config in configs:
-            self.config_list.addItem(config)
+        self.filter_configs("")
 
         # Buttons
         button_layout = QVBoxLayout()
@@ -262,6 +328,13 @@ class ConfigSelectionDialog(QDialog):
         button_layout.addWidget(cancel_button)
         layout.addLayout(button_layout)
 
+    def filter_configs(self, query):
+        """Show only the configs matching the search query"""
+        self.config_list.clear()
+        self.config_list.addItems(self.catalog.search(query))
+        if self.config_list.count() > 0:
+            self.config_list.setCurrentRow(0)
+
     def accept_selection(self):
         """Accept the selected configuration"""
         current_item = self.config_list.currentItem()
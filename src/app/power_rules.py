@@ -0,0 +1,257 @@
+import glob
+import os
+import socket
+import time
+
+from PyQt6.QtCore import (
+    QObject,
+    QSocketNotifier,
+    QFileSystemWatcher,
+    QTimer,
+    pyqtSignal,
+)
+
+from src.app import diagnostics
+from src.app.settings_store import get_settings
+from src.app.system_utils import apply_fan_profile
+
+# Netlink protocol number for kernel uevents (linux/netlink.h)
+NETLINK_KOBJECT_UEVENT = 15
+
+
+def read_ac_online(sysfs_root="/sys"):
+    """Return True on external power, False on battery, None if unknown.
+
+    Any mains or USB supply reporting online=1 counts as external power.
+    """
+    states = []
+    pattern = os.path.join(sysfs_root, "class/power_supply/*")
+    for supply in glob.glob(pattern):
+        try:
+            with open(os.path.join(supply, "type")) as f:
+                supply_type = f.read().strip()
+            if supply_type not in ("Mains", "USB"):
+                continue
+            with open(os.path.join(supply, "online")) as f:
+                states.append(f.read().strip() == "1")
+        except OSError:
+            continue
+    if not states:
+        return None
+    return any(states)
+
+
+class PowerRuleEngine:
+    """Decide when to switch profiles for a power source change.
+
+    A new power state must hold for settle_time seconds before it is acted
+    on (hysteresis against flapping chargers), and consecutive switches are
+    at least min_dwell seconds apart. The engine has no timers of its own;
+    update() is fed observations and next_check() says when to call again.
+    """
+
+    def __init__(self, settle_time=5.0, min_dwell=30.0):
+        self.settle_time = settle_time
+        self.min_dwell = min_dwell
+        self.pending_state = None
+        self.pending_since = None
+        self.applied_state = None
+        self.applied_at = None
+
+    def update(self, on_ac, now):
+        """Record an observation and return "ac"/"battery" to apply, or None."""
+        if on_ac is not None and on_ac != self.pending_state:
+            self.pending_state = on_ac
+            self.pending_since = now
+
+        if self.pending_state is None or self.pending_state == self.applied_state:
+            return None
+        if now - self.pending_since < self.settle_time:
+            return None
+        if self.applied_at is not None and now - self.applied_at < self.min_dwell:
+            return None
+
+        self.applied_state = self.pending_state
+        self.applied_at = now
+        return "ac" if self.applied_state else "battery"
+
+    def next_check(self, now):
+        """Seconds until update() could switch, or None if nothing is pending."""
+        if self.pending_state is None or self.pending_state == self.applied_state:
+            return None
+        due = self.pending_since + self.settle_time
+        if self.applied_at is not None:
+            due = max(due, self.applied_at + self.min_dwell)
+        return max(0.0, due - now)
+
+
+class PowerSupplyMonitor(QObject):
+    """Emit ac_changed when the power source changes, without polling.
+
+    Listens to kernel power_supply uevents on a netlink socket. If the
+    socket is unavailable (e.g. in a restricted sandbox) it falls back to
+    watching the supplies' online attributes.
+    """
+
+    ac_changed = pyqtSignal(bool)
+
+    def __init__(self, sysfs_root="/sys", parent=None):
+        super().__init__(parent)
+        self.sysfs_root = sysfs_root
+        self.on_ac = read_ac_online(sysfs_root)
+        self.uevent_socket = None
+        self.notifier = None
+        self.watcher = None
+
+        try:
+            self.uevent_socket = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT
+            )
+            self.uevent_socket.bind((0, 1))  # Kernel uevent multicast group
+            self.uevent_socket.setblocking(False)
+            self.notifier = QSocketNotifier(
+                self.uevent_socket.fileno(), QSocketNotifier.Type.Read, self
+            )
+            self.notifier.activated.connect(self._on_uevent)
+        except (AttributeError, OSError) as e:
+            diagnostics.warning(
+                "power.uevents", f"Power supply uevents unavailable ({e}), watching sysfs"
+            )
+            self.uevent_socket = None
+            online_files = glob.glob(
+                os.path.join(sysfs_root, "class/power_supply/*/online")
+            )
+            if online_files:
+                self.watcher = QFileSystemWatcher(online_files, self)
+                self.watcher.fileChanged.connect(self.check)
+
+    def _on_uevent(self, *args):
+        """Drain pending uevents and re-read state on power_supply events."""
+        relevant = False
+        while True:
+            try:
+                message = self.uevent_socket.recv(16384)
+            except BlockingIOError:
+                break
+            except OSError:
+                break
+            if b"SUBSYSTEM=power_supply" in message:
+                relevant = True
+        if relevant:
+            self.check()
+
+    def check(self, *args):
+        """Re-read the power source and emit ac_changed if it changed."""
+        on_ac = read_ac_online(self.sysfs_root)
+        if on_ac is not None and on_ac != self.on_ac:
+            self.on_ac = on_ac
+            self.ac_changed.emit(on_ac)
+
+    def close(self):
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+        if self.uevent_socket is not None:
+            self.uevent_socket.close()
+            self.uevent_socket = None
+
+
+class PowerRuleController(QObject):
+    """Apply TDP and fan profiles bound to AC and battery power.
+
+    Rules are stored in QSettings under power_rules/ and applied through
+    ProfileManager (TDP) and apply_fan_profile (NBFC).
+    """
+
+    def __init__(self, profile_manager, parent=None, sysfs_root="/sys"):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self.settings = get_settings()
+        self.rules = self.load_rules()
+        self.engine = PowerRuleEngine(
+            settle_time=self.settings.value(
+                "power_rules/settle_time", 5.0, type=float
+            ),
+            min_dwell=self.settings.value(
+                "power_rules/min_dwell", 30.0, type=float
+            ),
+        )
+
+        self.recheck_timer = QTimer(self)
+        self.recheck_timer.setSingleShot(True)
+        self.recheck_timer.timeout.connect(self.evaluate)
+
+        self.stopped = False
+        self.monitor = PowerSupplyMonitor(sysfs_root, self)
+        self.monitor.ac_changed.connect(self.evaluate)
+
+        # Apply the rule for the source we start on once it has settled
+        self.evaluate()
+
+    def load_rules(self):
+        """Read the rules as {"ac"/"battery": {"tdp_profile", "fan_profile"}}."""
+        rules = {}
+        for state in ("ac", "battery"):
+            rules[state] = {
+                "tdp_profile": self.settings.value(
+                    f"power_rules/{state}_tdp_profile", "", type=str
+                ),
+                "fan_profile": self.settings.value(
+                    f"power_rules/{state}_fan_profile", "", type=str
+                ),
+            }
+        return rules
+
+    def set_rules(self, rules):
+        """Replace and persist the rules, then apply them to the current state."""
+        if rules == self.rules:
+            return
+        self.rules = rules
+        for state, rule in rules.items():
+            for key in ("tdp_profile", "fan_profile"):
+                self.settings.set_value(
+                    f"power_rules/{state}_{key}", rule.get(key, "")
+                )
+        # New rules take effect right away, without waiting out the dwell
+        self.engine.applied_state = None
+        self.engine.applied_at = None
+        self.evaluate()
+
+    def enabled(self):
+        return any(
+            rule["tdp_profile"] or rule["fan_profile"]
+            for rule in self.rules.values()
+        )
+
+    def evaluate(self, *args):
+        """Feed the current power state to the engine and apply if due."""
+        if self.stopped or not self.enabled():
+            return
+        now = time.monotonic()
+        state = self.engine.update(self.monitor.on_ac, now)
+        if state is not None:
+            self.apply_rule(state)
+
+        delay = self.engine.next_check(now)
+        if delay is not None:
+            self.recheck_timer.start(int(delay * 1000) + 50)
+
+    def apply_rule(self, state):
+        """Apply the profiles bound to the given power state."""
+        rule = self.rules.get(state, {})
+        diagnostics.info(
+            "power.rule", f"Power source is now {state}, applying rule {rule}"
+        )
+        if rule.get("tdp_profile"):
+            # Both at once go through one transaction with rollback
+            if self.profile_manager.apply_profile_by_name(
+                rule["tdp_profile"], fan_profile=rule.get("fan_profile") or None
+            ):
+                return
+        if rule.get("fan_profile"):
+            apply_fan_profile(rule["fan_profile"], parent=self)
+
+    def stop(self):
+        """Stop applying rules for good; set_rules still persists them."""
+        self.stopped = True
+        self.recheck_timer.stop()
+        self.monitor.close()
@@ -0,0 +1,264 @@
+import os
+import re
+
+from PyQt6.QtCore import QObject, QSocketNotifier, QTimer
+
+from src.app import diagnostics
+
+
+def required_literal(pattern):
+    """Return a literal substring every match of pattern must contain.
+
+    This is a conservative scan of the pattern text: the longest run of
+    plain characters outside classes and groups, minus any character made
+    optional by a following quantifier. Patterns with a top-level
+    alternation return "" (no prefilter possible).
+    """
+    literals = [""]
+    run = ""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if escaped.isalnum():
+                literals.append(run)  # Character class such as \d or \b
+                run = ""
+            elif depth == 0:
+                run += escaped
+            i += 2
+            continue
+        if char in "*?{":
+            literals.append(run[:-1])  # Previous character may be absent
+            run = ""
+            if char == "{":
+                close = pattern.find("}", i)
+                i = close if close > 0 else i
+        elif char == "[":
+            literals.append(run)
+            run = ""
+            close = pattern.find("]", i + 2)
+            i = close if close > 0 else len(pattern)
+        elif char == "|" and depth == 0:
+            return ""
+        elif char in "().^$+|":
+            literals.append(run)
+            run = ""
+            depth += {"(": 1, ")": -1}.get(char, 0)
+        elif depth == 0:
+            run += char
+        i += 1
+    literals.append(run)
+    return max(literals, key=len)
+
+
+class ProcessRules:
+    """Process-to-profile rules compiled once from the TDP profiles.
+
+    A profile opts in with "match-exe" (a list of executable names) and/or
+    "match-cmdline" (a regular expression searched in the command line).
+    Executable names go into one dict, so they cost one lookup per
+    candidate name whatever the rule count. Each command line pattern is
+    compiled once and only run when its required literal occurs in the
+    command line, which rules out almost all patterns with a fast
+    substring test.
+    """
+
+    def __init__(self, profiles):
+        self.exe_rules = {}
+        self.cmdline_rules = []  # (literal, compiled pattern, profile name)
+        for profile in profiles:
+            for exe in profile.get("match-exe", []) or []:
+                self.exe_rules.setdefault(exe.lower(), profile["name"])
+            pattern = profile.get("match-cmdline")
+            if pattern:
+                try:
+                    regex = re.compile(pattern)
+                except re.error as e:
+                    diagnostics.warning(
+                        "rules.bad_cmdline",
+                        f"Ignoring bad match-cmdline in '{profile['name']}': {e}",
+                    )
+                    continue
+                literal = required_literal(pattern).lower()
+                self.cmdline_rules.append((literal, regex, profile["name"]))
+
+    def __bool__(self):
+        return bool(self.exe_rules) or bool(self.cmdline_rules)
+
+    def match(self, names, cmdline):
+        """Return the profile name for a process, or None.
+
+        Args:
+            names: Candidate executable names (comm, exe and argv[0] basenames)
+            cmdline: The command line with arguments joined by spaces
+        """
+        for name in names:
+            profile = self.exe_rules.get(name.lower())
+            if profile:
+                return profile
+        if self.cmdline_rules:
+            folded = cmdline.lower()
+            for literal, regex, profile in self.cmdline_rules:
+                if literal in folded and regex.search(cmdline):
+                    return profile
+        return None
+
+
+def read_process_identity(pid, proc_root="/proc"):
+    """Read the candidate names and command line of a process.
+
+    Returns:
+        Tuple of (names, cmdline), or None if the process is gone
+    """
+    base = os.path.join(proc_root, str(pid))
+    try:
+        with open(os.path.join(base, "cmdline"), "rb") as f:
+            argv = f.read().split(b"\0")
+        with open(os.path.join(base, "comm"), "rb") as f:
+            comm = f.read().strip().decode("utf-8", errors="ignore")
+    except OSError:
+        return None
+
+    argv = [arg.decode("utf-8", errors="ignore") for arg in argv if arg]
+    names = {comm}
+    if argv:
+        # Wine/Proton games show up as Z:\path\game.exe in argv[0]
+        names.add(re.split(r"[\\/]", argv[0])[-1])
+    try:
+        names.add(os.path.basename(os.readlink(os.path.join(base, "exe"))))
+    except OSError:
+        pass  # Other users' processes and kernel threads
+    return names, " ".join(argv)
+
+
+class ProcessWatcher(QObject):
+    """Apply a TDP profile while a matching application runs.
+
+    Each scan lists /proc but only inspects PIDs not seen before, so the
+    cost of a scan follows the number of newly started processes rather
+    than the total. Exits of matched processes are reported by a pidfd
+    where the kernel supports it, and by the next scan otherwise. When the
+    last matched process exits, the settings from before the first match
+    are restored.
+    """
+
+    def __init__(
+        self, profile_manager, parent=None, proc_root="/proc", interval=2000
+    ):
+        super().__init__(parent)
+        self.profile_manager = profile_manager
+        self.proc_root = proc_root
+        self.rules = ProcessRules([])
+        self.known_pids = set()
+        self.matched = {}  # PID -> profile name, in launch order
+        self.exit_notifiers = {}  # PID -> (pidfd, QSocketNotifier)
+        self.baseline = None
+        self.active_profile = None
+        self.stopped = False
+
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setInterval(interval)
+        self.scan_timer.timeout.connect(self.scan)
+
+    def set_profiles(self, profiles):
+        """Recompile the rules; start or stop scanning as needed.
+
+        Processes matched by the old rules are checked against the new
+        ones, so a deleted or renamed rule stops applying right away.
+        """
+        self.rules = ProcessRules(profiles)
+        if self.stopped:
+            return
+        for pid in list(self.matched):
+            identity = read_process_identity(pid, self.proc_root)
+            profile = self.rules.match(*identity) if identity else None
+            if profile:
+                self.matched[pid] = profile
+            else:
+                self._forget(pid)
+        self.known_pids = set()  # Re-check running processes once
+        if self.rules:
+            if not self.scan_timer.isActive():
+                self.scan_timer.start()
+            self.scan()
+        else:
+            self.scan_timer.stop()
+            self._update_active_profile()
+
+    def scan(self):
+        """Inspect processes started since the last scan."""
+        try:
+            current = {
+                int(p) for p in os.listdir(self.proc_root) if p.isdigit()
+            }
+        except OSError as e:
+            diagnostics.error("rules.scan", f"Could not list processes: {e}")
+            return
+
+        for pid in current - self.known_pids:
+            identity = read_process_identity(pid, self.proc_root)
+            if identity is None:
+                continue
+            profile = self.rules.match(*identity)
+            if profile and pid not in self.matched:
+                self.matched[pid] = profile
+                self._watch_exit(pid)
+
+        for pid in [pid for pid in self.matched if pid not in current]:
+            self._forget(pid)
+
+        self.known_pids = current
+        self._update_active_profile()
+
+    def _watch_exit(self, pid):
+        """Get notified immediately when a matched process exits."""
+        if not hasattr(os, "pidfd_open"):
+            return
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            return
+        notifier = QSocketNotifier(pidfd, QSocketNotifier.Type.Read, self)
+        notifier.activated.connect(lambda *args, pid=pid: self._on_exit(pid))
+        self.exit_notifiers[pid] = (pidfd, notifier)
+
+    def _on_exit(self, pid):
+        self._forget(pid)
+        self._update_active_profile()
+
+    def _forget(self, pid):
+        self.matched.pop(pid, None)
+        watch = self.exit_notifiers.pop(pid, None)
+        if watch:
+            pidfd, notifier = watch
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+            os.close(pidfd)
+
+    def _update_active_profile(self):
+        """Apply the most recently launched match, or restore the baseline."""
+        wanted = list(self.matched.values())[-1] if self.matched else None
+        if wanted == self.active_profile:
+            return
+
+        if wanted is not None:
+            if self.active_profile is None:
+                self.baseline = self.profile_manager.current_settings()
+            diagnostics.info("rules.activate", f"Application profile '{wanted}' activated")
+            self.profile_manager.apply_profile_by_name(wanted)
+        elif self.baseline is not None:
+            diagnostics.info(
+                "rules.restore", "Matched applications exited, restoring previous settings"
+            )
+            self.profile_manager.apply_settings(self.baseline)
+            self.baseline = None
+        self.active_profile = wanted
+
+    def stop(self):
+        """Stop watching for good; later rule changes are only stored."""
+        self.stopped = True
+        self.scan_timer.stop()
+        for pid in list(self.exit_notifiers):
+            self._forget(pid)
@@ -13,13 +13,25 @@ from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
 )
-from PyQt6.QtCore import pyqtSlot, Qt, QProcess, QSettings
+from PyQt6.QtCore import pyqtSlot, Qt
+
+from src.app import diagnostics
+from src.app.system_utils import (
+    TdpApplier,
+    ProfileTransaction,
+    install_files,
+    is_combined_profile,
+)
+from src.app.profile_store import ProfileStore
+from src.app.settings_store import get_settings
+from src.app.thermal_governor import GovernorRunner, ThermalGovernor
 
-from src.app.system_utils import apply_tdp_settings
+# Lowest sustained power limit the governor uses unless a profile sets one
+DEFAULT_GOVERNOR_MIN_LIMIT = 5
 
 
 class ProfileManager:
-    def __init__(self):
+    def __init__(self, sampler=None):
         # Check multiple potential profile directories
         potential_dirs = [
             "./tdp_profiles",  # Development location
@@ -42,16 +54,31 @@ class ProfileManager:
         if not self.profiles_directory:
             self.profiles_directory = "./tdp_profiles"
 
-        print(f"Using profiles from: {self.profiles_directory}")
+        diagnostics.info(
+            "profiles.directory", f"Using profiles from: {self.profiles_directory}"
+        )
 
         self.current_profile = None
+        # Name the running settings are accounted under (see save_tdp_settings)
+        self.active_profile_name = "Custom"
+        self.sampler = sampler
+        self.governor_runner = None
+        # Fan config to apply along with the next selected profile
+        self.fan_profile_override = None
+        self.profile_store = ProfileStore(self.profiles_directory)
         self.cached_profiles = self.load_profiles()
+        diagnostics.info(
+            "profiles.loaded", f"Loaded {len(self.cached_profiles)} profiles"
+        )
+        self.profile_store.profiles_changed.connect(self.on_profiles_changed)
 
         # Initialize settings for persisting TDP values
-        self.settings = QSettings("MerryThieves", "RyzenMasterCommander")
+        self.settings = get_settings()
 
     def create_widgets(self, parent):
         self.parent = parent
+        self.tdp_applier = TdpApplier(parent)
+        self.profile_transaction = ProfileTransaction(self.tdp_applier, parent)
         layout = parent.layout()
 
         # Main TDP settings - SIDE BY SIDE in a HBox
@@ -122,6 +149,32 @@ class ProfileManager:
         apu_skin_temp_layout.addWidget(self.apu_skin_temp_entry)
         advanced_content_layout.addLayout(apu_skin_temp_layout)
 
+        # Thermal governor: steer the avg power limit to hold a temperature
+        governor_layout = QHBoxLayout()
+        self.governor_var = QCheckBox("Hold Temperature (°C):")
+        self.governor_var.setToolTip(
+            "Continuously adjust Avg Power between the profile's bounds "
+            "(up to Boost Power) to hold this CPU temperature"
+        )
+        self.governor_var.stateChanged.connect(self.update_governor)
+        governor_layout.addWidget(self.governor_var)
+        self.governor_target_entry = QLineEdit("80")
+        self.governor_target_entry.editingFinished.connect(self.update_governor)
+        governor_layout.addWidget(self.governor_target_entry)
+        advanced_content_layout.addLayout(governor_layout)
+        self.governor_status_label = QLabel("")
+        self.governor_status_label.hide()
+        advanced_content_layout.addWidget(self.governor_status_label)
+        if self.sampler is not None:
+            self.governor_runner = GovernorRunner(
+                self.sampler, self.apply_governor_limit, parent
+            )
+            self.governor_runner.status_changed.connect(
+                self.on_governor_status
+            )
+        else:
+            self.governor_var.setEnabled(False)
+
         # Performance options
         performance_group = QGroupBox("Performance Mode")
         performance_layout = QHBoxLayout(performance_group)
@@ -190,6 +243,12 @@ class ProfileManager:
         self.profile_dropdown.currentIndexChanged.connect(self.on_profile_select)
         profile_selection_layout.addWidget(self.profile_dropdown)
         profile_content_layout.addLayout(profile_selection_layout)
+
+        # Outcome and latency of combined TDP + fan profiles
+        self.apply_status_label = QLabel("")
+        self.apply_status_label.setWordWrap(True)
+        self.apply_status_label.hide()
+        profile_content_layout.addWidget(self.apply_status_label)
         
         # Save profile button
         save_profile_button = QPushButton("Save Current Settings as Profile")
@@ -244,23 +303,30 @@ class ProfileManager:
                     "fast-limit": int(self.fast_limit_entry.text()),
                     "slow-limit": int(self.slow_limit_entry.text()),
                 }
-                apply_tdp_settings(basic_profile, parent=self.parent)
-                print("Auto-applied basic TDP settings")
+                self.tdp_applier.apply(basic_profile, force=True)
+                diagnostics.debug("tdp.auto_apply", "Auto-applied basic TDP settings")
+                self.update_governor()
 
                 # Save settings for auto-restore on next startup
                 self.save_tdp_settings(basic_profile)
             except (ValueError, TypeError) as e:
-                print(f"Error auto-applying settings: {e}")
+                diagnostics.warning(
+                    "tdp.auto_apply", f"Error auto-applying settings: {e}"
+                )
 
     def save_tdp_settings(self, profile):
         """Save TDP settings to persistent storage"""
+        self.active_profile_name = profile.get("name", "Custom")
         try:
-            self.settings.setValue("tdp/fast_limit", profile.get("fast-limit"))
-            self.settings.setValue("tdp/slow_limit", profile.get("slow-limit"))
-            self.settings.sync()
-            print(f"Saved TDP settings: Fast={profile.get('fast-limit')}W, Slow={profile.get('slow-limit')}W")
+            self.settings.set_value("tdp/fast_limit", profile.get("fast-limit"))
+            self.settings.set_value("tdp/slow_limit", profile.get("slow-limit"))
+            diagnostics.debug(
+                "tdp.saved",
+                f"Saved TDP settings: Fast={profile.get('fast-limit')}W, "
+                f"Slow={profile.get('slow-limit')}W",
+            )
         except Exception as e:
-            print(f"Error saving TDP settings: {e}")
+            diagnostics.error("tdp.saved", f"Error saving TDP settings: {e}")
 
     def restore_tdp_settings(self):
         """Restore and apply saved TDP settings on startup"""
@@ -278,14 +344,17 @@ class ProfileManager:
                     "fast-limit": fast_limit,
                     "slow-limit": slow_limit,
                 }
-                apply_tdp_settings(basic_profile, parent=self.parent)
-                print(f"Restored and applied TDP settings: Fast={fast_limit}W, Slow={slow_limit}W")
+                self.tdp_applier.apply(basic_profile, force=True)
+                diagnostics.info(
+                    "tdp.restore",
+                    f"Restored and applied TDP settings: Fast={fast_limit}W, Slow={slow_limit}W",
+                )
                 return True
             else:
-                print("No saved TDP settings found")
+                diagnostics.info("tdp.restore", "No saved TDP settings found")
                 return False
         except Exception as e:
-            print(f"Error restoring TDP settings: {e}")
+            diagnostics.error("tdp.restore_failed", f"Error restoring TDP settings: {e}")
             return False
 
     def apply_current_settings(self, include_advanced=False):
@@ -308,52 +377,21 @@ class ProfileManager:
                 })
 
             # Apply the settings
-            apply_tdp_settings(profile, parent=self.parent)
+            self.tdp_applier.apply(profile, force=True)
+            self.update_governor()
 
             # Save basic settings (fast/slow limits) for auto-restore
             self.save_tdp_settings(profile)
         except (ValueError, TypeError) as e:
-            print(f"Error applying settings: {e}")
+            diagnostics.error("tdp.invalid", f"Error applying settings: {e}")
 
     def load_profiles(self):
-        profiles = []
-        if not os.path.exists(self.profiles_directory):
-            os.makedirs(self.profiles_directory)
-            print(f"Created profiles directory: {self.profiles_directory}")
-
-        # Debug: list all files in the directory
-        files = os.listdir(self.profiles_directory)
-        print(f"Found {len(files)} files in profiles directory: {files}")
-
-        for file in files:
-            if file.endswith(".json"):
-                file_path = os.path.join(self.profiles_directory, file)
-                try:
-                    with open(file_path, "r") as f:
-                        file_content = f.read()
-                        profile = json.loads(file_content)
-
-                        # Validate profile has required fields
-                        if "name" not in profile:
-                            print(
-                                f"Warning: Profile '{file}' missing required 'name' field"
-                            )
-                            profile["name"] = os.path.splitext(file)[
-                                0
-                            ]  # Use filename as name
-
-                        profiles.append(profile)
-                        print(
-                            f"Successfully loaded profile: {profile['name']}"
-                        )
-                except json.JSONDecodeError as e:
-                    print(f"Error loading profile '{file}': {e}")
-                    print(f"Content causing error: {file_content[:100]}...")
-                except Exception as e:
-                    print(f"Unexpected error loading profile '{file}': {e}")
-
-        print(f"Loaded {len(profiles)} profiles total")
-        return profiles  # Return the loaded profiles
+        """Refresh the profile store and return all profiles.
+
+        Only files added or modified since the last call are parsed.
+        """
+        self.profile_store.refresh()
+        return self.profile_store.profiles()
 
     def update_profile_dropdown(self):
         if self.cached_profiles:
@@ -368,17 +406,51 @@ class ProfileManager:
             ):
                 self.profile_dropdown.setCurrentIndex(0)
 
+    def on_profiles_changed(self, added, removed, changed):
+        """Patch the dropdown for profiles changed on disk.
+
+        Items are inserted and removed in place with signals blocked, so
+        the selection (and the applied profile) is left alone.
+        """
+        self.cached_profiles = self.profile_store.profiles()
+        if not hasattr(self, "profile_dropdown"):
+            return
+
+        self.profile_dropdown.blockSignals(True)
+        for name in removed:
+            if name in added:
+                continue
+            index = self.profile_dropdown.findText(name)
+            if index >= 0:
+                self.profile_dropdown.removeItem(index)
+        for name in added:
+            if self.profile_dropdown.findText(name) >= 0:
+                continue
+            names = [profile["name"] for profile in self.cached_profiles]
+            self.profile_dropdown.insertItem(names.index(name), name)
+        self.profile_dropdown.blockSignals(False)
+
+        # Keep the in-memory copy of the active profile up to date
+        if self.current_profile and self.current_profile["name"] in changed:
+            self.current_profile = self.profile_store.get(
+                self.current_profile["name"]
+            )
+
     # Fixed method to properly handle the signal
     def on_profile_select(self, index):
         """Handle profile selection from dropdown"""
-        if (
-            index < 0
-            or not self.cached_profiles
-            or index >= len(self.cached_profiles)
-        ):
+        if index < 0:
             return
 
-        selected_profile = self.cached_profiles[index]
+        selected_profile = self.profile_store.get(
+            self.profile_dropdown.itemText(index)
+        )
+        if selected_profile is None:
+            return
+        if self.fan_profile_override:
+            selected_profile = dict(
+                selected_profile, **{"fan-profile": self.fan_profile_override}
+            )
         self.current_profile = selected_profile
 
         # Update the entries with profile values
@@ -394,105 +466,190 @@ class ProfileManager:
         )
         self.power_saving_var.setChecked(self.current_profile["power-saving"])
 
-        # Apply the profile
-        apply_tdp_settings(self.current_profile, parent=self.parent)
+        # Apply the profile, then let the governor take over if it asks for it
+        if is_combined_profile(self.current_profile):
+            self.profile_transaction.apply(
+                self.current_profile, self.on_transaction_done
+            )
+        else:
+            self.tdp_applier.apply(self.current_profile, force=True)
+        self.governor_var.blockSignals(True)
+        target = self.current_profile.get("governor-target-temp")
+        if target:
+            self.governor_target_entry.setText(str(target))
+        self.governor_var.setChecked(bool(target) and self.governor_var.isEnabled())
+        self.governor_var.blockSignals(False)
+        self.update_governor()
 
         # Save basic settings for auto-restore
         self.save_tdp_settings(self.current_profile)
 
-    def save_profile(self):
-        profile_name, ok = QInputDialog.getText(
-            self.parent, "Save Profile", "Enter profile name:"
-        )
+    def apply_profile_by_name(self, name, fan_profile=None):
+        """Select and apply a profile by name, as if picked in the dropdown
 
-        if ok and profile_name:
-            profile = {
-                "name": profile_name,
+        Args:
+            name: TDP profile name
+            fan_profile: Optional NBFC config applied in the same transaction
+        """
+        index = self.profile_dropdown.findText(name)
+        if index < 0:
+            diagnostics.warning("profiles.missing", f"Profile '{name}' not found")
+            return False
+        self.fan_profile_override = fan_profile
+        try:
+            if index == self.profile_dropdown.currentIndex():
+                self.on_profile_select(index)
+            else:
+                self.profile_dropdown.setCurrentIndex(index)
+        finally:
+            self.fan_profile_override = None
+        return True
+
+    def on_transaction_done(self, success, message):
+        """Show the outcome and latency of a combined profile"""
+        self.show_status(success, message)
+
+    def show_status(self, success, message):
+        """Show a message below the profile controls, in red on failure"""
+        self.apply_status_label.setText(message)
+        self.apply_status_label.setStyleSheet("" if success else "color: #d9534f;")
+        self.apply_status_label.show()
+
+    @staticmethod
+    def _entry_number(entry, label, default=None, parse=int):
+        """Parse a number field; empty gives default when there is one"""
+        text = entry.text().strip()
+        if not text and default is not None:
+            return default
+        try:
+            return parse(text)
+        except ValueError:
+            raise ValueError(f"{label} must be a number, not '{text}'") from None
+
+    def current_settings(self):
+        """Return the active profile, or the basic limits if none is selected"""
+        if self.current_profile:
+            return self.current_profile
+        try:
+            return {
                 "fast-limit": int(self.fast_limit_entry.text()),
                 "slow-limit": int(self.slow_limit_entry.text()),
+            }
+        except ValueError:
+            return None
+
+    def apply_settings(self, profile):
+        """Apply settings captured by current_settings()"""
+        if "name" in profile and self.apply_profile_by_name(profile["name"]):
+            return
+        self.fast_limit_entry.setText(str(profile["fast-limit"]))
+        self.slow_limit_entry.setText(str(profile["slow-limit"]))
+        self.tdp_applier.apply(profile, force=True)
+        self.save_tdp_settings(profile)
+        self.update_governor()
+
+    def update_governor(self, *args):
+        """Start, retune or stop the thermal governor from the UI state.
+
+        The governor starts from the entered avg power limit and may move
+        it between the profile's "governor-min-slow-limit" (default 5 W)
+        and "governor-max-slow-limit" (default: the boost limit). When it
+        stops, the entered avg power limit is applied again.
+        """
+        if self.governor_runner is None:
+            return
+        if not self.governor_var.isChecked():
+            if self.governor_runner.is_running():
+                self.governor_runner.stop()
+                try:
+                    self.tdp_applier.apply(
+                        {"slow-limit": int(self.slow_limit_entry.text())}
+                    )
+                except ValueError:
+                    pass
+            return
+
+        try:
+            target = float(self.governor_target_entry.text())
+            slow_limit = int(self.slow_limit_entry.text())
+            fast_limit = int(self.fast_limit_entry.text())
+        except ValueError as e:
+            diagnostics.error("governor.invalid", f"Cannot start thermal governor: {e}")
+            return
+
+        profile = self.current_profile or {}
+        max_limit = profile.get("governor-max-slow-limit", fast_limit)
+        min_limit = min(
+            max_limit,
+            profile.get("governor-min-slow-limit", DEFAULT_GOVERNOR_MIN_LIMIT),
+        )
+        self.governor_runner.start(
+            ThermalGovernor(target, min_limit, max_limit, start_limit=slow_limit)
+        )
+
+    def apply_governor_limit(self, limit):
+        """Apply a slow-limit chosen by the governor, skipping no-op calls"""
+        self.tdp_applier.apply({"slow-limit": limit})
+
+    def on_governor_status(self, status):
+        self.governor_status_label.setText(status)
+        self.governor_status_label.setVisible(bool(status))
+
+    def save_profile(self):
+        try:
+            profile = {
+                "fast-limit": self._entry_number(self.fast_limit_entry, "Fast limit"),
+                "slow-limit": self._entry_number(self.slow_limit_entry, "Slow limit"),
                 # Include advanced settings if they're set
-                "slow-time": int(self.slow_time_entry.text()) if self.slow_time_entry.text() else 0,
-                "tctl-temp": int(self.tctl_temp_entry.text()) if self.tctl_temp_entry.text() else 0,
-                "apu-skin-temp": int(self.apu_skin_temp_entry.text()) if self.apu_skin_temp_entry.text() else 0,
+                "slow-time": self._entry_number(self.slow_time_entry, "Slow time", 0),
+                "tctl-temp": self._entry_number(self.tctl_temp_entry, "Tctl temp", 0),
+                "apu-skin-temp": self._entry_number(
+                    self.apu_skin_temp_entry, "APU skin temp", 0
+                ),
                 "max-performance": self.max_performance_var.isChecked(),
                 "power-saving": self.power_saving_var.isChecked(),
             }
+            if self.governor_var.isChecked():
+                # Parsed like update_governor does, so 80.5 is fine
+                profile["governor-target-temp"] = self._entry_number(
+                    self.governor_target_entry, "Target temperature", parse=float
+                )
+        except ValueError as e:
+            self.show_status(False, f"Profile not saved: {e}")
+            return
+
+        profile_name, ok = QInputDialog.getText(
+            self.parent, "Save Profile", "Enter profile name:"
+        )
+
+        if ok and profile_name:
+            profile = {"name": profile_name, **profile}
 
             # Profile file path
             profile_path = os.path.join(self.profiles_directory, f"{profile_name}.json")
-            
-            # Try to save using a helper script with elevated privileges
-            try:
-                # First attempt to save directly - this works for user directories
-                self.save_profile_with_privileges(profile, profile_path)
-                
-                # Update cached profiles
-                self.cached_profiles = self.load_profiles()
 
-                # Update dropdown with new profile
-                self.update_profile_dropdown()
+            def on_installed(results):
+                _, error = results[0]
+                if error:
+                    from PyQt6.QtWidgets import QMessageBox
+                    QMessageBox.critical(
+                        self.parent,
+                        "Error Saving Profile",
+                        f"Failed to save profile: {error}\n\nMake sure you have permission to write to {self.profiles_directory}"
+                    )
+                    return
+
+                # Pick up the new file; the dropdown is patched in place
+                self.load_profiles()
 
                 # Select the new profile
                 index = self.profile_dropdown.findText(profile_name)
                 if index >= 0:
                     self.profile_dropdown.setCurrentIndex(index)
-                    
-            except Exception as e:
-                print(f"Error saving profile: {e}")
-                from PyQt6.QtWidgets import QMessageBox
-                QMessageBox.critical(
-                    self.parent,
-                    "Error Saving Profile",
-                    f"Failed to save profile: {e}\n\nMake sure you have permission to write to {self.profiles_directory}"
-                )
 
-    def save_profile_with_privileges(self, profile, profile_path):
-        """Save profile with elevated privileges if needed"""
-        try:
-            # First try to save directly
-            with open(profile_path, "w") as f:
-                json.dump(profile, f, indent=2)
-                print(f"Saved profile to {profile_path}")
-        except PermissionError:
-            # If permission denied, use pkexec
-            print(f"Permission denied, trying with elevated privileges...")
-
-            # Create a temporary file in /tmp (which should be writable)
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                temp_path = temp_file.name
-                json.dump(profile, temp_file, indent=2)
-
-            # Create QProcess for non-blocking execution with parent to prevent GC
-            process = QProcess(self.parent)
-
-            def on_cp_finished(exit_code, exit_status):
-                if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-                    # Now set permissions
-                    chmod_process = QProcess(self.parent)
-
-                    def on_chmod_finished(chmod_exit_code, chmod_exit_status):
-                        if chmod_exit_code == 0 and chmod_exit_status == QProcess.ExitStatus.NormalExit:
-                            print(f"Successfully saved profile with elevated privileges")
-                            # Clean up temp file
-                            os.unlink(temp_path)
-                        else:
-                            print(f"Failed to set permissions on {profile_path}")
-                            os.unlink(temp_path)
-                        # Clean up processes
-                        chmod_process.deleteLater()
-
-                    chmod_process.finished.connect(on_chmod_finished)
-                    chmod_process.start("pkexec", ["chmod", "644", profile_path])
-                else:
-                    stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
-                    error_msg = f"Failed to save with elevated privileges: {stderr}"
-                    print(error_msg)
-                    # Clean up temp file on error
-                    os.unlink(temp_path)
-                    raise Exception(error_msg)
-                # Clean up process after cp finishes
-                process.deleteLater()
-
-            process.finished.connect(on_cp_finished)
-            process.start("pkexec", ["cp", temp_path, profile_path])
\ No newline at end of file
+            # Written directly when possible, otherwise with one pkexec call
+            install_files(
+                [(json.dumps(profile, indent=2), profile_path, 0o644)],
+                on_installed,
+                self.parent,
+            )
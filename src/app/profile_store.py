@@ -0,0 +1,143 @@
+import json
+import os
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from src.app import diagnostics
+
+
+class ProfileStore(QObject):
+    """In-memory index of the TDP profile JSON files in a directory.
+
+    Files are keyed by name and remembered with their mtime and size, so
+    a refresh only re-parses files that changed. The directory and every
+    profile file are watched, and changes from other tools are picked up
+    with a short debounce instead of a full reload.
+    """
+
+    # Profile names that were added, removed and changed by a refresh
+    profiles_changed = pyqtSignal(list, list, list)
+
+    def __init__(self, directory, parent=None, watch=True):
+        super().__init__(parent)
+        self.directory = directory
+        self.index = {}  # File name -> (mtime, size, profile dict)
+        self.by_name = {}  # Display name -> profile dict
+
+        self.watcher = None
+        if watch:
+            self.watcher = QFileSystemWatcher(self)
+            self.watcher.directoryChanged.connect(self.schedule_refresh)
+            self.watcher.fileChanged.connect(self.schedule_refresh)
+
+            self.refresh_timer = QTimer(self)
+            self.refresh_timer.setSingleShot(True)
+            self.refresh_timer.setInterval(200)
+            self.refresh_timer.timeout.connect(self.refresh)
+
+    def schedule_refresh(self, *args):
+        """Coalesce a burst of file system events into one refresh."""
+        self.refresh_timer.start()
+
+    def _parse(self, file_name, file_path):
+        """Parse one profile file, or return None if it is invalid."""
+        try:
+            with open(file_path, "r") as f:
+                profile = json.load(f)
+        except (OSError, ValueError) as e:
+            diagnostics.warning(
+                f"profile.{file_name}", f"Error loading profile '{file_name}': {e}"
+            )
+            return None
+        if not isinstance(profile, dict):
+            diagnostics.warning(
+                f"profile.{file_name}",
+                f"Error loading profile '{file_name}': not a JSON object",
+            )
+            return None
+
+        # Validate profile has required fields
+        if "name" not in profile:
+            diagnostics.warning(
+                f"profile.{file_name}",
+                f"Profile '{file_name}' missing required 'name' field",
+            )
+            profile["name"] = os.path.splitext(file_name)[0]
+        return profile
+
+    def refresh(self):
+        """Re-stat the directory and re-parse only new or modified files.
+
+        Returns:
+            Tuple of (added, removed, changed) profile names
+        """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+            diagnostics.info(
+                "profiles.directory", f"Created profiles directory: {self.directory}"
+            )
+
+        seen = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    seen[entry.name] = (entry.path, stat.st_mtime, stat.st_size)
+
+        added, removed, changed = [], [], []
+        for file_name in set(self.index) - set(seen):
+            removed.append(self.index.pop(file_name)[2]["name"])
+
+        for file_name, (file_path, mtime, size) in seen.items():
+            cached = self.index.get(file_name)
+            if cached and cached[0] == mtime and cached[1] == size:
+                continue
+            profile = self._parse(file_name, file_path)
+            if profile is None:
+                if cached:
+                    removed.append(self.index.pop(file_name)[2]["name"])
+                continue
+            self.index[file_name] = (mtime, size, profile)
+            if cached is None:
+                added.append(profile["name"])
+            elif cached[2]["name"] != profile["name"]:
+                removed.append(cached[2]["name"])
+                added.append(profile["name"])
+            else:
+                changed.append(profile["name"])
+
+        if self.watcher is not None:
+            self._sync_watched_paths(seen)
+
+        if added or removed or changed:
+            self._index_names()
+            self.profiles_changed.emit(added, removed, changed)
+        return added, removed, changed
+
+    def _index_names(self):
+        """Rebuild the name lookup; the first file by name wins duplicates."""
+        self.by_name = {}
+        for file_name in sorted(self.index):
+            profile = self.index[file_name][2]
+            self.by_name.setdefault(profile["name"], profile)
+
+    def _sync_watched_paths(self, seen):
+        """Watch the directory and exactly the profile files present."""
+        watched = set(self.watcher.files())
+        wanted = {file_path for file_path, _, _ in seen.values()}
+        stale = watched - wanted
+        if stale:
+            self.watcher.removePaths(list(stale))
+        new = wanted - watched
+        if new:
+            self.watcher.addPaths(sorted(new))
+        if not self.watcher.directories():
+            self.watcher.addPath(self.directory)
+
+    def profiles(self):
+        """Return all valid profiles, ordered by file name."""
+        return [self.index[name][2] for name in sorted(self.index)]
+
+    def get(self, name):
+        """Return the profile with the given display name, or None."""
+        return self.by_name.get(name)
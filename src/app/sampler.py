@@ -0,0 +1,146 @@
+import glob
+import os
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from src.app import session_recording
+from src.app.tracing import span
+
+
+def find_hwmon(names, sysfs_root="/sys"):
+    """Return the first hwmon directory whose name is in names, or None."""
+    for hwmon in sorted(glob.glob(os.path.join(sysfs_root, "class/hwmon/hwmon*"))):
+        try:
+            with open(os.path.join(hwmon, "name")) as f:
+                if f.read().strip() in names:
+                    return hwmon
+        except OSError:
+            continue
+    return None
+
+
+def read_sysfs_number(path, scale=1.0):
+    """Read a numeric sysfs attribute and divide by scale, or return None."""
+    if not path:
+        return None
+    text = session_recording.read_text(path)
+    try:
+        return int(text.strip()) / scale
+    except (AttributeError, ValueError):
+        return None  # Unreadable (None) or not a number
+
+
+class SysfsSensors:
+    """Cheap temperature and power readings straight from hwmon.
+
+    Paths are resolved once. Temperature is the CPU control temperature
+    (k10temp/zenpower Tctl) and power is the APU package power reported by
+    the amdgpu hwmon, which is what `sensors` shows as power1.
+    """
+
+    def __init__(self, sysfs_root="/sys"):
+        self.sysfs_root = sysfs_root
+        self.temperature_path = None
+        self.power_path = None
+
+        cpu_hwmon = find_hwmon(("k10temp", "zenpower"), sysfs_root)
+        if cpu_hwmon:
+            self.temperature_path = os.path.join(cpu_hwmon, "temp1_input")
+
+        gpu_hwmon = find_hwmon(("amdgpu",), sysfs_root)
+        if gpu_hwmon:
+            for attribute in ("power1_average", "power1_input"):
+                path = os.path.join(gpu_hwmon, attribute)
+                if os.path.exists(path):
+                    self.power_path = path
+                    break
+
+    def read_temperature(self):
+        """Return the CPU temperature in °C, or None."""
+        return read_sysfs_number(self.temperature_path, 1000.0)
+
+    def read_power(self):
+        """Return the package power in W, or None."""
+        return read_sysfs_number(self.power_path, 1000000.0)
+
+    def paths(self):
+        """The resolved paths, as stored with a session recording."""
+        return {
+            "temperature_path": self.temperature_path,
+            "power_path": self.power_path,
+        }
+
+    def use_paths(self, paths):
+        """Read from the paths of a recorded session instead."""
+        self.temperature_path = paths.get("temperature_path")
+        self.power_path = paths.get("power_path")
+
+
+class Sampler(QObject):
+    """Periodically sample the sysfs sensors and emit the readings.
+
+    Consumers request a sampling interval and the sampler runs at the
+    fastest one requested, stopping when nobody needs it. Extra sources
+    (e.g. per-core statistics) can be added while someone displays them;
+    each contributes one key to the sample dict.
+    """
+
+    # Dict with "time" (epoch seconds), "monotonic" (seconds, for intervals),
+    # "temperature" (°C), "power" (W) and one entry per added source
+    sample_ready = pyqtSignal(dict)
+
+    def __init__(self, parent=None, sensors=None):
+        super().__init__(parent)
+        self.sensors = sensors or SysfsSensors()
+        self.sources = {
+            "temperature": self.sensors.read_temperature,
+            "power": self.sensors.read_power,
+        }
+        self.requests = {}  # Owner key -> interval in ms
+        self.latest = None
+        self.paused = False
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+
+    def request_interval(self, owner, interval_ms):
+        """Ask for samples at least every interval_ms on behalf of owner."""
+        self.requests[owner] = interval_ms
+        self._update_timer()
+
+    def release(self, owner):
+        """Withdraw owner's interval request."""
+        self.requests.pop(owner, None)
+        self._update_timer()
+
+    def add_source(self, name, read):
+        """Include read()'s result under name in every sample."""
+        self.sources[name] = read
+
+    def remove_source(self, name):
+        self.sources.pop(name, None)
+
+    def set_paused(self, paused):
+        """Stop timed sampling (e.g. during a replay); sample() still works."""
+        self.paused = paused
+        self._update_timer()
+
+    def _update_timer(self):
+        if not self.requests or self.paused:
+            self.timer.stop()
+            return
+        interval = min(self.requests.values())
+        if not self.timer.isActive() or self.timer.interval() != interval:
+            self.timer.start(interval)
+
+    def sample(self):
+        """Take one sample and emit it."""
+        session_recording.record("sample")
+        sample = {"time": time.time(), "monotonic": time.monotonic()}
+        for name, read in self.sources.items():
+            with span(f"sampler.{name}", "sampler"):
+                sample[name] = read()
+        self.latest = sample
+        self.sample_ready.emit(self.latest)
+        return self.latest
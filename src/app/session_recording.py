@@ -0,0 +1,312 @@
+"""Recording of raw source outputs, and replay of a recording into the GUI.
+
+While recording, every `nbfc status -a` and `sensors` run (stdout,
+stderr, exit code), every sysfs read (raw text) and every apply request
+and result is appended to a JSON Lines file with its time since the
+recording started. Markers note where a reading cycle
+(get_system_readings) and a sampler sample begin.
+
+A SessionReplay installs itself as the backend: the readers then take
+their raw output from the recording instead of the hardware, and the
+replay triggers the reading cycles and samples at their recorded times,
+1x to 100x faster. Everything from parsing onwards (circuit breakers,
+graph, gauges, statistics) runs as it did in the field. Applies are not
+executed while replaying; they answer with the recorded results.
+
+Recording is off by default and costs one flag check per read when off.
+"""
+
+import bisect
+import json
+import os
+import subprocess
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from src.app import diagnostics
+
+VERSION = 1
+SESSION_DIR = os.path.expanduser("~/.cache/ryzen-master-commander")
+MIN_SPEED = 1.0
+MAX_SPEED = 100.0
+
+# Events that start a cycle the replay has to trigger
+MARKERS = ("readings", "sample")
+
+_file = None
+_origin = 0.0
+_lock = threading.Lock()
+
+# The SessionReplay answering reads, or None to read the hardware
+backend = None
+
+
+def start_recording(path, context=None):
+    """Start appending raw source outputs to path (a new file).
+
+    Args:
+        context: Dict stored in the header for the replay, e.g. the
+            resolved sysfs sensor paths
+    """
+    global _file, _origin
+    stop_recording()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    header = {"kind": "session", "version": VERSION, "time": time.time()}
+    header["context"] = context or {}
+    _file = open(path, "w")
+    _origin = time.monotonic()
+    _file.write(json.dumps(header) + "\n")
+
+
+def stop_recording():
+    global _file
+    with _lock:
+        if _file is not None:
+            _file.close()
+            _file = None
+
+
+def is_recording():
+    return _file is not None
+
+
+def record(kind, **data):
+    """Append one event to the recording (no-op when not recording)."""
+    if _file is None:
+        return
+    data["t"] = round(time.monotonic() - _origin, 6)
+    data["kind"] = kind
+    with _lock:
+        if _file is not None:
+            _file.write(json.dumps(data) + "\n")
+
+
+def default_session_path():
+    return os.path.join(
+        SESSION_DIR, time.strftime("session-%Y%m%d-%H%M%S.jsonl")
+    )
+
+
+def run_reading(command):
+    """Run a reading command, or answer it from the replayed session.
+
+    Returns:
+        subprocess.CompletedProcess with text stdout/stderr
+
+    Raises:
+        FileNotFoundError: The command is not installed (or was not when
+            the session was recorded)
+    """
+    if backend is not None:
+        return backend.command_output(command)
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        record("command", command=command, error="not found")
+        raise
+    record(
+        "command",
+        command=command,
+        stdout=result.stdout,
+        stderr=result.stderr,
+        returncode=result.returncode,
+    )
+    return result
+
+
+def read_text(path):
+    """Read a sysfs attribute's text, from the replay if one is running.
+
+    Returns:
+        The text, or None if it could not be read
+    """
+    if backend is not None:
+        return backend.sysfs_text(path)
+    try:
+        with open(path) as f:
+            text = f.read()
+    except OSError:
+        text = None
+    record("sysfs", path=path, text=text)
+    return text
+
+
+def load_session(path):
+    """Read a recording.
+
+    Returns:
+        Tuple of (header, events in time order)
+    """
+    events = []
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get("kind") != "session" or header.get("version") != VERSION:
+            raise ValueError(f"{path} is not a session recording")
+        for line in f:
+            if line.strip():
+                events.append(json.loads(line))
+    events.sort(key=lambda event: event["t"])
+    return header, events
+
+
+class SessionReplay(QObject):
+    """Feed a recorded session back through the readers.
+
+    Args:
+        path: Recording to replay
+        speed: Replay speed, clamped to MIN_SPEED..MAX_SPEED
+
+    Reads are answered with the latest recorded output for the same
+    command or sysfs path from before the next marker, i.e. the output
+    recorded in the cycle being replayed. If the live code reads
+    something the recording skipped (e.g. a circuit breaker tripped at a
+    different moment), it gets the previous output.
+    """
+
+    finished = pyqtSignal()
+
+    def __init__(self, path, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.speed = min(max(speed, MIN_SPEED), MAX_SPEED)
+        self.outputs = {}  # Key -> ([times], [events])
+        self.results = {}  # Apply target -> recorded results, in order
+        self.events = []  # Markers and apply results, in time order
+        header, events = load_session(path)
+        self.context = header["context"]
+        for event in events:
+            kind = event["kind"]
+            if kind == "command":
+                key = ("command", tuple(event["command"]))
+            elif kind == "sysfs":
+                key = ("sysfs", event["path"])
+            else:
+                if kind in MARKERS or kind == "apply_result":
+                    self.events.append(event)
+                if kind == "apply_result":
+                    self.results.setdefault(event["target"], []).append(
+                        (event["success"], event["message"])
+                    )
+                continue
+            times, keyed = self.outputs.setdefault(key, ([], []))
+            times.append(event["t"])
+            keyed.append(event)
+
+        self.handlers = {}
+        self.position = 0
+        self.horizon = float("inf")
+        self.started = None
+        self.max_lag = 0.0  # Seconds a cycle started later than scheduled
+        self.counts = {kind: 0 for kind in MARKERS}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._next)
+
+    def start(self, readings, sample):
+        """Start replaying.
+
+        Args:
+            readings: Called for every recorded reading cycle
+            sample: Called for every recorded sampler sample
+        """
+        global backend
+        backend = self
+        self.handlers = {"readings": readings, "sample": sample}
+        self.position = 0
+        # Reads before the first cycle is due see that cycle's outputs
+        self._set_horizon(self._next_marker(0) + 1)
+        self.started = time.monotonic()
+        self._schedule()
+
+    def stop(self):
+        global backend
+        self.timer.stop()
+        if backend is self:
+            backend = None
+
+    def duration(self):
+        """Length of the recording in seconds."""
+        return self.events[-1]["t"] if self.events else 0.0
+
+    def _due(self, event):
+        first = self.events[0]["t"]
+        return self.started + (event["t"] - first) / self.speed
+
+    def _schedule(self):
+        if self.position >= len(self.events):
+            self.stop()
+            diagnostics.info(
+                "replay.finished",
+                f"Replayed {self.counts['readings']} reading cycles and "
+                f"{self.counts['sample']} samples at {self.speed:g}x; "
+                f"max lag {self.max_lag * 1000:.0f} ms",
+            )
+            self.finished.emit()
+            return
+        delay = self._due(self.events[self.position]) - time.monotonic()
+        self.timer.start(max(0, int(delay * 1000)))
+
+    def _next(self):
+        event = self.events[self.position]
+        self.max_lag = max(self.max_lag, time.monotonic() - self._due(event))
+        self.position += 1
+        # Outputs recorded up to the next cycle belong to this one
+        self._set_horizon(self.position)
+
+        kind = event["kind"]
+        if kind in MARKERS:
+            self.counts[kind] += 1
+            self.handlers[kind]()
+        elif kind == "apply_result":
+            diagnostics.info(
+                "replay.apply",
+                f"Recorded {event['target']} apply: {event['message']}",
+            )
+        self._schedule()
+
+    def _next_marker(self, position):
+        """Index of the first marker at or after position."""
+        while position < len(self.events) and (
+            self.events[position]["kind"] not in MARKERS
+        ):
+            position += 1
+        return position
+
+    def _set_horizon(self, position):
+        following = self._next_marker(position)
+        self.horizon = (
+            self.events[following]["t"]
+            if following < len(self.events)
+            else float("inf")
+        )
+
+    def _latest(self, key):
+        times, events = self.outputs.get(key, ((), ()))
+        index = bisect.bisect_left(times, self.horizon)
+        return events[index - 1] if index else None
+
+    def command_output(self, command):
+        event = self._latest(("command", tuple(command)))
+        if event is None:
+            return subprocess.CompletedProcess(
+                command, 1, "", "not in the recording"
+            )
+        if event.get("error"):
+            raise FileNotFoundError(command[0])
+        return subprocess.CompletedProcess(
+            command, event["returncode"], event["stdout"], event["stderr"]
+        )
+
+    def sysfs_text(self, path):
+        event = self._latest(("sysfs", path))
+        return event["text"] if event is not None else None
+
+    def apply_result(self, target):
+        """The next recorded result for an apply, instead of running it."""
+        results = self.results.get(target)
+        if results:
+            return results.pop(0)
+        return True, f"Not applied while replaying a session ({target})"
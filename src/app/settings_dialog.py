@@ -6,12 +6,31 @@ from PyQt6.QtWidgets import (
     QLabel,
     QSlider,
     QPushButton,
+    QComboBox,
+    QCheckBox,
+    QPlainTextEdit,
+    QFileDialog,
+    QMessageBox,
 )
 from PyQt6.QtCore import Qt
 
+from src.app import diagnostics
+from src.app.diagnostics import format_entry
+from src.app.telemetry_export import LOG_DIR
+
 
 class SettingsDialog(QDialog):
-    def __init__(self, parent=None, current_refresh_interval=5):
+    def __init__(
+        self,
+        parent=None,
+        current_refresh_interval=5,
+        sample_interval_ms=0,
+        antialias=True,
+        live_log_format="",
+        power_rules=None,
+        tdp_profiles=None,
+        fan_profiles=None,
+    ):
         super().__init__(parent)
         
         self.setWindowTitle("Settings")
@@ -48,9 +67,84 @@ class SettingsDialog(QDialog):
         self.refresh_slider.valueChanged.connect(
             lambda value: self.slider_value_label.setText(str(value))
         )
+
+        # Fast sampling reads only the cheap sysfs sensors; the graph and
+        # gauges still redraw at a capped frame rate
+        sampling_row = QHBoxLayout()
+        sampling_row.addWidget(QLabel("Fast Sensor Sampling:"))
+        self.sampling_combo = QComboBox()
+        for label, interval in (
+            ("Off", 0),
+            ("100 ms", 100),
+            ("250 ms", 250),
+            ("500 ms", 500),
+            ("1 s", 1000),
+        ):
+            self.sampling_combo.addItem(label, interval)
+        index = self.sampling_combo.findData(sample_interval_ms)
+        self.sampling_combo.setCurrentIndex(index if index >= 0 else 0)
+        sampling_row.addWidget(self.sampling_combo, 1)
+        refresh_layout.addLayout(sampling_row)
+
+        self.antialias_check = QCheckBox("Antialiased graphs (slower to draw)")
+        self.antialias_check.setChecked(antialias)
+        refresh_layout.addWidget(self.antialias_check)
+
+        # Every sample appended to a log file, for offline analysis
+        log_row = QHBoxLayout()
+        log_row.addWidget(QLabel("Telemetry Log:"))
+        self.live_log_combo = QComboBox()
+        for label, fmt in (("Off", ""), ("CSV", "csv"), ("JSON Lines", "jsonl")):
+            self.live_log_combo.addItem(label, fmt)
+        index = self.live_log_combo.findData(live_log_format)
+        self.live_log_combo.setCurrentIndex(index if index >= 0 else 0)
+        self.live_log_combo.setToolTip(
+            f"Samples are appended to telemetry.csv or telemetry.jsonl in {LOG_DIR}"
+        )
+        log_row.addWidget(self.live_log_combo, 1)
+        refresh_layout.addLayout(log_row)
         
         layout.addWidget(refresh_group)
-        
+
+        # Power source rules - profiles applied on AC / battery changes
+        self.power_rules = power_rules
+        self.rule_combos = {}
+        if power_rules is not None:
+            rules_group = QGroupBox("Power Source Rules")
+            rules_layout = QVBoxLayout(rules_group)
+            for state, label in (("ac", "On AC"), ("battery", "On Battery")):
+                for key, choices in (
+                    ("tdp_profile", tdp_profiles or []),
+                    ("fan_profile", fan_profiles or []),
+                ):
+                    row = QHBoxLayout()
+                    kind = "TDP" if key == "tdp_profile" else "Fan"
+                    row.addWidget(QLabel(f"{label} - {kind} Profile:"))
+                    combo = QComboBox()
+                    combo.addItem("(no change)", "")
+                    for choice in choices:
+                        combo.addItem(choice, choice)
+                    current = power_rules.get(state, {}).get(key, "")
+                    index = combo.findData(current)
+                    combo.setCurrentIndex(index if index >= 0 else 0)
+                    row.addWidget(combo, 1)
+                    rules_layout.addLayout(row)
+                    self.rule_combos[(state, key)] = combo
+            layout.addWidget(rules_group)
+
+        # Diagnostics - recent log entries and occurrence counters
+        diagnostics_group = QGroupBox("Diagnostics")
+        diagnostics_layout = QHBoxLayout(diagnostics_group)
+        counters = diagnostics.diagnostics.counters()
+        diagnostics_layout.addWidget(
+            QLabel(f"{sum(counters.values())} messages from {len(counters)} sources")
+        )
+        diagnostics_layout.addStretch()
+        view_button = QPushButton("View Diagnostics...")
+        view_button.clicked.connect(lambda: DiagnosticsDialog(self).exec())
+        diagnostics_layout.addWidget(view_button)
+        layout.addWidget(diagnostics_group)
+
         # Buttons
         button_layout = QHBoxLayout()
         save_button = QPushButton("Save")
@@ -64,4 +158,73 @@ class SettingsDialog(QDialog):
         layout.addLayout(button_layout)
         
     def get_refresh_interval(self):
-        return self.refresh_slider.value()
\ No newline at end of file
+        return self.refresh_slider.value()
+
+    def get_sample_interval(self):
+        """Fast sampling interval in ms, 0 when off"""
+        return self.sampling_combo.currentData()
+
+    def get_antialias(self):
+        return self.antialias_check.isChecked()
+
+    def get_live_log_format(self):
+        """Telemetry log format, "" when off"""
+        return self.live_log_combo.currentData()
+
+    def get_power_rules(self):
+        """Return the power source rules as selected in the dialog"""
+        rules = {}
+        for (state, key), combo in self.rule_combos.items():
+            rules.setdefault(state, {})[key] = combo.currentData()
+        return rules
+
+
+class DiagnosticsDialog(QDialog):
+    """Read-only view of the diagnostics ring buffer, with export."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(700, 400)
+
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        layout.addWidget(self.text)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        export_button = QPushButton("Export...")
+        export_button.clicked.connect(self.export)
+        button_layout.addWidget(export_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.refresh()
+
+    def refresh(self):
+        log = diagnostics.diagnostics
+        lines = [format_entry(entry) for entry in log.entries]
+        lines.append("")
+        lines.append("Occurrences by key:")
+        for key, count in sorted(log.counters().items()):
+            lines.append(f"{count:8d}  {key}")
+        self.text.setPlainText("\n".join(lines))
+        self.text.moveCursor(self.text.textCursor().MoveOperation.End)
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Diagnostics", "diagnostics.txt", "Text Files (*.txt)"
+        )
+        if not path:
+            return
+        try:
+            diagnostics.diagnostics.export(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Could not export diagnostics: {e}")
@@ -0,0 +1,67 @@
+"""Write-behind persistence on top of QSettings.
+
+set_value() only records the key in memory and (re)starts a short idle
+timer; when no more changes arrive for FLUSH_DELAY_MS, all dirty keys are
+written in one go with a single sync(). Pending changes are also flushed
+when the application quits. Reads see pending values immediately.
+"""
+
+from PyQt6.QtCore import QCoreApplication, QObject, QSettings, QTimer
+
+ORGANIZATION = "MerryThieves"
+APPLICATION = "RyzenMasterCommander"
+FLUSH_DELAY_MS = 2000
+
+
+class SettingsStore(QObject):
+    def __init__(self, settings=None, delay_ms=FLUSH_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.settings = (
+            settings
+            if settings is not None
+            else QSettings(ORGANIZATION, APPLICATION)
+        )
+        self.dirty = {}
+        self.flushes = 0
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(delay_ms)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def value(self, key, default=None, type=None):
+        """Read a value, preferring one that is not flushed yet."""
+        if key in self.dirty:
+            return self.dirty[key]
+        if type is None:
+            return self.settings.value(key, default)
+        return self.settings.value(key, default, type=type)
+
+    def set_value(self, key, value):
+        """Remember a value; it is written once changes go quiet."""
+        self.dirty[key] = value
+        self.flush_timer.start()
+
+    def flush(self):
+        """Write all pending values now."""
+        self.flush_timer.stop()
+        if not self.dirty:
+            return
+        for key, value in self.dirty.items():
+            self.settings.setValue(key, value)
+        self.dirty.clear()
+        self.settings.sync()
+        self.flushes += 1
+
+
+_store = None
+
+
+def get_settings():
+    """Return the shared SettingsStore, flushed when the app quits."""
+    global _store
+    if _store is None:
+        _store = SettingsStore()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_store.flush)
+    return _store
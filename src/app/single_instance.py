@@ -0,0 +1,138 @@
+"""Single-instance handling over a local socket.
+
+The first instance listens on a per-user QLocalServer. A later launch
+connects to it, sends its command line as one JSON line, waits briefly
+for a one-line reply and exits, so there is only ever one sampler and
+one TDP applier running.
+"""
+
+import argparse
+import json
+import os
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+SERVER_NAME = f"ryzen-master-commander-{os.getuid()}"
+FORWARD_TIMEOUT_MS = 500
+
+
+def parse_arguments(arguments):
+    """Parse the command line shared by first and forwarded launches."""
+    parser = argparse.ArgumentParser(prog="ryzen-master-commander")
+    parser.add_argument(
+        "--minimized",
+        action="store_true",
+        help="start in the system tray without showing the window",
+    )
+    parser.add_argument(
+        "--apply-profile",
+        metavar="NAME",
+        help="apply the TDP profile with this name",
+    )
+    parser.add_argument(
+        "--quit", action="store_true", help="quit the running instance"
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="record raw sensor outputs and applies to PATH for a replay",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="start a separate copy driven by a recorded session",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        metavar="N",
+        help="replay N times faster than recorded (1 to 100)",
+    )
+    return parser.parse_args(arguments)
+
+
+def forward_to_running_instance(
+    arguments, name=SERVER_NAME, timeout_ms=FORWARD_TIMEOUT_MS
+):
+    """Hand a command line to the running instance, if there is one.
+
+    Returns:
+        The instance's reply ("" if it did not answer in time), or None if
+        no instance is running
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(timeout_ms):
+        return None
+    socket.write(json.dumps(arguments).encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(timeout_ms)
+    reply = b""
+    while b"\n" not in reply and socket.waitForReadyRead(timeout_ms):
+        reply += socket.readAll().data()
+    socket.disconnectFromServer()
+    return reply.decode("utf-8", errors="replace").strip()
+
+
+class InstanceServer(QObject):
+    """Accept command lines from later launches.
+
+    Args:
+        handler: Callable(arguments) returning a one-line reply string
+    """
+
+    def __init__(self, handler=None, name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.name = name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    def listen(self):
+        """Start listening; returns False if the name could not be taken.
+
+        The name is taken over only from a socket nobody answers on, so a
+        launch racing another one never removes a live instance's socket.
+        """
+        if self.server.listen(self.name):
+            return True
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if socket.waitForConnected(FORWARD_TIMEOUT_MS):
+            socket.disconnectFromServer()
+            return False  # Another instance got there first
+        # A socket left behind by a crashed instance
+        QLocalServer.removeServer(self.name)
+        return self.server.listen(self.name)
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            buffer = bytearray()
+            socket.readyRead.connect(
+                lambda socket=socket, buffer=buffer: self.on_ready_read(
+                    socket, buffer
+                )
+            )
+            socket.disconnected.connect(socket.deleteLater)
+            if socket.bytesAvailable():
+                self.on_ready_read(socket, buffer)
+
+    def on_ready_read(self, socket, buffer):
+        buffer.extend(socket.readAll().data())
+        if b"\n" not in buffer:
+            return
+        line = bytes(buffer).split(b"\n", 1)[0]
+        buffer.clear()
+        try:
+            arguments = json.loads(line)
+            reply = self.handler(arguments) if self.handler else "ok"
+        except Exception as e:
+            reply = f"error: {e}"
+        socket.write(reply.encode("utf-8") + b"\n")
+        socket.flush()
+        socket.disconnectFromServer()
@@ -0,0 +1,89 @@
+"""Circuit breakers for telemetry sources that can fail repeatedly.
+
+A source starts out unknown and becomes healthy after a good read. A few
+failures in a row make it degraded (still polled every time); more make
+the circuit open, and the source is then skipped until its backoff
+expires. When it does, an optional cheap probe (for example, is the
+binary on PATH at all) decides whether one real read is attempted. That
+half-open read closes the circuit on success or reopens it with a longer
+delay on failure.
+"""
+
+import time
+
+from src.app import diagnostics
+from src.app.diagnostics import Backoff
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+OPEN = "open"
+
+UNAVAILABLE = "source unavailable"
+
+
+class SourceHealth:
+    def __init__(
+        self,
+        name,
+        probe=None,
+        failure_threshold=3,
+        initial=5.0,
+        maximum=300.0,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.backoff = Backoff(initial, maximum, clock)
+        self.state = None  # Unknown until the first read
+        self.failures = 0
+        self.last_error = None
+        self.last_value = None  # Value of the last good read
+
+    def allow(self):
+        """Return True if the source should be read now."""
+        if self.state != OPEN:
+            return True
+        if not self.backoff.ready():
+            return False
+        if self.probe is not None and not self.probe():
+            self._open("probe failed")
+            return False
+        return True
+
+    def succeeded(self, value=None):
+        self.last_value = value
+        if self.state == OPEN:
+            diagnostics.info(f"{self.name}.health", f"{self.name} recovered")
+        self.state = HEALTHY
+        self.failures = 0
+        self.last_error = None
+        self.backoff.succeeded()
+
+    def failed(self, error, fatal=False):
+        """Record a failed read.
+
+        Args:
+            error: Description of the failure
+            fatal: Open the circuit right away (e.g. the command is missing)
+        """
+        self.failures += 1
+        self.last_error = error
+        if fatal or self.state == OPEN or self.failures >= self.failure_threshold:
+            self._open(error)
+        else:
+            self.state = DEGRADED
+            diagnostics.warning(
+                f"{self.name}.health", f"{self.name} read failed: {error}"
+            )
+
+    def _open(self, error):
+        delay = self.backoff.failed()
+        self.state = OPEN
+        diagnostics.warning(
+            f"{self.name}.health",
+            f"{self.name} unavailable ({error}); next probe in {delay:.0f}s",
+        )
+
+    def is_available(self):
+        return self.state != OPEN
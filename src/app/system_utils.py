@@ -1,46 +1,157 @@
-import subprocess
 import re
 import os
+import shutil
+import sys
+import json
+import time
 from PyQt6.QtCore import QProcess
 
+from src.app import diagnostics, session_recording
+from src.app.file_installer import install_file
+from src.app.source_health import SourceHealth
+from src.app.tracing import span, trace_process, traced
 
-def get_system_readings():
-    # Get temperature and fan speed from NBFC
+# A missing command is re-checked on PATH before forking it again
+source_health = {
+    "nbfc": SourceHealth("nbfc", probe=lambda: shutil.which("nbfc") is not None),
+    "sensors": SourceHealth(
+        "sensors", probe=lambda: shutil.which("sensors") is not None
+    ),
+}
+
+
+def parse_nbfc_status(output):
+    """Extract (temperature, fan speed, config name) from `nbfc status -a`.
+
+    Values that are missing from the output are returned as "n/a".
+    """
+    temperature_match = re.search(r"Temperature\s+:\s+(\d+\.?\d*)", output)
+    fan_speed_match = re.search(r"Current Fan Speed\s+:\s+(\d+\.?\d*)", output)
+    current_profile_match = re.search(
+        r"Selected Config Name\s+:\s+(.*?)$", output, re.MULTILINE
+    )
+
+    temp = temperature_match.group(1) if temperature_match else "n/a"
+    fan_speed = fan_speed_match.group(1) if fan_speed_match else "n/a"
+    profile = (
+        current_profile_match.group(1) if current_profile_match else "n/a"
+    )
+    return temp, fan_speed, profile
+
+
+def parse_sensors_power(output):
+    """Extract the power1 reading in W from `sensors` output, or "n/a"."""
+    power_match = re.search(r"power1:\s+(\d+\.\d+)\s*W", output)
+    return power_match.group(1) if power_match else "n/a"
+
+
+def read_nbfc_status(force=False):
+    """Read (temperature, fan speed, config name) from `nbfc status -a`.
+
+    Args:
+        force: Read even if the nbfc circuit is open
+
+    Returns:
+        The parsed values, or "n/a" for each if nbfc could not be read
+    """
+    health = source_health["nbfc"]
+    if not (force or health.allow()):
+        return "n/a", "n/a", "n/a"
     try:
-        output = subprocess.check_output(["nbfc", "status", "-a"], text=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Failed to execute 'nbfc status -a': {e}")
-        temp, fan_speed, profile = "n/a", "n/a", "n/a"
+        with span("nbfc status -a", "readings"):
+            result = session_recording.run_reading(["nbfc", "status", "-a"])
     except FileNotFoundError:
-        print(
-            "nbfc command not found. Make sure NoteBook FanControl is installed."
-        )
-        temp, fan_speed, profile = "n/a", "n/a", "n/a"
-    else:
-        temperature_match = re.search(r"Temperature\s+:\s+(\d+\.?\d*)", output)
-        fan_speed_match = re.search(r"Current Fan Speed\s+:\s+(\d+\.?\d*)", output)
-        current_profile_match = re.search(
-            r"Selected Config Name\s+:\s+(.*?)$", output, re.MULTILINE
+        health.failed("nbfc command not found", fatal=True)
+        return "n/a", "n/a", "n/a"
+    # The client reports a stopped service as "ERROR: connect(): ..."
+    if result.returncode != 0 or "ERROR" in result.stderr:
+        health.failed(
+            result.stderr.strip()
+            or f"'nbfc status -a' exited with {result.returncode}"
         )
+        return "n/a", "n/a", "n/a"
+    status = parse_nbfc_status(result.stdout)
+    health.succeeded(status)
+    return status
 
-        temp = temperature_match.group(1) if temperature_match else "n/a"
-        fan_speed = fan_speed_match.group(1) if fan_speed_match else "n/a"
-        profile = (
-            current_profile_match.group(1) if current_profile_match else "n/a"
-        )
-    
-    # Get power consumption data using sensors
+
+def read_sensors_power():
+    """Read the package power in W from `sensors`, or "n/a"."""
+    health = source_health["sensors"]
+    if not health.allow():
+        return "n/a"
     try:
-        sensors_output = subprocess.check_output(["sensors"], text=True)
-        power_match = re.search(r"power1:\s+(\d+\.\d+)\s*W", sensors_output)
-        power = power_match.group(1) if power_match else "n/a"
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        print(f"Failed to get power data: {e}")
-        power = "n/a"
-    
+        with span("sensors", "readings"):
+            result = session_recording.run_reading(["sensors"])
+    except FileNotFoundError:
+        health.failed("sensors command not found", fatal=True)
+        return "n/a"
+    if result.returncode != 0:
+        health.failed(
+            (result.stderr or "").strip()
+            or f"'sensors' exited with {result.returncode}"
+        )
+        return "n/a"
+    health.succeeded()
+    return parse_sensors_power(result.stdout)
+
+
+def get_system_readings():
+    session_recording.record("readings")
+    temp, fan_speed, profile = read_nbfc_status()
+    power = read_sensors_power()
     return temp, fan_speed, profile, power
 
 
+def read_dmi_info(sysfs_root="/sys"):
+    """Read the board identity from DMI sysfs (world-readable, no pkexec).
+
+    Returns:
+        Dict with sys_vendor, product_name and board_name ("" if missing)
+    """
+    info = {}
+    for key in ("sys_vendor", "product_name", "board_name"):
+        try:
+            with open(os.path.join(sysfs_root, "class/dmi/id", key)) as f:
+                info[key] = f.read().strip()
+        except OSError:
+            info[key] = ""
+    return info
+
+
+def build_ryzenadj_command(current_profile):
+    """Build the ryzenadj argument list for a TDP profile.
+
+    Limits are given in watts and seconds in profiles and in milliwatts and
+    milliseconds on the ryzenadj command line.
+    """
+    command = ["ryzenadj"]
+
+    # Basic settings always included
+    if "fast-limit" in current_profile:
+        command.extend([f"--fast-limit={current_profile['fast-limit'] * 1000}"])
+    if "slow-limit" in current_profile:
+        command.extend([f"--slow-limit={current_profile['slow-limit'] * 1000}"])
+
+    # Advanced settings only if provided
+    if "slow-time" in current_profile:
+        command.extend([f"--slow-time={current_profile['slow-time'] * 1000}"])
+
+    # Other advanced parameters
+    for key in ["tctl-temp", "apu-skin-temp"]:
+        if key in current_profile:
+            command.extend([f"--{key}={current_profile[key]}"])
+
+    # Performance mode flags
+    if current_profile.get("power-saving"):
+        command.append("--power-saving")
+    elif current_profile.get("max-performance"):
+        command.append("--max-performance")
+
+    return command
+
+
+@traced("apply_tdp_settings", "tdp")
 def apply_tdp_settings(current_profile, callback=None, parent=None):
     """Apply TDP settings using QProcess for non-blocking execution.
 
@@ -50,30 +161,11 @@ def apply_tdp_settings(current_profile, callback=None, parent=None):
         parent: Parent QObject to own the QProcess (prevents garbage collection)
     """
     if current_profile:
-        command = ["ryzenadj"]
-
-        # Basic settings always included
-        if "fast-limit" in current_profile:
-            command.extend([f"--fast-limit={current_profile['fast-limit'] * 1000}"])
-        if "slow-limit" in current_profile:
-            command.extend([f"--slow-limit={current_profile['slow-limit'] * 1000}"])
-
-        # Advanced settings only if provided
-        if "slow-time" in current_profile:
-            command.extend([f"--slow-time={current_profile['slow-time'] * 1000}"])
-
-        # Other advanced parameters
-        for key in ["tctl-temp", "apu-skin-temp"]:
-            if key in current_profile:
-                command.extend([f"--{key}={current_profile[key]}"])
+        command = build_ryzenadj_command(current_profile)
 
-        # Performance mode flags
-        if current_profile.get("power-saving"):
-            command.append("--power-saving")
-        elif current_profile.get("max-performance"):
-            command.append("--max-performance")
-
-        print(f"Applying TDP settings with command: pkexec {' '.join(command)}")
+        diagnostics.debug(
+            "tdp.command", f"Applying TDP settings: pkexec {' '.join(command)}"
+        )
 
         # Create QProcess for non-blocking execution with parent to prevent GC
         process = QProcess(parent)
@@ -81,7 +173,7 @@ def apply_tdp_settings(current_profile, callback=None, parent=None):
         # Store callback for when process finishes
         def on_finished(exit_code, exit_status):
             if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
-                print("TDP settings applied successfully")
+                diagnostics.debug("tdp.applied", "TDP settings applied successfully")
                 if callback:
                     callback(True, "TDP settings applied successfully")
             else:
@@ -89,7 +181,7 @@ def apply_tdp_settings(current_profile, callback=None, parent=None):
                 stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
                 if stderr:
                     error_msg += f": {stderr}"
-                print(error_msg)
+                diagnostics.error("tdp.failed", error_msg)
                 if callback:
                     callback(False, error_msg)
             # Clean up process after finished
@@ -98,6 +190,7 @@ def apply_tdp_settings(current_profile, callback=None, parent=None):
         process.finished.connect(on_finished)
 
         # Start the process with pkexec
+        trace_process(process, "pkexec ryzenadj")
         process.start("pkexec", command)
 
         # Note: We don't return True/False immediately since it's async
@@ -109,6 +202,146 @@ def apply_tdp_settings(current_profile, callback=None, parent=None):
     return False, "No profile selected"
 
 
+def _ryzenadj_settings(command):
+    """Map a ryzenadj command to {option: value} for comparison."""
+    settings = {}
+    for arg in command[1:]:
+        if arg in ("--power-saving", "--max-performance"):
+            settings["mode"] = arg  # The two flags replace each other
+        else:
+            option, _, value = arg.partition("=")
+            settings[option] = value
+    return settings
+
+
+class TdpApplier:
+    """Serialized, deduplicating alternative to apply_tdp_settings.
+
+    At most one ryzenadj process runs at a time. Requests made while it
+    runs are merged into one pending request (later values win), which is
+    applied when the process finishes.
+    Options whose value is already applied are left off the command line,
+    and a request with nothing left to change issues no process at all,
+    unless force is set (for explicit user actions, since firmware may
+    have reset the limits behind our back).
+    """
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.applied = {}  # ryzenadj option -> value known to be in effect
+        self.running = None  # Settings of the in-flight process
+        self.pending = None  # [profile, callbacks, force] waiting its turn
+        self.issued = 0
+
+    @traced("TdpApplier.apply", "tdp")
+    def apply(self, profile, callback=None, force=False):
+        """Apply a TDP profile, possibly merged with or skipped for others.
+
+        Args:
+            profile: Profile dictionary with TDP settings
+            callback: Optional callback function(success, message)
+            force: Issue ryzenadj even if the settings are already applied
+        """
+        if not profile:
+            if callback:
+                callback(False, "No profile selected")
+            return
+        callbacks = [callback] if callback else []
+
+        if self.running is not None:
+            if self.pending is None:
+                self.pending = [dict(profile), callbacks, force]
+                return
+            merged = self.pending[0]
+            if "power-saving" in profile or "max-performance" in profile:
+                merged.pop("power-saving", None)
+                merged.pop("max-performance", None)
+            merged.update(profile)
+            self.pending[1].extend(callbacks)
+            self.pending[2] = self.pending[2] or force
+            return
+
+        self._apply_now(profile, callbacks, force)
+
+    def _apply_now(self, profile, callbacks, force):
+        wanted = _ryzenadj_settings(build_ryzenadj_command(profile))
+        if not force:
+            wanted = {
+                option: value
+                for option, value in wanted.items()
+                if self.applied.get(option) != value
+            }
+            if not wanted:
+                for callback in callbacks:
+                    callback(True, "TDP settings already applied")
+                return
+
+        command = ["ryzenadj"] + [
+            value if option == "mode" else f"{option}={value}"
+            for option, value in wanted.items()
+        ]
+        self.running = wanted
+        self.issued += 1
+        self._start(command, callbacks)
+
+    def _start(self, command, callbacks):
+        diagnostics.debug(
+            "tdp.command", f"Applying TDP settings: pkexec {' '.join(command)}"
+        )
+        process = QProcess(self.parent)
+
+        def on_finished(exit_code, exit_status):
+            if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
+                done(True, "TDP settings applied successfully")
+                return
+            message = f"Error applying TDP settings (exit code: {exit_code})"
+            stderr = process.readAllStandardError().data().decode(
+                "utf-8", errors="ignore"
+            )
+            if stderr:
+                message += f": {stderr}"
+            done(False, message)
+
+        def on_error(error):
+            # finished is never emitted if pkexec could not be started
+            if error == QProcess.ProcessError.FailedToStart:
+                done(False, "Error applying TDP settings: could not start pkexec")
+
+        def done(success, message):
+            session_recording.record(
+                "apply_result", target="tdp", success=success, message=message
+            )
+            if success:
+                self.applied.update(self.running)
+            else:
+                # The hardware state is unknown now, so re-send everything
+                self.applied = {}
+            if success:
+                diagnostics.debug("tdp.applied", message)
+            else:
+                diagnostics.error("tdp.failed", message)
+            try:
+                process.deleteLater()
+            except RuntimeError:
+                pass  # Already destroyed along with its parent at shutdown
+            self.running = None
+            for callback in callbacks:
+                callback(success, message)
+            if self.pending:
+                profile, pending_callbacks, force = self.pending
+                self.pending = None
+                self._apply_now(profile, pending_callbacks, force)
+
+        session_recording.record("apply", target="tdp", command=command)
+        if session_recording.backend is not None:
+            done(*session_recording.backend.apply_result("tdp"))
+            return
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+        trace_process(process, "pkexec ryzenadj")
+        process.start("pkexec", command)
+
+
 def apply_fan_profile(profile_name, callback=None, parent=None):
     """Apply a fan profile by name with nbfc command using QProcess.
 
@@ -120,7 +353,7 @@ def apply_fan_profile(profile_name, callback=None, parent=None):
     # Use the profile name (without extension) with nbfc config command
     profile_name = os.path.splitext(os.path.basename(profile_name))[0]
 
-    print(f"Applying fan profile: {profile_name}")
+    diagnostics.info("fan.apply", f"Applying fan profile: {profile_name}")
 
     # Create QProcess for non-blocking execution with parent to prevent GC
     process = QProcess(parent)
@@ -128,7 +361,7 @@ def apply_fan_profile(profile_name, callback=None, parent=None):
     def on_finished(exit_code, exit_status):
         if exit_code == 0 and exit_status == QProcess.ExitStatus.NormalExit:
             msg = f"Fan profile '{profile_name}' applied successfully"
-            print(msg)
+            diagnostics.debug("fan.applied", msg)
             if callback:
                 callback(True, msg)
         else:
@@ -136,7 +369,7 @@ def apply_fan_profile(profile_name, callback=None, parent=None):
             stderr = process.readAllStandardError().data().decode('utf-8', errors='ignore')
             if stderr:
                 error_msg += f": {stderr}"
-            print(error_msg)
+            diagnostics.error("fan.failed", error_msg)
             if callback:
                 callback(False, error_msg)
         # Clean up process after finished
@@ -145,6 +378,289 @@ def apply_fan_profile(profile_name, callback=None, parent=None):
     process.finished.connect(on_finished)
 
     # Start the process with pkexec
+    trace_process(process, "pkexec nbfc config -a")
     process.start("pkexec", ["nbfc", "config", "-a", profile_name])
 
-    return None
\ No newline at end of file
+    return None
+
+
+FILE_INSTALLER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "file_installer.py"
+)
+
+
+def install_files(entries, callback=None, parent=None, privileged=None):
+    """Atomically install a batch of files, authorizing at most once.
+
+    Files whose directory the user can write are installed directly; the
+    rest go to a single `pkexec` run of the file installer.
+
+    Args:
+        entries: List of (content, target path, mode) tuples
+        callback: Optional callback function(results) called with a list
+            of (target, error) pairs in entry order, error None on success
+        parent: Parent QObject to own the QProcess (prevents garbage collection)
+        privileged: If true, install every file through pkexec
+    """
+    results = {}
+    elevated = []
+    for content, target, mode in entries:
+        if privileged:
+            elevated.append((content, target, mode))
+            continue
+        try:
+            install_file(content, target, mode)
+            results[target] = None
+        except PermissionError:
+            elevated.append((content, target, mode))
+        except OSError as e:
+            results[target] = str(e)
+
+    def finish():
+        ordered = [(target, results.get(target)) for _, target, _ in entries]
+        for target, error in ordered:
+            if error:
+                diagnostics.error(
+                    "install.failed", f"Could not install {target}: {error}"
+                )
+            else:
+                diagnostics.debug("install.done", f"Installed {target}")
+        if callback:
+            callback(ordered)
+
+    if not elevated:
+        finish()
+        return
+
+    manifest = {"files": []}
+    for content, target, mode in elevated:
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        manifest["files"].append(
+            {"target": target, "mode": mode, "content": content}
+        )
+    process = QProcess(parent)
+
+    def fail_remaining(error):
+        for _, target, _ in elevated:
+            results.setdefault(target, error)
+
+    def on_finished(exit_code, exit_status):
+        stdout = process.readAllStandardOutput().data().decode(
+            "utf-8", errors="ignore"
+        )
+        stderr = process.readAllStandardError().data().decode(
+            "utf-8", errors="ignore"
+        )
+        try:
+            for result in json.loads(stdout)["results"]:
+                results[result["target"]] = result["error"]
+        except (ValueError, KeyError, TypeError):
+            pass  # Not authorized, or the installer did not run
+        fail_remaining(stderr.strip() or f"pkexec exited with code {exit_code}")
+        done()
+
+    def on_error(error):
+        # finished is never emitted if pkexec could not be started
+        if error == QProcess.ProcessError.FailedToStart:
+            fail_remaining("could not start pkexec")
+            done()
+
+    def done():
+        try:
+            process.deleteLater()
+        except RuntimeError:
+            pass  # Already destroyed along with its parent at shutdown
+        finish()
+
+    process.finished.connect(on_finished)
+    process.errorOccurred.connect(on_error)
+    trace_process(process, "pkexec file_installer")
+    process.start("pkexec", [sys.executable, FILE_INSTALLER])
+    process.write(json.dumps(manifest).encode("utf-8"))
+    process.closeWriteChannel()
+
+
+TRANSACTION_RUNNER = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "transaction_runner.py"
+)
+
+
+def is_combined_profile(profile):
+    """True if a TDP profile also carries fan settings."""
+    return "fan-profile" in profile or "fan-speed" in profile
+
+
+class ProfileTransaction:
+    """Apply TDP and fan settings together as one transaction.
+
+    A combined profile is a TDP profile with a "fan-profile" (NBFC config
+    name) and/or a "fan-speed" (manual fan speed in percent, null for
+    automatic control). All steps run in order in one transaction_runner
+    process, which runs as the user and passes each step to pkexec, so
+    the ryzenadj and nbfc polkit actions authorize them without a
+    password prompt. If one fails, the steps before it are rolled back
+    to the previous known-good state: the TDP settings last applied
+    through the TdpApplier, the NBFC config last reported by nbfc, and
+    automatic fan control.
+    """
+
+    def __init__(self, tdp_applier, parent=None):
+        self.tdp_applier = tdp_applier
+        self.parent = parent
+        self.running = False
+        self.pending = None  # (profile, callback) waiting its turn
+
+    def apply(self, profile, callback=None):
+        """Apply a combined profile; a newer request replaces a queued one.
+
+        Args:
+            profile: Profile dictionary with TDP and fan settings
+            callback: Optional callback function(success, message)
+        """
+        if self.running:
+            if self.pending is not None and self.pending[1]:
+                self.pending[1](False, "Superseded by a newer profile")
+            self.pending = (profile, callback)
+            return
+        self._start(profile, callback)
+
+    def plan(self, profile):
+        """Build the ordered transaction steps for a profile."""
+        steps = []
+        command = build_ryzenadj_command(profile)
+        if len(command) > 1:
+            previous = self.tdp_applier.applied
+            rollback = None
+            if previous:
+                rollback = ["ryzenadj"] + [
+                    f"{option}={value}"
+                    for option, value in previous.items()
+                    if option != "mode"
+                ]
+                if "mode" in previous:
+                    rollback.append(previous["mode"])
+            steps.append({"name": "tdp", "command": command, "rollback": rollback})
+
+        fan_profile = profile.get("fan-profile")
+        if fan_profile:
+            fan_profile = os.path.splitext(os.path.basename(fan_profile))[0]
+            status = source_health["nbfc"].last_value
+            previous = status[2] if status else "n/a"
+            steps.append(
+                {
+                    "name": "fan-profile",
+                    "command": ["nbfc", "config", "-a", fan_profile],
+                    "rollback": (
+                        ["nbfc", "config", "-a", previous]
+                        if previous not in ("n/a", fan_profile)
+                        else None
+                    ),
+                }
+            )
+
+        if "fan-speed" in profile:
+            speed = profile["fan-speed"]
+            steps.append(
+                {
+                    "name": "fan-speed",
+                    "command": (
+                        ["nbfc", "set", "-a"]
+                        if speed is None
+                        else ["nbfc", "set", "-s", str(int(speed))]
+                    ),
+                    "rollback": ["nbfc", "set", "-a"],
+                }
+            )
+        return steps
+
+    def _start(self, profile, callback):
+        steps = self.plan(profile)
+        if not steps:
+            if callback:
+                callback(False, "Nothing to apply")
+            return
+        self.running = True
+        start = time.monotonic()
+        process = QProcess(self.parent)
+
+        def on_finished(exit_code, exit_status):
+            stdout = process.readAllStandardOutput().data().decode(
+                "utf-8", errors="ignore"
+            )
+            stderr = process.readAllStandardError().data().decode(
+                "utf-8", errors="ignore"
+            )
+            try:
+                report = json.loads(stdout)
+            except ValueError:
+                # The runner did not run; nothing changed
+                done(
+                    False,
+                    "Error applying profile: "
+                    + (stderr.strip() or f"runner exited with code {exit_code}"),
+                )
+                return
+            done(*self._summarize(steps, report, time.monotonic() - start))
+
+        def on_error(error):
+            # finished is never emitted if the runner could not be started
+            if error == QProcess.ProcessError.FailedToStart:
+                done(False, "Error applying profile: could not start the runner")
+
+        def done(success, message):
+            session_recording.record(
+                "apply_result", target="transaction", success=success, message=message
+            )
+            if success:
+                diagnostics.info("transaction.applied", message)
+            else:
+                diagnostics.error("transaction.failed", message)
+            try:
+                process.deleteLater()
+            except RuntimeError:
+                pass  # Already destroyed along with its parent at shutdown
+            self.running = False
+            if callback:
+                callback(success, message)
+            if self.pending:
+                pending_profile, pending_callback = self.pending
+                self.pending = None
+                self._start(pending_profile, pending_callback)
+
+        session_recording.record("apply", target="transaction", steps=steps)
+        if session_recording.backend is not None:
+            done(*session_recording.backend.apply_result("transaction"))
+            return
+        process.finished.connect(on_finished)
+        process.errorOccurred.connect(on_error)
+        trace_process(process, "transaction_runner")
+        process.start(sys.executable, [TRANSACTION_RUNNER])
+        process.write(json.dumps({"steps": steps}).encode("utf-8"))
+        process.closeWriteChannel()
+
+    def _summarize(self, steps, report, elapsed):
+        """Update the known-good state and describe the outcome."""
+        timing = f"{elapsed:.2f} s total, {report['seconds']:.2f} s in steps"
+        failed = [step for step in report["steps"] if not step["ok"]]
+        if not failed:
+            for step in steps:
+                if step["name"] == "tdp":
+                    self.tdp_applier.applied.update(
+                        _ryzenadj_settings(step["command"])
+                    )
+            names = ", ".join(step["name"] for step in steps)
+            return True, f"Applied {names} ({timing})"
+
+        message = f"Error applying {failed[0]['name']}: {failed[0]['error']}"
+        if report["rollback_errors"]:
+            # The hardware state is unknown now, so re-send everything
+            self.tdp_applier.applied = {}
+            errors = "; ".join(
+                f"{entry['name']}: {entry['error']}"
+                for entry in report["rollback_errors"]
+            )
+            message += f". Rollback failed ({errors})"
+        elif report["rolled_back"]:
+            message += f". Rolled back {', '.join(report['rolled_back'])}"
+        return False, f"{message} ({timing})"
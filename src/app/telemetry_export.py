@@ -0,0 +1,350 @@
+"""Export of the telemetry for offline analysis.
+
+Three ways out:
+- A live log: every sampler sample appended to a CSV or JSON Lines file
+  by a writer thread, so a slow disk never stalls the GUI.
+- A one-shot export of a time range from TelemetryHistory as CSV, JSON
+  Lines or a compact binary format, written on a worker thread.
+- read_binary() to decode the binary format again.
+
+Range exports are generator pipelines (history rows -> encoded chunks ->
+file), so memory use does not grow with the length of the range.
+
+The binary format starts with a header (MAGIC, version, step, series
+names), then one record per window: the window index delta, a bitmask of
+the series present, and for each present series its mean, min and max
+quantized to 1/100 and delta-encoded against the previous window. All
+integers are zigzag LEB128 varints.
+"""
+
+import csv
+import io
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.app import diagnostics
+from src.app.telemetry_history import SERIES
+
+MAGIC = b"RMCT"
+VERSION = 1
+QUANTUM = 100  # Binary values are stored in hundredths
+
+# Sample fields written to the live log
+LIVE_FIELDS = ("temperature", "power", "fan_speed")
+LIVE_QUEUE_SIZE = 10000
+LOG_DIR = os.path.expanduser("~/.local/share/ryzen-master-commander")
+
+FORMATS = ("csv", "jsonl", "binary")
+
+
+def format_for_path(path):
+    """Guess the export format from a file name's extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    if extension in (".rmct", ".bin"):
+        return "binary"
+    return "csv"
+
+
+def csv_chunks(rows, names=SERIES):
+    """Encode history rows as CSV text, one chunk per line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(cells):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(cells)
+        return buffer.getvalue()
+
+    header = ["time"]
+    for name in names:
+        header += [f"{name}_mean", f"{name}_min", f"{name}_max"]
+    yield line(header)
+    for window, values in rows:
+        # ISO 8601, so the fan profile editor can load it as a trace
+        cells = [datetime.fromtimestamp(window).isoformat(timespec="seconds")]
+        for name in names:
+            if name in values:
+                low, high, mean = values[name]
+                cells += [f"{mean:.2f}", f"{low:.2f}", f"{high:.2f}"]
+            else:
+                cells += ["", "", ""]
+        yield line(cells)
+
+
+def jsonl_chunks(rows, names=SERIES):
+    """Encode history rows as JSON Lines, one object per window."""
+    for window, values in rows:
+        record = {"time": window}
+        for name in names:
+            if name in values:
+                low, high, mean = values[name]
+                record[name] = {"mean": mean, "min": low, "max": high}
+        yield json.dumps(record) + "\n"
+
+
+def _varint(value):
+    """Zigzag LEB128 encoding of a signed integer."""
+    value = -2 * value - 1 if value < 0 else 2 * value
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def binary_chunks(rows, names=SERIES, step=1):
+    """Encode history rows in the delta-encoded binary format."""
+    if len(names) > 8:
+        raise ValueError("the binary format holds at most 8 series")
+    header = bytearray(MAGIC)
+    header.append(VERSION)
+    header += _varint(step) + _varint(len(names))
+    for name in names:
+        encoded = name.encode()
+        header += _varint(len(encoded)) + encoded
+    yield bytes(header)
+
+    previous_window = 0
+    previous = {name: (0, 0, 0) for name in names}
+    for window, values in rows:
+        index = int(window // step)
+        record = bytearray(_varint(index - previous_window))
+        previous_window = index
+        mask = 0
+        fields = bytearray()
+        for bit, name in enumerate(names):
+            if name not in values:
+                continue
+            mask |= 1 << bit
+            low, high, mean = values[name]
+            quantized = tuple(round(v * QUANTUM) for v in (mean, low, high))
+            for value, last in zip(quantized, previous[name]):
+                fields += _varint(value - last)
+            previous[name] = quantized
+        record.append(mask)
+        record += fields
+        yield bytes(record)
+
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return (result >> 1) ^ -(result & 1), position
+
+
+def read_binary(path):
+    """Decode a binary export.
+
+    Yields:
+        (window start, {name: (min, max, mean)}) like
+        TelemetryHistory.iter_rows, with values rounded to 1/100
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC or data[4] != VERSION:
+        raise ValueError("not a telemetry export")
+    step, position = _read_varint(data, 5)
+    count, position = _read_varint(data, position)
+    names = []
+    for _ in range(count):
+        length, position = _read_varint(data, position)
+        names.append(data[position : position + length].decode())
+        position += length
+
+    window = 0
+    previous = {name: (0, 0, 0) for name in names}
+    while position < len(data):
+        delta, position = _read_varint(data, position)
+        window += delta
+        mask = data[position]
+        position += 1
+        values = {}
+        for bit, name in enumerate(names):
+            if not mask & (1 << bit):
+                continue
+            quantized = []
+            for last in previous[name]:
+                delta, position = _read_varint(data, position)
+                quantized.append(last + delta)
+            previous[name] = tuple(quantized)
+            mean, low, high = (v / QUANTUM for v in quantized)
+            values[name] = (low, high, mean)
+        yield window * step, values
+
+
+def export_range(history, path, start, end, step, fmt=None, names=SERIES):
+    """Stream [start, end) of the history into a file.
+
+    Args:
+        fmt: "csv", "jsonl" or "binary"; guessed from path when None
+
+    Returns:
+        Number of windows written
+    """
+    fmt = fmt or format_for_path(path)
+    written = 0
+
+    def counted():
+        nonlocal written
+        for row in history.iter_rows(start, end, step, names):
+            written += 1
+            yield row
+
+    if fmt == "binary":
+        chunks = binary_chunks(counted(), names, step)
+        f = open(path, "wb")
+    else:
+        encode = jsonl_chunks if fmt == "jsonl" else csv_chunks
+        chunks = encode(counted(), names)
+        f = open(path, "w", newline="")
+    with f:
+        for chunk in chunks:
+            f.write(chunk)
+    return written
+
+
+def export_range_async(history, path, start, end, step, callback, fmt=None):
+    """Run export_range on a worker thread.
+
+    Args:
+        callback: Function(path, rows written, error) called on the GUI
+            thread; error is an empty string on success
+    """
+    signals = _ExportSignals()
+    _pending_exports.add(signals)
+
+    def on_done(path, rows, error):
+        _pending_exports.discard(signals)
+        callback(path, rows, error)
+
+    signals.done.connect(on_done)
+    QThreadPool.globalInstance().start(
+        _ExportTask(history, path, start, end, step, fmt, signals)
+    )
+
+
+# Signal objects of running exports, kept alive until they report back
+_pending_exports = set()
+
+
+class _ExportSignals(QObject):
+    done = pyqtSignal(str, int, str)
+
+
+class _ExportTask(QRunnable):
+    def __init__(self, history, path, start, end, step, fmt, signals):
+        super().__init__()
+        self.arguments = (history, path, start, end, step, fmt)
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        try:
+            rows = export_range(*self.arguments)
+        except (OSError, ValueError) as e:
+            self.signals.done.emit(self.path, 0, str(e))
+            return
+        self.signals.done.emit(self.path, rows, "")
+
+
+def default_log_path(fmt):
+    return os.path.join(LOG_DIR, f"telemetry.{fmt}")
+
+
+class LiveExport:
+    """Append every sampler sample to a CSV or JSON Lines log.
+
+    Samples are queued on the GUI thread and encoded and written by a
+    writer thread. The queue is bounded; if the disk cannot keep up,
+    samples are dropped and counted rather than piling up in memory.
+    """
+
+    def __init__(self, sampler, path, fmt="jsonl", fields=LIVE_FIELDS):
+        self.sampler = sampler
+        self.path = path
+        self.fmt = fmt
+        self.fields = fields
+        self.queue = queue.Queue(LIVE_QUEUE_SIZE)
+        self.dropped = 0
+        self.thread = None
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "a", newline="")
+        self.thread = threading.Thread(
+            target=self._write_loop, name="telemetry-log", daemon=True
+        )
+        self.thread.start()
+        self.sampler.sample_ready.connect(self.on_sample)
+
+    def stop(self):
+        """Write out what is queued and close the log."""
+        if self.thread is None:
+            return
+        self.sampler.sample_ready.disconnect(self.on_sample)
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def on_sample(self, sample):
+        values = tuple(sample.get(field) for field in self.fields)
+        try:
+            self.queue.put_nowait((sample["time"], values))
+        except queue.Full:
+            self.dropped += 1
+            diagnostics.warning(
+                "export.live_dropped",
+                f"Telemetry log cannot keep up; {self.dropped} samples dropped",
+            )
+
+    def _write_loop(self):
+        writer = csv.writer(self.file)
+        if self.fmt == "csv" and self.file.tell() == 0:
+            writer.writerow(("time",) + self.fields)
+        while True:
+            item = self.queue.get()
+            # Write whatever else is already queued in the same batch
+            batch = [item]
+            while item is not None:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            try:
+                for entry in batch:
+                    if entry is not None:
+                        self._write(writer, *entry)
+                self.file.flush()
+            except OSError as e:
+                diagnostics.error("export.live_write", f"Telemetry log: {e}")
+            if batch[-1] is None:
+                self.file.close()
+                return
+
+    def _write(self, writer, timestamp, values):
+        if self.fmt == "csv":
+            writer.writerow(
+                (f"{timestamp:.3f}",) + tuple("" if v is None else v for v in values)
+            )
+        else:
+            record = {"time": round(timestamp, 3)}
+            record.update(zip(self.fields, values))
+            self.file.write(json.dumps(record) + "\n")
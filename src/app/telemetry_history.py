@@ -0,0 +1,393 @@
+"""Telemetry history kept as multi-level rollups.
+
+Every sample is added to three levels of fixed-size buckets (10 s, 1 min
+and 10 min), each holding the min, max, sum and count of its samples.
+A level is a ring of buckets laid out as the leaves of a segment tree, so
+adding a sample and aggregating any range of buckets are both O(log n):
+"max temperature per minute over the last 8 hours" is 480 range queries
+on the 1 min level, not a scan of every raw sample.
+
+Ranges are rounded out to whole buckets of the level that answers them,
+the finest one that still reaches back to the start of the range.
+"""
+
+import array
+import math
+import time
+
+import numpy as np
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.app import diagnostics
+
+# (bucket seconds, buckets kept); bucket counts are powers of two
+LEVELS = (
+    (10, 8192),  # About 22 hours
+    (60, 16384),  # About 11 days
+    (600, 8192),  # About 8 weeks
+)
+
+SERIES = ("temperature", "fan_speed", "power")
+
+
+class RollupLevel:
+    """Ring of buckets of one resolution, aggregated by a segment tree.
+
+    The leaves hold the buckets (bucket index modulo capacity) and every
+    inner node holds the combined min/max/sum/count of its two children.
+    """
+
+    def __init__(self, resolution, capacity):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.resolution = resolution
+        self.capacity = capacity
+        self.clear()
+
+    def add(self, timestamp, value):
+        """Add a sample; returns False if it is older than the ring."""
+        return self.merge(math.floor(timestamp / self.resolution), value, value, value, 1)
+
+    def merge(self, index, low, high, total, count):
+        """Fold an aggregate into bucket index; False if older than the ring."""
+        if self.latest is None:
+            self.latest = index
+        elif index > self.latest:
+            if index - self.latest >= self.capacity:
+                self.clear()  # Everything kept is out of the ring now
+            else:
+                # Empty the buckets skipped over (and reused) since the last
+                for skipped in range(self.latest + 1, index + 1):
+                    self._clear_leaf(skipped % self.capacity)
+            self.latest = index
+        elif index <= self.latest - self.capacity:
+            return False
+
+        node = self.capacity + index % self.capacity
+        if low < self.mins[node]:
+            self.mins[node] = low
+        if high > self.maxs[node]:
+            self.maxs[node] = high
+        self.sums[node] += total
+        self.counts[node] += count
+        self._update_parents(node)
+        return True
+
+    def load(self, index, low, high, total, count):
+        """Fold many bucket aggregates (numpy arrays) in at once.
+
+        Meant for older data, e.g. from the archive: buckets more than the
+        ring's capacity behind the newest one are dropped, and skipped
+        buckets are not cleared. The tree is rebuilt in one vectorized
+        pass instead of updating parents bucket by bucket.
+        """
+        if not len(index):
+            return
+        newest = int(index.max())
+        if self.latest is not None:
+            newest = max(newest, self.latest)
+        keep = index > newest - self.capacity
+        self.latest = newest
+        slots = index[keep] % self.capacity + self.capacity
+        mins = np.frombuffer(self.mins, dtype=np.float64)
+        maxs = np.frombuffer(self.maxs, dtype=np.float64)
+        sums = np.frombuffer(self.sums, dtype=np.float64)
+        counts = np.frombuffer(self.counts, dtype=np.int64)
+        np.minimum.at(mins, slots, low[keep])
+        np.maximum.at(maxs, slots, high[keep])
+        np.add.at(sums, slots, total[keep])
+        np.add.at(counts, slots, count[keep])
+        size = self.capacity // 2
+        while size:
+            # Parents size..2*size-1 from children 2*size..4*size-1
+            children = slice(2 * size, 4 * size)
+            mins[size : 2 * size] = np.minimum(mins[children][::2], mins[children][1::2])
+            maxs[size : 2 * size] = np.maximum(maxs[children][::2], maxs[children][1::2])
+            sums[size : 2 * size] = sums[children][::2] + sums[children][1::2]
+            counts[size : 2 * size] = counts[children][::2] + counts[children][1::2]
+            size //= 2
+
+    def clear(self):
+        nodes = 2 * self.capacity
+        self.mins = array.array("d", [math.inf]) * nodes
+        self.maxs = array.array("d", [-math.inf]) * nodes
+        self.sums = array.array("d", [0.0]) * nodes
+        self.counts = array.array("q", [0]) * nodes
+        self.latest = None  # Index of the newest bucket
+
+    def _clear_leaf(self, slot):
+        node = self.capacity + slot
+        if self.counts[node]:
+            self.mins[node] = math.inf
+            self.maxs[node] = -math.inf
+            self.sums[node] = 0.0
+            self.counts[node] = 0
+            self._update_parents(node)
+
+    def _update_parents(self, node):
+        mins, maxs, sums, counts = self.mins, self.maxs, self.sums, self.counts
+        node //= 2
+        while node:
+            left, right = 2 * node, 2 * node + 1
+            mins[node] = min(mins[left], mins[right])
+            maxs[node] = max(maxs[left], maxs[right])
+            sums[node] = sums[left] + sums[right]
+            counts[node] = counts[left] + counts[right]
+            node //= 2
+
+    def oldest(self):
+        """Start time of the oldest bucket the ring can hold, or None."""
+        if self.latest is None:
+            return None
+        return (self.latest - self.capacity + 1) * self.resolution
+
+    def query(self, start, end):
+        """Aggregate the buckets overlapping [start, end).
+
+        Returns:
+            Tuple of (min, max, sum, count); min and max are inf/-inf and
+            count is 0 when the range holds no samples
+        """
+        result = [math.inf, -math.inf, 0.0, 0]
+        if self.latest is None:
+            return tuple(result)
+        first = max(
+            math.floor(start / self.resolution), self.latest - self.capacity + 1
+        )
+        last = min(math.ceil(end / self.resolution) - 1, self.latest)
+        if first > last:
+            return tuple(result)
+        low, high = first % self.capacity, last % self.capacity
+        if low <= high:
+            self._combine(result, low, high)
+        else:  # The range wraps around the end of the ring
+            self._combine(result, low, self.capacity - 1)
+            self._combine(result, 0, high)
+        return tuple(result)
+
+    def _combine(self, result, low, high):
+        """Fold the leaves low..high (inclusive) into result."""
+        low += self.capacity
+        high += self.capacity + 1
+        while low < high:
+            if low & 1:
+                self._fold(result, low)
+                low += 1
+            if high & 1:
+                high -= 1
+                self._fold(result, high)
+            low //= 2
+            high //= 2
+
+    def _fold(self, result, node):
+        if self.counts[node]:
+            result[0] = min(result[0], self.mins[node])
+            result[1] = max(result[1], self.maxs[node])
+            result[2] += self.sums[node]
+            result[3] += self.counts[node]
+
+
+def summarize(aggregate):
+    """Turn a (min, max, sum, count) tuple into a dict with the mean."""
+    low, high, total, count = aggregate
+    if not count:
+        return {"min": None, "max": None, "mean": None, "count": 0}
+    return {"min": low, "max": high, "mean": total / count, "count": count}
+
+
+class TelemetryHistory(QObject):
+    """Rollups of temperature, power (from the sampler) and fan speed.
+
+    Fan speed comes from nbfc, so it is recorded by whoever reads it,
+    through add().
+    """
+
+    def __init__(self, sampler=None, levels=LEVELS, series=SERIES, parent=None):
+        super().__init__(parent)
+        self.pending_load = None
+        self.series = {
+            name: [RollupLevel(resolution, capacity) for resolution, capacity in levels]
+            for name in series
+        }
+        if sampler is not None:
+            sampler.sample_ready.connect(self.on_sample)
+
+    def on_sample(self, sample):
+        for name in ("temperature", "power"):
+            value = sample.get(name)
+            if value is not None:
+                self.add(name, sample["time"], value)
+
+    def add(self, name, timestamp, value):
+        for level in self.series[name]:
+            level.add(timestamp, value)
+
+    def load_archive_async(self, archive, callback=None):
+        """Refill the rollups from a TelemetryArchive.
+
+        The archive is decoded and bucketed on a worker thread; the
+        buckets are then folded in on the GUI thread in one pass per
+        level. Samples arriving meanwhile are kept.
+
+        Args:
+            callback: Function() called once the rollups are loaded
+        """
+        signals = _ArchiveLoadSignals()
+        self.pending_load = signals
+
+        def on_done(buckets):
+            self.pending_load = None
+            self.load_buckets(buckets)
+            if callback is not None:
+                callback()
+
+        signals.done.connect(on_done)
+        QThreadPool.globalInstance().start(
+            _ArchiveLoadTask(archive, self.layout(), signals)
+        )
+
+    def layout(self):
+        """Return {name: [(resolution, capacity)]} of the levels."""
+        return {
+            name: [(level.resolution, level.capacity) for level in levels]
+            for name, levels in self.series.items()
+        }
+
+    def load_buckets(self, buckets):
+        """Fold in the result of bucket_archive()."""
+        for name, per_level in buckets.items():
+            for level, arrays in zip(self.series[name], per_level):
+                if arrays is not None:
+                    level.load(*arrays)
+
+    def level_for(self, name, start, step=None):
+        """Pick the finest level reaching back to start.
+
+        With a step, only levels whose resolution divides it qualify, so
+        that every step window is made of whole buckets. Falls back to the
+        coarsest qualifying level.
+        """
+        levels = [
+            level
+            for level in self.series[name]
+            if step is None or step % level.resolution == 0
+        ] or self.series[name][:1]
+        for level in levels:
+            oldest = level.oldest()
+            if oldest is None or oldest <= start:
+                return level
+        return levels[-1]
+
+    def aggregate(self, name, start, end):
+        """Return {"min", "max", "mean", "count"} over [start, end)."""
+        return summarize(self.level_for(name, start).query(start, end))
+
+    def iter_rows(self, start, end, step, names=SERIES):
+        """Yield the windows of [start, end) one at a time, in time order.
+
+        Memory stays bounded whatever the range. Windows without any
+        samples are skipped. Safe to run on a worker thread while samples
+        are added; windows at the live edge may then miss the newest ones.
+
+        Yields:
+            (window start, {name: (min, max, mean)}) with only the series
+            that have samples in the window
+        """
+        levels = {name: self.level_for(name, start, step) for name in names}
+        window = math.floor(start / step) * step
+        while window < end:
+            values = {}
+            for name, level in levels.items():
+                low, high, total, count = level.query(window, window + step)
+                if count:
+                    values[name] = (low, high, total / count)
+            if values:
+                yield window, values
+            window += step
+
+    def series_range(self, name, start, end, step):
+        """Aggregate [start, end) in windows of step seconds.
+
+        Windows are aligned to multiples of step; empty ones are skipped.
+
+        Returns:
+            List of (window start, min, max, mean)
+        """
+        level = self.level_for(name, start, step)
+        rows = []
+        window = math.floor(start / step) * step
+        while window < end:
+            low, high, total, count = level.query(window, window + step)
+            if count:
+                rows.append((window, low, high, total / count))
+            window += step
+        return rows
+
+
+def bucket_archive(archive, layout, now=None):
+    """Aggregate archived samples into the buckets of every level.
+
+    Only buckets a level can still hold (relative to now) are kept, so the
+    result stays small however long the archive is.
+
+    Returns:
+        {name: [(index, min, max, sum, count) arrays or None, per level]}
+    """
+    now = time.time() if now is None else now
+    longest = max(
+        resolution * capacity for levels in layout.values() for resolution, capacity in levels
+    )
+    parts = {name: [[] for _ in levels] for name, levels in layout.items()}
+    for times, values in archive.iter_blocks(now - longest, None, tuple(layout)):
+        for name, column in values.items():
+            valid = ~np.isnan(column)
+            stamps, column = times[valid], column[valid]
+            if not len(column):
+                continue
+            for (resolution, capacity), collected in zip(layout[name], parts[name]):
+                index = np.floor(stamps / resolution).astype(np.int64)
+                recent = index > now // resolution - capacity
+                if not recent.any():
+                    continue
+                index, samples = index[recent], column[recent]
+                # Samples are in time order, so each bucket is one run
+                starts = np.flatnonzero(np.diff(index, prepend=index[0] - 1))
+                collected.append(
+                    (
+                        index[starts],
+                        np.minimum.reduceat(samples, starts),
+                        np.maximum.reduceat(samples, starts),
+                        np.add.reduceat(samples, starts),
+                        np.diff(np.append(starts, len(samples))),
+                    )
+                )
+    return {
+        name: [
+            tuple(np.concatenate(arrays) for arrays in zip(*collected))
+            if collected
+            else None
+            for collected in per_level
+        ]
+        for name, per_level in parts.items()
+    }
+
+
+class _ArchiveLoadSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class _ArchiveLoadTask(QRunnable):
+    def __init__(self, archive, layout, signals):
+        super().__init__()
+        self.archive = archive
+        self.layout = layout
+        self.signals = signals
+
+    def run(self):
+        try:
+            buckets = bucket_archive(self.archive, self.layout)
+        except Exception as e:
+            # Finish the load anyway, so pending_load is cleared
+            diagnostics.error("archive.load", f"Could not load telemetry archive: {e}")
+            buckets = {}
+        self.signals.done.emit(buckets)
@@ -0,0 +1,172 @@
+"""Streaming summary statistics of the sampled telemetry.
+
+Every sample updates each series in O(1), so the panel and the tray
+tooltip never rescan the history:
+
+- P2Quantile estimates one quantile with the P² algorithm (Jain and
+  Chlamtac, 1985) using five markers.
+- WindowedQuantile keeps staggered P² sketches restarted every half
+  window, and answers from the oldest, so it covers between half and all
+  of the window.
+- WindowMax is a monotonic queue, amortized O(1) per sample.
+- The session mean is a running sum, and the EWMA decays by elapsed time.
+"""
+
+import collections
+import math
+
+from PyQt6.QtCore import QObject
+
+DEFAULT_WINDOW = 3600.0
+EWMA_TIME_CONSTANT = 60.0
+
+
+class P2Quantile:
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.heights = []  # Marker heights q0..q4
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.count += 1
+        q = self.heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = candidate
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        """Return the estimate, or None before the first sample."""
+        if not self.heights:
+            return None
+        if self.count <= 5:
+            # Exact while there are too few samples for the markers
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
+
+
+class WindowedQuantile:
+    def __init__(self, p, window=DEFAULT_WINDOW):
+        self.p = p
+        self.window = window
+        self.sketches = collections.deque()  # (start time, P2Quantile)
+
+    def add(self, now, x):
+        if not self.sketches or now - self.sketches[-1][0] >= self.window / 2:
+            self.sketches.append((now, P2Quantile(self.p)))
+        while now - self.sketches[0][0] >= self.window:
+            self.sketches.popleft()
+        for _, sketch in self.sketches:
+            sketch.add(x)
+
+    def value(self):
+        return self.sketches[0][1].value() if self.sketches else None
+
+
+class WindowMax:
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.queue = collections.deque()  # (time, value), values decreasing
+
+    def add(self, now, x):
+        while self.queue and self.queue[-1][1] <= x:
+            self.queue.pop()
+        self.queue.append((now, x))
+        while now - self.queue[0][0] > self.window:
+            self.queue.popleft()
+
+    def value(self):
+        return self.queue[0][1] if self.queue else None
+
+
+class SeriesStats:
+    """p50/p95/max over a sliding window plus session and moving means."""
+
+    def __init__(self, window=DEFAULT_WINDOW, time_constant=EWMA_TIME_CONSTANT):
+        self.p50 = WindowedQuantile(0.5, window)
+        self.p95 = WindowedQuantile(0.95, window)
+        self.max = WindowMax(window)
+        self.time_constant = time_constant
+        self.count = 0
+        self.total = 0.0
+        self.ewma = None
+        self.last_time = None
+
+    def add(self, now, x):
+        self.p50.add(now, x)
+        self.p95.add(now, x)
+        self.max.add(now, x)
+        self.count += 1
+        self.total += x
+        if self.ewma is None:
+            self.ewma = x
+        else:
+            alpha = 1 - math.exp(-(now - self.last_time) / self.time_constant)
+            self.ewma += alpha * (x - self.ewma)
+        self.last_time = now
+
+    def summary(self):
+        return {
+            "p50": self.p50.value(),
+            "p95": self.p95.value(),
+            "max": self.max.value(),
+            "mean": self.total / self.count if self.count else None,
+            "ewma": self.ewma,
+        }
+
+
+class TelemetryStats(QObject):
+    """Keep SeriesStats for the temperature and power of every sample."""
+
+    SERIES = ("temperature", "power")
+
+    def __init__(self, sampler, window=DEFAULT_WINDOW, parent=None):
+        super().__init__(parent)
+        self.window = window
+        self.series = {name: SeriesStats(window) for name in self.SERIES}
+        sampler.sample_ready.connect(self.on_sample)
+
+    def on_sample(self, sample):
+        for name, stats in self.series.items():
+            value = sample.get(name)
+            if value is not None:
+                stats.add(sample["monotonic"], value)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.series.items()}
@@ -0,0 +1,174 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+# Sampling interval requested from the sampler while the governor runs
+GOVERNOR_INTERVAL_MS = 500
+
+
+class PIController:
+    """Incremental (velocity form) PI controller with a slew rate limit.
+
+    The output moves by kp * (change in error) + ki * error * dt per step,
+    at most max_rate units per second, and is clamped to its bounds. As the
+    output itself is the only state, there is no integrator to wind up
+    while it sits at a bound.
+    """
+
+    def __init__(self, kp, ki, output_min, output_max, max_rate):
+        self.kp = kp
+        self.ki = ki
+        self.output_min = output_min
+        self.output_max = output_max
+        self.max_rate = max_rate
+        self.output = output_max
+        self.previous_error = None
+
+    def reset(self, output):
+        self.output = min(self.output_max, max(self.output_min, output))
+        self.previous_error = None
+
+    def update(self, error, dt, allow_increase=True):
+        """Advance one step and return the new output.
+
+        Args:
+            error: Setpoint minus measurement (positive means headroom)
+            dt: Seconds since the previous step
+            allow_increase: False to hold the output where raising it would
+                have no effect (e.g. the limit is not what bounds power)
+        """
+        if self.previous_error is None:
+            self.previous_error = error
+        delta = self.kp * (error - self.previous_error) + self.ki * error * dt
+        self.previous_error = error
+
+        max_step = self.max_rate * dt
+        delta = min(max_step, max(-max_step, delta))
+        if delta > 0 and not allow_increase:
+            delta = 0.0
+        self.output = min(self.output_max, max(self.output_min, self.output + delta))
+        return self.output
+
+
+class ThermalGovernor:
+    """Hold a temperature target by steering the sustained power limit.
+
+    Fed temperature and power samples, it returns a new slow-limit (whole
+    watts) only when the rounded value changes and the previous change is
+    at least min_interval seconds old, so ryzenadj is called rarely even
+    when sampling at several Hz. While package power sits well below the
+    current limit the limit is not what holds the temperature, so it is
+    not raised further.
+    """
+
+    def __init__(
+        self,
+        target_temp,
+        min_limit,
+        max_limit,
+        start_limit=None,
+        kp=0.6,
+        ki=0.08,
+        max_rate=1.0,
+        min_interval=2.0,
+        power_headroom=2.0,
+    ):
+        self.target_temp = target_temp
+        self.min_interval = min_interval
+        self.power_headroom = power_headroom
+        self.controller = PIController(kp, ki, min_limit, max_limit, max_rate)
+        self.controller.reset(max_limit if start_limit is None else start_limit)
+        self.applied_limit = round(self.controller.output)
+        self.applied_at = None
+        self.last_time = None
+
+    def step(self, temperature, power, now):
+        """Process one sample.
+
+        Args:
+            temperature: CPU temperature in °C (None skips the sample)
+            power: Package power in W, or None if unknown
+            now: Monotonic time of the sample in seconds
+
+        Returns:
+            The slow-limit in W to apply now, or None
+        """
+        if temperature is None:
+            return None
+        if self.last_time is None:
+            self.last_time = now
+            return None
+        dt = now - self.last_time
+        self.last_time = now
+        if dt <= 0:
+            return None
+
+        allow_increase = (
+            power is None
+            or power >= self.controller.output - self.power_headroom
+        )
+        output = self.controller.update(
+            self.target_temp - temperature, dt, allow_increase
+        )
+
+        limit = round(output)
+        if limit == self.applied_limit:
+            return None
+        if self.applied_at is not None and now - self.applied_at < self.min_interval:
+            return None
+        self.applied_limit = limit
+        self.applied_at = now
+        return limit
+
+
+class GovernorRunner(QObject):
+    """Drive a ThermalGovernor from the sampler and apply its output.
+
+    Emits limit_changed with each slow-limit handed to apply_limit, and
+    status_changed with a short human readable state for the UI.
+    """
+
+    limit_changed = pyqtSignal(int)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, sampler, apply_limit, parent=None):
+        super().__init__(parent)
+        self.sampler = sampler
+        self.apply_limit = apply_limit
+        self.governor = None
+
+    def is_running(self):
+        return self.governor is not None
+
+    def start(self, governor):
+        """Start (or restart with new parameters) the control loop."""
+        if self.governor is None:
+            self.sampler.sample_ready.connect(self.on_sample)
+        self.governor = governor
+        self.sampler.request_interval(self, GOVERNOR_INTERVAL_MS)
+        self.status_changed.emit(
+            f"Holding {governor.target_temp:g} °C "
+            f"({governor.controller.output_min:g}-"
+            f"{governor.controller.output_max:g} W)"
+        )
+
+    def stop(self):
+        if self.governor is None:
+            return
+        self.sampler.sample_ready.disconnect(self.on_sample)
+        self.sampler.release(self)
+        self.governor = None
+        self.status_changed.emit("")
+
+    def on_sample(self, sample):
+        if self.governor is None:
+            return
+        limit = self.governor.step(
+            sample.get("temperature"), sample.get("power"), sample["monotonic"]
+        )
+        if limit is not None:
+            self.apply_limit(limit)
+            self.limit_changed.emit(limit)
+            self.status_changed.emit(
+                f"{limit} W at {sample['temperature']:.1f} °C "
+                f"(target {self.governor.target_temp:g} °C)"
+            )
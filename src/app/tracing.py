@@ -0,0 +1,248 @@
+"""Lightweight span tracing, exported as Chrome/Perfetto trace JSON.
+
+Tracing is off by default. When off, span() returns a shared no-op
+context manager and traced() functions run with a single flag check, so
+instrumented code costs next to nothing. When on, finished spans go into
+a fixed-size ring buffer in memory; export_chrome_trace() writes them in
+the Trace Event format understood by chrome://tracing and ui.perfetto.dev.
+
+Enable with RMC_TRACE=1 in the environment, from the tray menu, or with
+enable(). `kill -USR1 <pid>` dumps the buffer to TRACE_DIR.
+"""
+
+import collections
+import functools
+import json
+import os
+import signal
+import socket
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QProcess, QSocketNotifier
+
+from src.app import diagnostics
+
+DEFAULT_CAPACITY = 20000
+TRACE_DIR = os.path.expanduser("~/.cache/ryzen-master-commander")
+
+_enabled = False
+# (name, category, start µs, duration µs, thread id, args)
+_events = collections.deque(maxlen=DEFAULT_CAPACITY)
+_lock = threading.Lock()
+_origin = time.perf_counter()
+_thread_names = {}
+
+# Spans of child processes are shown on their own track
+PROCESS_TRACK = -1
+
+
+def _now_us():
+    return (time.perf_counter() - _origin) * 1000000
+
+
+def enable(capacity=None):
+    """Start recording spans, optionally resizing the ring buffer."""
+    global _enabled, _events
+    if capacity is not None and capacity != _events.maxlen:
+        with _lock:
+            _events = collections.deque(_events, maxlen=capacity)
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def clear():
+    with _lock:
+        _events.clear()
+
+
+def record(name, category, start_us, duration_us, tid=None, args=None):
+    """Append a finished span to the ring buffer."""
+    if tid is None:
+        thread = threading.current_thread()
+        tid = thread.ident
+        _thread_names.setdefault(tid, thread.name)
+    with _lock:
+        _events.append((name, category, start_us, duration_us, tid, args))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        record(self.name, self.category, self.start, _now_us() - self.start, args=args)
+        return False
+
+
+def span(name, category="app", args=None):
+    """Context manager timing a block as one span (no-op when disabled)."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name, category="app"):
+    """Decorator recording every call of a function as a span."""
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = _now_us()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, category, start, _now_us() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def trace_process(process, label):
+    """Record a QProcess from now (just before start) until it ends.
+
+    Call right before process.start(). Does nothing when disabled.
+    """
+    if not _enabled:
+        return
+    start = _now_us()
+
+    def on_finished(exit_code, exit_status):
+        record(
+            label,
+            "process",
+            start,
+            _now_us() - start,
+            tid=PROCESS_TRACK,
+            args={"exit_code": exit_code},
+        )
+
+    def on_error(error):
+        if error == QProcess.ProcessError.FailedToStart:
+            record(
+                label,
+                "process",
+                start,
+                _now_us() - start,
+                tid=PROCESS_TRACK,
+                args={"error": "failed to start"},
+            )
+
+    process.finished.connect(on_finished)
+    process.errorOccurred.connect(on_error)
+
+
+def export_chrome_trace(path):
+    """Write the buffered spans as Chrome trace JSON; returns the count."""
+    with _lock:
+        events = list(_events)
+    pid = os.getpid()
+    trace = [
+        {
+            "ph": "M",
+            "name": "thread_name",
+            "pid": pid,
+            "tid": PROCESS_TRACK,
+            "args": {"name": "child processes"},
+        }
+    ]
+    for tid, name in _thread_names.items():
+        trace.append(
+            {"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+        )
+    for name, category, start, duration, tid, args in events:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round(start, 1),
+            "dur": round(duration, 1),
+            "pid": pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        trace.append(event)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+def default_trace_path():
+    return os.path.join(
+        TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json")
+    )
+
+
+class TraceSignalHandler(QObject):
+    """Dump the trace buffer when the process receives SIGUSR1.
+
+    The signal is forwarded through a socket pair (signal.set_wakeup_fd)
+    into the Qt event loop, so the dump happens promptly on the GUI thread
+    even while Qt is idle.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.reader, self.writer = socket.socketpair()
+        self.reader.setblocking(False)
+        self.writer.setblocking(False)
+        signal.set_wakeup_fd(self.writer.fileno())
+        signal.signal(signal.SIGUSR1, lambda *args: None)
+        self.notifier = QSocketNotifier(
+            self.reader.fileno(), QSocketNotifier.Type.Read, self
+        )
+        self.notifier.activated.connect(self._on_wakeup)
+
+    def _on_wakeup(self, *args):
+        try:
+            data = self.reader.recv(64)
+        except BlockingIOError:
+            return
+        if signal.SIGUSR1 in data:
+            path = default_trace_path()
+            count = export_chrome_trace(path)
+            diagnostics.info("trace.export", f"Wrote {count} trace spans to {path}")
+
+
+if os.environ.get("RMC_TRACE") == "1":
+    enable()
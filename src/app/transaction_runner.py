@@ -0,0 +1,139 @@
+"""Run ordered privileged steps as one transaction.
+
+Reads a JSON plan from stdin:
+
+    {"steps": [{"name": "tdp", "command": ["ryzenadj", ...],
+                "rollback": ["ryzenadj", ...] or null}, ...]}
+
+The runner itself runs as the user. Each command goes through its own
+pkexec call, so it is authorized by the ryzenadj or nbfc polkit action;
+only those two programs with the arguments the app builds are accepted,
+and a plan with any other command is rejected before anything runs.
+
+Steps run in order. If one fails, the rollback commands of that step and
+of every step before it run in reverse order, restoring the previous
+known-good state. Writes a JSON report to stdout:
+
+    {"steps": [{"name", "ok", "error", "seconds"}], "rolled_back": [...],
+     "rollback_errors": [...], "seconds": total}
+
+Like file_installer, this only uses the standard library.
+"""
+
+import json
+import re
+import subprocess
+import sys
+import time
+
+STEP_TIMEOUT = 30
+
+RYZENADJ_ARG = re.compile(
+    r"--(fast-limit|slow-limit|slow-time|tctl-temp|apu-skin-temp)=\d+(\.\d+)?"
+    r"|--power-saving|--max-performance"
+)
+NBFC_CONFIG_NAME = re.compile(r"[^-/\x00][^/\x00]*")
+
+
+def check_command(command):
+    """Return None if command may be run through pkexec, else why not."""
+    if not isinstance(command, list) or not all(
+        isinstance(arg, str) for arg in command
+    ):
+        return "malformed command"
+    program, args = (command[0], command[1:]) if command else ("", [])
+    if program == "ryzenadj":
+        if args and all(RYZENADJ_ARG.fullmatch(arg) for arg in args):
+            return None
+    elif program == "nbfc":
+        if args == ["set", "-a"]:
+            return None
+        if len(args) == 3 and args[:2] == ["set", "-s"] and args[2].isdigit():
+            return None
+        if (
+            len(args) == 3
+            and args[:2] == ["config", "-a"]
+            and NBFC_CONFIG_NAME.fullmatch(args[2])
+        ):
+            return None
+    return f"command not allowed: {' '.join(command)}"
+
+
+def run_command(command):
+    """Run one command through pkexec; returns None or an error message."""
+    error = check_command(command)
+    if error:
+        return error
+    try:
+        result = subprocess.run(
+            ["pkexec"] + command,
+            capture_output=True,
+            text=True,
+            timeout=STEP_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return str(e)
+    # nbfc reports some failures on stderr with exit code 0
+    if result.returncode != 0 or result.stderr.startswith("ERROR"):
+        return (
+            result.stderr.strip()
+            or result.stdout.strip()
+            or f"exit code {result.returncode}"
+        )
+    return None
+
+
+def run_transaction(steps):
+    """Run the steps, rolling back on the first failure."""
+    start = time.monotonic()
+    report = {"steps": [], "rolled_back": [], "rollback_errors": []}
+    for step in steps:
+        error = check_command(step["command"])
+        if error is None and step.get("rollback"):
+            error = check_command(step["rollback"])
+        if error:
+            # Refuse the whole plan rather than run part of it
+            report["steps"].append(
+                {"name": step["name"], "ok": False, "error": error, "seconds": 0.0}
+            )
+            report["seconds"] = time.monotonic() - start
+            return report
+
+    for index, step in enumerate(steps):
+        step_start = time.monotonic()
+        error = run_command(step["command"])
+        report["steps"].append(
+            {
+                "name": step["name"],
+                "ok": error is None,
+                "error": error,
+                "seconds": time.monotonic() - step_start,
+            }
+        )
+        if error is None:
+            continue
+
+        for done in reversed(steps[: index + 1]):
+            if not done.get("rollback"):
+                continue
+            rollback_error = run_command(done["rollback"])
+            if rollback_error is None:
+                report["rolled_back"].append(done["name"])
+            else:
+                report["rollback_errors"].append(
+                    {"name": done["name"], "error": rollback_error}
+                )
+        break
+    report["seconds"] = time.monotonic() - start
+    return report
+
+
+def main():
+    plan = json.load(sys.stdin)
+    report = run_transaction(plan["steps"])
+    json.dump(report, sys.stdout)
+    return 0 if all(step["ok"] for step in report["steps"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,38 @@ import sys
 import os
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
-from src.app.main_window import MainWindow
+from src.app.single_instance import (
+    InstanceServer,
+    forward_to_running_instance,
+    parse_arguments,
+)
+
+
+def exit_with_reply(reply):
+    """Exit after a running instance has handled the command line."""
+    if reply.startswith("error"):
+        print(reply, file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
 
 
 def main():
+    options = parse_arguments(sys.argv[1:])
+
+    # Hand the command line to a running instance instead of starting a
+    # second copy; this happens before the heavy imports below. A replay
+    # runs on its own and never touches the hardware.
+    reply = None
+    if not options.replay:
+        reply = forward_to_running_instance(sys.argv[1:])
+    if reply is not None:
+        exit_with_reply(reply)
+    if options.quit:
+        print("Ryzen Master Commander is not running")
+        sys.exit(0)
+
+    from src.app.main_window import MainWindow
+
     # Create Qt application
     # For Wayland/X11 icon and .desktop file association:
     # Set the desktop file name (without .desktop extension)
@@ -29,6 +57,22 @@ def main():
 
     app.setQuitOnLastWindowClosed(False)
 
+    # Claim the instance before the slow start-up; later launches queue
+    # their commands until the window exists and the event loop runs
+    instance_server = InstanceServer()
+    if not options.replay and not instance_server.listen():
+        # Another launch took the name since we checked; never run a
+        # second sampler and applier next to it
+        reply = forward_to_running_instance(sys.argv[1:])
+        if reply is not None:
+            exit_with_reply(reply)
+        print(
+            "Could not listen for other launches: "
+            f"{instance_server.server.errorString()}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     # Configure PyQtGraph for dark/light mode
     try:
         import pyqtgraph as pg
@@ -81,7 +125,19 @@ def main():
 
     # Create and show the main window
     main_window = MainWindow()
-    main_window.show()
+    instance_server.handler = main_window.handle_instance_command
+    if options.replay:
+        try:
+            main_window.start_replay(options.replay, options.replay_speed)
+        except (OSError, ValueError) as e:
+            print(f"Cannot replay {options.replay}: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif options.record:
+        main_window.start_session_recording(options.record)
+    if not options.minimized:
+        main_window.show()
+    if options.apply_profile:
+        main_window.profile_manager.apply_profile_by_name(options.apply_profile)
 
     # Start the application
     sys.exit(app.exec())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the rate-limited diagnostics ring, the retry backoff and the
+source circuit breaker.
+"""
+
+from src.app.diagnostics import Backoff, Diagnostics, WARNING, format_entry
+from src.app.source_health import DEGRADED, HEALTHY, OPEN, SourceHealth
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limit_counts_suppressed_repeats(tmp_path):
+    clock = Clock()
+    log = Diagnostics(capacity=10, interval=60, console_level=100, clock=clock)
+    assert log.log(WARNING, "nbfc.missing", "nbfc not found")
+    for _ in range(5):
+        clock.now += 1
+        assert not log.log(WARNING, "nbfc.missing", "nbfc not found")
+    assert log.log(WARNING, "sensors.failed", "no sensors")
+    clock.now += 60
+    assert log.log(WARNING, "nbfc.missing", "nbfc not found")
+
+    assert len(log.entries) == 3
+    assert "repeated 5 more times" in format_entry(log.entries[-1])
+    assert log.counters() == {"nbfc.missing": 7, "sensors.failed": 1}
+
+    path = tmp_path / "diagnostics.txt"
+    log.export(str(path))
+    assert "       7  nbfc.missing" in path.read_text()
+
+
+def test_backoff_doubles_until_success():
+    clock = Clock()
+    backoff = Backoff(initial=5, maximum=20, clock=clock)
+    assert backoff.ready()
+    assert [backoff.failed() for _ in range(4)] == [5, 10, 20, 20]
+    assert not backoff.ready()
+    clock.now += 20
+    assert backoff.ready()
+    backoff.succeeded()
+    assert backoff.failed() == 5
+
+
+def test_open_circuit_probes_before_reading():
+    clock = Clock()
+    installed = []
+    health = SourceHealth(
+        "nbfc", probe=lambda: bool(installed), failure_threshold=2, clock=clock
+    )
+    health.failed("connect() failed")
+    assert health.state == DEGRADED and health.allow()
+    health.failed("connect() failed")
+    assert health.state == OPEN and not health.allow()
+
+    clock.now += 5
+    assert not health.allow()  # Probe failed, so wait twice as long
+    clock.now += 5
+    assert not health.allow()
+    clock.now += 5
+    installed.append(True)
+    assert health.allow()
+    health.succeeded()
+    assert health.state == HEALTHY
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests of the per-profile energy accounting and the runtime estimate.
+"""
+
+from PyQt6.QtCore import QObject, QSettings, pyqtSignal
+
+from src.app import energy
+from src.app.energy import EnergyAccountant, EnergyMonitor, RuntimeEstimator
+from src.app.settings_store import SettingsStore
+
+
+def test_accountant_charges_intervals_to_the_previous_profile():
+    accountant = EnergyAccountant(max_gap=30)
+    accountant.add(0, "Balanced", 10.0, 20.0)
+    accountant.add(10, "Gaming", 20.0, 30.0)  # 10 s of Balanced
+    accountant.add(20, "Gaming", 30.0, None)  # Battery stopped discharging
+    accountant.add(100, "Gaming", 30.0, None)  # Suspended: gap not counted
+    accountant.add(110, "Gaming", None, None)  # Package power unknown
+
+    summary = accountant.summary()
+    balanced, gaming = summary["Balanced"], summary["Gaming"]
+    assert balanced["package_wh"] == 15.0 * 10 / 3600
+    assert balanced["package_avg_w"] == 15.0
+    assert balanced["battery_avg_w"] == 25.0
+    assert gaming["package_avg_w"] == 25.0
+    assert gaming["hours"] == 10 / 3600
+    assert gaming["battery_wh"] == 0.0 and gaming["battery_avg_w"] is None
+
+
+def test_runtime_from_power_and_from_energy_drops():
+    estimator = RuntimeEstimator(time_constant=60)
+    assert estimator.update(0, 40.0, 10.0) == 4.0
+    # A spike only moves the average part of the way
+    runtime = estimator.update(2, 40.0, 40.0)
+    assert 40.0 / 40.0 < runtime < 4.0
+
+    # No power_now: 1 Wh gone in 6 minutes is 10 W
+    estimator.reset()
+    assert estimator.update(0, 30.0) is None
+    assert estimator.update(100, 30.0) is None  # energy_now not updated yet
+    assert estimator.update(360, 29.0) == 29.0 / 10.0
+
+
+class FakeSampler(QObject):
+    sample_ready = pyqtSignal(dict)
+
+    def request_interval(self, owner, interval_ms):
+        pass
+
+    def release(self, owner):
+        pass
+
+
+def test_monitor_handles_samples_at_the_energy_interval(
+    fake_hardware, monkeypatch, tmp_path
+):
+    settings = SettingsStore(QSettings(str(tmp_path / "s.ini"), QSettings.Format.IniFormat))
+    monkeypatch.setattr(energy, "get_settings", lambda: settings)
+    reads = []
+    read_battery = energy.read_battery
+    monkeypatch.setattr(
+        energy, "read_battery", lambda root: reads.append(root) or read_battery(root)
+    )
+    sampler = FakeSampler()
+    monitor = EnergyMonitor(
+        sampler, lambda: "Balanced", sysfs_root=fake_hardware.sysfs_root
+    )
+    updates = []
+    monitor.updated.connect(updates.append)
+    # Ten seconds of 10 Hz samples requested for the graph
+    for tick in range(100):
+        sampler.sample_ready.emit({"monotonic": tick / 10, "power": 12.0})
+    # Every MIN_SAMPLE_SPACING (1.8 s) rather than every sample
+    assert len(reads) == len(updates) == 6
+    assert abs(monitor.accountant.summary()["Balanced"]["package_avg_w"] - 12.0) < 1e-9
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Tests of the hardware-facing code against the fake hardware harness.
+Commands run as real processes (fake nbfc, ryzenadj, sensors and pkexec on
+PATH), so the QProcess paths are exercised end to end.
+"""
+
+import json
+import os
+import time
+
+from fake_hardware import wait_for
+from src.app.system_utils import (
+    apply_tdp_settings,
+    get_system_readings,
+    install_files,
+    ProfileTransaction,
+    read_dmi_info,
+    source_health,
+    TdpApplier,
+)
+from src.app.nbfc_manager import NBFCManager
+from src.app.sampler import SysfsSensors
+from src.app.energy import read_battery
+from src.app.core_stats import CoreStatsSource
+
+
+def test_get_system_readings(fake_hardware):
+    fake_hardware.set_state(temperature=61.5, fan_speed=42.0, power=14.25)
+    temp, fan_speed, profile, power = get_system_readings()
+    assert (temp, fan_speed, profile, power) == (
+        "61.5",
+        "42.0",
+        "GPD Win Mini 2024",
+        "14.25",
+    )
+
+
+def test_get_system_readings_without_nbfc_service(fake_hardware):
+    fake_hardware.script(
+        "nbfc", ["status"], stderr="ERROR: connect(): No such file\n", exit_code=1
+    )
+    temp, fan_speed, profile, power = get_system_readings()
+    assert (temp, fan_speed, profile) == ("n/a", "n/a", "n/a")
+    assert power == "12.5"
+
+
+def test_failing_nbfc_opens_circuit(fake_hardware):
+    fake_hardware.script("nbfc", ["status"], stderr="ERROR: connect()\n", exit_code=1)
+    for _ in range(5):
+        get_system_readings()
+    # Three failures open the circuit; power is still read every time
+    assert len(fake_hardware.calls("nbfc")) == 3
+    assert len(fake_hardware.calls("sensors")) == 5
+    assert not source_health["nbfc"].is_available()
+    assert source_health["sensors"].is_available()
+
+
+def test_apply_tdp_settings(fake_hardware):
+    results = []
+    apply_tdp_settings(
+        {"fast-limit": 25, "slow-limit": 15, "power-saving": True},
+        lambda success, message: results.append(success),
+    )
+    assert wait_for(lambda: results)
+    assert results == [True]
+    assert fake_hardware.calls("ryzenadj") == [
+        ["--fast-limit=25000", "--slow-limit=15000", "--power-saving"]
+    ]
+
+
+def test_apply_tdp_settings_reports_failure(fake_hardware):
+    fake_hardware.script("ryzenadj", stderr="Unable to init SMU\n", exit_code=1)
+    results = []
+    apply_tdp_settings(
+        {"slow-limit": 15}, lambda success, message: results.append(message)
+    )
+    assert wait_for(lambda: results)
+    assert "Unable to init SMU" in results[0]
+
+
+def test_apply_tdp_settings_does_not_block_on_hung_ryzenadj(fake_hardware):
+    fake_hardware.script("ryzenadj", hang=True)
+    start = time.monotonic()
+    apply_tdp_settings({"slow-limit": 15})
+    assert time.monotonic() - start < 0.5
+    assert wait_for(lambda: fake_hardware.calls("ryzenadj"))
+
+
+def test_apply_tdp_settings_denied_authorization(fake_hardware):
+    fake_hardware.deny_authorization()
+    results = []
+    apply_tdp_settings(
+        {"slow-limit": 15}, lambda success, message: results.append(success)
+    )
+    assert wait_for(lambda: results)
+    assert results == [False]
+    assert fake_hardware.calls("ryzenadj") == []
+
+
+def test_tdp_applier_merges_and_deduplicates(fake_hardware):
+    fake_hardware.delay("ryzenadj", 0.3)
+    applier = TdpApplier()
+    results = []
+
+    def record(success, message):
+        results.append(success)
+
+    applier.apply({"fast-limit": 25, "slow-limit": 15}, record)
+    # Queued while the first call runs; merged into one follow-up call
+    applier.apply({"slow-limit": 14}, record)
+    applier.apply({"slow-limit": 13}, record)
+    assert wait_for(lambda: len(results) == 3)
+    # Nothing changed, so no process at all
+    applier.apply({"fast-limit": 25, "slow-limit": 13}, record)
+
+    assert results == [True, True, True, True]
+    assert fake_hardware.calls("ryzenadj") == [
+        ["--fast-limit=25000", "--slow-limit=15000"],
+        ["--slow-limit=13000"],
+    ]
+
+
+def test_profile_transaction(fake_hardware):
+    applier = TdpApplier()
+    transaction = ProfileTransaction(applier)
+    results = []
+    transaction.apply(
+        {"slow-limit": 15, "fan-profile": "HP Victus 16", "fan-speed": 40},
+        lambda success, message: results.append(success),
+    )
+    assert wait_for(lambda: results)
+    assert results == [True]
+    # One pkexec call per step, each covered by a polkit action
+    assert [call[0] for call in fake_hardware.calls("pkexec")] == [
+        "ryzenadj",
+        "nbfc",
+        "nbfc",
+    ]
+    assert fake_hardware.read_state()["config"] == "HP Victus 16"
+    assert fake_hardware.calls("nbfc")[-1] == ["set", "-s", "40"]
+    assert applier.applied == {"--slow-limit": "15000"}
+
+
+def test_profile_transaction_rolls_back(fake_hardware):
+    fake_hardware.script(
+        "nbfc", ["config", "-a"], stderr="ERROR: No such config\n", exit_code=1
+    )
+    applier = TdpApplier()
+    applier.applied = {"--slow-limit": "10000"}
+    transaction = ProfileTransaction(applier)
+    results = []
+    transaction.apply(
+        {"slow-limit": 15, "fan-profile": "Missing"},
+        lambda success, message: results.append(message),
+    )
+    assert wait_for(lambda: results)
+    assert "Rolled back tdp" in results[0]
+    assert fake_hardware.calls("ryzenadj") == [
+        ["--slow-limit=15000"],
+        ["--slow-limit=10000"],
+    ]
+    assert applier.applied == {"--slow-limit": "10000"}
+
+
+def test_transaction_runner_rejects_other_commands(fake_hardware):
+    from src.app.transaction_runner import run_transaction
+
+    report = run_transaction(
+        [
+            {"name": "tdp", "command": ["ryzenadj", "--slow-limit=15000"]},
+            {"name": "fan", "command": ["nbfc", "config", "-a", "../../etc/x"]},
+            {"name": "shell", "command": ["sh", "-c", "true"]},
+        ]
+    )
+    assert [step["ok"] for step in report["steps"]] == [False]
+    assert "not allowed" in report["steps"][0]["error"]
+    assert fake_hardware.calls() == []
+
+
+def polkit_programs():
+    """Programs that polkit lets an active session run without a prompt."""
+    import xml.etree.ElementTree as ElementTree
+
+    policy = os.path.join(
+        os.path.dirname(__file__), "polkit", "com.merrythieves.ryzenadj.policy"
+    )
+    root = ElementTree.parse(policy).getroot()
+    programs = set()
+    for action in root.iter("action"):
+        if action.findtext("defaults/allow_active") != "yes":
+            continue
+        for annotation in action.iter("annotate"):
+            if annotation.get("key") == "org.freedesktop.policykit.exec.path":
+                programs.add(os.path.basename(annotation.text))
+    return programs
+
+
+def test_automatic_profile_switches_do_not_prompt(
+    fake_hardware, tmp_path, monkeypatch
+):
+    from PyQt6.QtWidgets import QVBoxLayout, QWidget
+    from src.app.power_rules import PowerRuleController
+    from src.app.process_watcher import ProcessWatcher
+    from src.app.profile_manager import ProfileManager
+
+    profiles = tmp_path / "tdp_profiles"
+    profiles.mkdir()
+    for name, fan_profile in (("Quiet", None), ("Gaming", "GPD Win 4")):
+        profile = {
+            "name": name,
+            "fast-limit": 25,
+            "slow-limit": 15,
+            "slow-time": 10,
+            "tctl-temp": 85,
+            "apu-skin-temp": 45,
+            "max-performance": False,
+            "power-saving": True,
+        }
+        if fan_profile:
+            profile["fan-profile"] = fan_profile
+        (profiles / f"{name}.json").write_text(json.dumps(profile))
+    monkeypatch.chdir(tmp_path)
+    parent = QWidget()
+    QVBoxLayout(parent)
+    manager = ProfileManager()
+    manager.create_widgets(parent)
+    transaction = manager.profile_transaction
+
+    # An application rule switching to a profile with fan settings
+    pid_dir = os.path.join(fake_hardware.proc_root, "4190000")
+    os.makedirs(pid_dir)
+    with open(os.path.join(pid_dir, "comm"), "w") as f:
+        f.write("game.exe\n")
+    with open(os.path.join(pid_dir, "cmdline"), "w") as f:
+        f.write("game.exe\0")
+    watcher = ProcessWatcher(manager, proc_root=fake_hardware.proc_root)
+    watcher.set_profiles([{"name": "Gaming", "match-exe": ["game.exe"]}])
+    assert transaction.running
+    assert wait_for(lambda: not transaction.running)
+    assert fake_hardware.read_state()["config"] == "GPD Win 4"
+    watcher.stop()
+
+    # A power rule applying a TDP and a fan profile in one transaction
+    controller = PowerRuleController(manager, sysfs_root=fake_hardware.sysfs_root)
+    controller.rules = {
+        "battery": {"tdp_profile": "Quiet", "fan_profile": "HP Victus 16"}
+    }
+    controller.apply_rule("battery")
+    assert wait_for(lambda: not transaction.running)
+    assert fake_hardware.read_state()["config"] == "HP Victus 16"
+    controller.stop()
+
+    assert "Error" not in manager.apply_status_label.text()
+    calls = fake_hardware.calls("pkexec")
+    assert ["nbfc", "config", "-a", "HP Victus 16"] in calls
+    assert {call[0] for call in calls} <= polkit_programs()
+
+
+def test_set_nbfc_config(fake_hardware):
+    results = []
+    NBFCManager.set_nbfc_config("HP Victus 16", callback=results.append)
+    assert wait_for(lambda: results)
+    assert results == [True]
+    assert fake_hardware.read_state()["config"] == "HP Victus 16"
+
+
+def test_set_nbfc_config_error(fake_hardware):
+    fake_hardware.script(
+        "nbfc", ["config", "-s"], stderr="ERROR: No such config\n", exit_code=0
+    )
+    results = []
+    NBFCManager.set_nbfc_config("Missing", callback=results.append)
+    assert wait_for(lambda: results)
+    assert results == [False]
+
+
+def test_is_nbfc_running(fake_hardware):
+    assert NBFCManager.is_nbfc_running()
+    fake_hardware.script("nbfc", ["status"], stderr="ERROR: connect()\n")
+    # Cached until the next reading or an explicit refresh
+    assert NBFCManager.is_nbfc_running()
+    assert len(fake_hardware.calls("nbfc")) == 1
+    # Once the failures open the circuit, the daemon counts as stopped
+    for _ in range(3):
+        get_system_readings()
+    assert not NBFCManager.is_nbfc_running()
+    assert len(fake_hardware.calls("nbfc")) == 4
+
+
+def test_degraded_nbfc_still_counts_as_running(fake_hardware):
+    from src.app.source_health import DEGRADED
+
+    get_system_readings()
+    fake_hardware.script("nbfc", ["status"], stderr="ERROR: timeout\n")
+    get_system_readings()
+    assert source_health["nbfc"].state == DEGRADED
+    assert NBFCManager.is_nbfc_running()
+    # Setup leaves the running service alone
+    assert NBFCManager.setup_nbfc()
+    assert ["start"] not in fake_hardware.calls("nbfc")
+    assert fake_hardware.calls("pkexec") == []
+    # An explicit refresh reports what nbfc says now
+    assert not NBFCManager.is_nbfc_running(refresh=True)
+
+
+def test_install_files_with_one_authorization(fake_hardware, tmp_path):
+    first, second = tmp_path / "a.json", tmp_path / "missing" / "b.json"
+    first.write_text("old")
+    results = []
+    install_files(
+        [('{"name": "A"}', str(first), 0o600), ("{}", str(second), 0o644)],
+        results.extend,
+        privileged=True,
+    )
+    assert wait_for(lambda: results)
+    assert len(fake_hardware.calls("pkexec")) == 1
+    assert results[0] == (str(first), None)
+    assert results[1][0] == str(second) and "No such file" in results[1][1]
+    assert first.read_text() == '{"name": "A"}'
+    assert first.stat().st_mode & 0o777 == 0o600
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_install_files_denied_authorization(fake_hardware, tmp_path):
+    fake_hardware.deny_authorization()
+    results = []
+    install_files(
+        [("{}", str(tmp_path / "a.json"), 0o644)], results.extend, privileged=True
+    )
+    assert wait_for(lambda: results)
+    assert "Not authorized" in results[0][1]
+    assert not (tmp_path / "a.json").exists()
+
+
+def test_recommended_config_from_dmi(fake_hardware):
+    fake_hardware.add_nbfc_config("GPD G1617-01")
+    fake_hardware.add_nbfc_config("HP Victus 16")
+    candidates = NBFCManager.get_recommended_candidates(fake_hardware.sysfs_root)
+    assert candidates[0][0] == "GPD G1617-01"
+
+
+def test_fan_profile_editor_save(fake_hardware, monkeypatch, tmp_path):
+    from PyQt6.QtWidgets import QMessageBox
+    from src.app.fan_profile_editor import FanProfileEditor
+
+    messages = []
+    monkeypatch.setattr(
+        QMessageBox, "information", lambda *args: messages.append(args[1])
+    )
+    monkeypatch.setattr(
+        QMessageBox, "critical", lambda *args: messages.append(args[1])
+    )
+    monkeypatch.setenv("HOME", str(tmp_path))
+    fake_hardware.add_nbfc_config("GPD G1617-01")
+
+    editor = FanProfileEditor()
+    editor.nbfc_configs_dir = fake_hardware.nbfc_configs_dir
+    editor.points = [(30, 0), (50, 40), (70, 100)]
+    editor.custom_profile_name.setText("My Curve")
+    editor.save_custom_profile()
+
+    assert wait_for(lambda: messages)
+    assert messages == ["Success"]
+    # The fake config directory is writable, so no authorization is needed
+    assert fake_hardware.calls("pkexec") == []
+    saved = os.path.join(fake_hardware.nbfc_configs_dir, "My Curve.json")
+    with open(saved) as f:
+        config = json.load(f)
+    thresholds = config["FanConfigurations"][0]["TemperatureThresholds"]
+    assert [t["FanSpeed"] for t in thresholds] == [0, 40, 100]
+    editor.close()
+
+
+def test_sysfs_readers(fake_hardware):
+    root = fake_hardware.sysfs_root
+    fake_hardware.set_temperature(72.5)
+    fake_hardware.set_package_power(18.0)
+    sensors = SysfsSensors(root)
+    assert sensors.read_temperature() == 72.5
+    assert sensors.read_power() == 18.0
+
+    fake_hardware.set_battery("Discharging", energy_wh=30.0, power_w=9.5)
+    battery = read_battery(root)
+    assert battery["status"] == "Discharging"
+    assert battery["energy_wh"] == 30.0
+    assert battery["power_w"] == 9.5
+
+    assert read_dmi_info(root)["product_name"] == "G1617-01"
+
+
+def test_core_stats(fake_hardware):
+    source = CoreStatsSource(fake_hardware.proc_root, fake_hardware.sysfs_root)
+    fake_hardware.run_cores(busy=[10, 10, 10, 10], idle=[10, 10, 10, 10])
+    assert source.read()["utilization"] is None
+
+    fake_hardware.run_cores(busy=[100, 50, 0, 25], idle=[0, 50, 100, 75])
+    fake_hardware.set_core_frequencies([5100, 2550, 1600, 1600])
+    stats = source.read()
+    assert list(stats["utilization"]) == [1.0, 0.5, 0.0, 0.25]
+    assert list(stats["frequency"]) == [5100, 2550, 1600, 1600]
+    assert list(stats["max_frequency"]) == [5100] * 4
+    source.close()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests of the fan curve simulator against a sample-by-sample reference.
+"""
+
+import time
+
+import numpy as np
+
+from src.app.fan_curve_simulator import simulate_fan_curve, thresholds_from_points
+from src.app.graphs import CombinedGraph
+from src.app.telemetry_history import TelemetryHistory
+
+POINTS = [(20, 0), (40, 30), (60, 60), (80, 100)]
+
+
+def reference_speeds(temperatures, thresholds):
+    """Step through NBFC's threshold table one sample at a time."""
+    level, speeds = 0, []
+    for temp in temperatures:
+        while level + 1 < len(thresholds) and temp >= thresholds[level + 1]["UpThreshold"]:
+            level += 1
+        while level > 0 and temp <= thresholds[level]["DownThreshold"]:
+            level -= 1
+        speeds.append(thresholds[level]["FanSpeed"])
+    return speeds
+
+
+def test_simulation_matches_sequential_reference():
+    rng = np.random.default_rng(1)
+    temps = np.clip(60 + np.cumsum(rng.normal(0, 1.5, 5000)), 20, 100).round()
+    thresholds = thresholds_from_points(POINTS)
+    expected = reference_speeds(temps, thresholds)
+    # Small chunks put many chunk boundaries inside hysteresis bands
+    for chunk_size in (7, 64, 4096):
+        result = simulate_fan_curve(np.arange(temps.size), temps, thresholds, chunk_size)
+        assert list(result["fan_speeds"]) == expected
+    assert result["speed_changes"] == np.count_nonzero(np.diff(expected))
+    assert result["duration"] == temps.size
+
+
+def test_history_trace_for_the_simulator(qapp):
+    history = TelemetryHistory()
+    now = time.time()
+    for i in range(3600):
+        history.add("temperature", now - 3600 + i, 50 + i % 20)
+    graph = CombinedGraph(history=history)
+    times, temps = graph.get_temperature_trace()
+    # An hour at 10 s resolution rather than the 60 live readings
+    assert 359 <= len(times) <= 361
+    assert np.all(np.diff(times) == CombinedGraph.TRACE_STEP)
+    assert all(50 <= temp < 70 for temp in temps)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests of the fan curve editor's hit-test cache and drag redraw coalescing.
+"""
+
+from PyQt6.QtCore import QPointF
+
+from fake_hardware import wait_for
+from src.app.fan_profile_editor import FanProfileEditor
+
+
+def viewport_pos(editor, x, y):
+    """Map a data point to the viewport the slow, uncached way."""
+    scene = editor.view_box.mapViewToScene(QPointF(x, y))
+    return QPointF(editor.plot_widget.viewportTransform().map(scene))
+
+
+def make_editor():
+    editor = FanProfileEditor()
+    editor.resize(900, 900)
+    editor.show()
+    wait_for(lambda: False, 0.2)  # Let the view box lay out
+    return editor
+
+
+def test_hit_cache_follows_moved_points_and_view_changes(fake_hardware):
+    editor = make_editor()
+    editor.points = [(20, 0), (40, 30), (60, 60), (80, 100)]
+    editor.update_plot()
+    assert editor._get_point_at_viewport_pos(viewport_pos(editor, 40, 30)) == 1
+    assert editor.screen_points is not None
+
+    # A dragged point updates its own cache entry
+    editor._update_point_position(1, 45, 50)
+    assert editor.points[1] == (45, 50)
+    assert editor._get_point_at_viewport_pos(viewport_pos(editor, 45, 50)) == 1
+    assert editor._get_point_at_viewport_pos(viewport_pos(editor, 40, 30)) is None
+
+    # Clamped between its neighbours, so the list stays sorted
+    editor._update_point_position(1, 90, 50)
+    assert editor.points[1] == (60, 50)
+
+    # Zooming the view drops the cached positions
+    editor.view_box.setRange(xRange=(30, 70), yRange=(20, 80), padding=0)
+    assert editor.screen_points is None
+    assert editor._get_point_at_viewport_pos(viewport_pos(editor, 60, 50)) == 1
+    editor.close()
+
+
+def test_drag_redraws_are_coalesced(fake_hardware):
+    editor = make_editor()
+    redraws = []
+    set_data = editor.curve_item.setData
+    editor.curve_item.setData = lambda *args: (redraws.append(args), set_data(*args))
+    for step in range(50):
+        editor._update_point_position(1, 30 + step * 0.2, 30 + step)
+    assert redraws == []
+    assert wait_for(lambda: redraws)
+    wait_for(lambda: False, 0.1)
+    assert len(redraws) == 1
+    assert list(redraws[0][1]) == [0, 79, 60, 100]
+    editor.close()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for buffered graph updates and the capped redraw rate.
+"""
+
+import time
+
+import numpy as np
+
+from fake_hardware import wait_for
+from src.app.graphs import CombinedGraph, CoreHeatmap, RenderThrottle
+
+
+def test_fast_readings_are_drawn_at_capped_rate(qapp):
+    graph = CombinedGraph(max_points=600)
+    throttle = RenderThrottle(graph.render, max_fps=10)
+    start = time.time()
+    for i in range(50):
+        graph.add_reading(60 + i % 5, None, start + i * 0.01)
+        throttle.request()
+
+    # The first request draws at once; the other 49 fold into one frame
+    assert throttle.frames == 1
+    assert wait_for(lambda: throttle.frames == 2)
+    x, y = graph.temp_curve.getData()
+    assert len(x) == 50
+    assert abs(x[-1] - 0.49) < 1e-6
+    assert not graph.dirty
+
+
+def core_sample(monotonic, load):
+    return {
+        "monotonic": monotonic,
+        "cores": {
+            "cpus": [0, 1],
+            "utilization": np.array([load, 1 - load]),
+            "frequency": np.array([1500.0, 3000.0]),
+            "max_frequency": np.array([3000.0, 3000.0]),
+        },
+    }
+
+
+def test_heatmap_columns_follow_wall_time(qapp):
+    heatmap = CoreHeatmap(sampler=None)
+    # Ten seconds at 10 Hz fills ten columns, each the mean of its samples
+    for i in range(100):
+        heatmap.on_sample(core_sample(1000 + i * 0.1, (i % 10) / 10))
+    assert heatmap.throttle.frames == 1
+    assert wait_for(lambda: heatmap.throttle.frames == 2)
+    image = heatmap.image.image
+    assert image.shape == (CoreHeatmap.HISTORY, 2)
+    assert np.count_nonzero(image[:, 0]) == 10
+    assert np.allclose(image[-10:, 0], 0.45)
+
+    # A gap leaves empty columns; the span shown stays the same
+    heatmap.on_sample(core_sample(1015.5, 0.8))
+    heatmap.render()
+    assert np.allclose(heatmap.image.image[-6:, 0], [0, 0, 0, 0, 0, 0.8])
+    width = CoreHeatmap.HISTORY * CoreHeatmap.BUCKET_SECONDS
+    rect = heatmap.image.mapRectToParent(heatmap.image.boundingRect())
+    assert abs(rect.left() + width) < 1e-6 and abs(rect.right()) < 1e-6
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests of the NBFC config catalog: search, refresh and the metadata cache.
+"""
+
+import json
+import os
+
+from src.app.nbfc_catalog import NBFCCatalog
+
+THRESHOLDS = {"TemperatureThresholds": [{"UpThreshold": 60, "FanSpeed": 50}]}
+
+
+def write_config(directory, name, model=None, fans=1):
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(
+            {"NotebookModel": model or name, "FanConfigurations": [THRESHOLDS] * fans},
+            f,
+        )
+    return path
+
+
+def test_search_ranks_substring_then_fuzzy_matches(tmp_path):
+    for name in ("GPD Win Mini 2024", "GPD Win 4", "Acer Swift Go", "Mini PC"):
+        write_config(tmp_path, name)
+    catalog = NBFCCatalog([str(tmp_path)], cache_path=None)
+    assert catalog.search("") == catalog.names()
+    # Prefix before later substring matches
+    assert catalog.search("gpd") == ["GPD Win 4", "GPD Win Mini 2024"]
+    assert catalog.search("mini") == ["Mini PC", "GPD Win Mini 2024"]
+    # Fuzzy, ignoring spaces and punctuation
+    assert catalog.search("winmini")[0] == "GPD Win Mini 2024"
+    assert catalog.search("xyz") == []
+
+
+def test_refresh_parses_only_changed_configs(tmp_path):
+    configs, cache = tmp_path / "configs", str(tmp_path / "cache.json")
+    configs.mkdir()
+    write_config(configs, "HP Victus 16", fans=2)
+    path = write_config(configs, "GPD Win 4")
+    catalog = NBFCCatalog([str(configs)], cache_path=cache)
+    assert catalog.entries["HP Victus 16"]["fan_count"] == 2
+    assert not catalog.refresh()
+
+    # A new catalog takes entries with unchanged mtimes from the cache,
+    # without parsing them again
+    mtime = os.stat(path).st_mtime
+    write_config(configs, "GPD Win 4", model="GPD WIN4", fans=2)
+    os.utime(path, (mtime, mtime))
+    cached = NBFCCatalog([str(configs)], cache_path=cache)
+    assert cached.entries["GPD Win 4"]["model"] == "GPD Win 4"
+
+    os.utime(path, (mtime + 1, mtime + 1))
+    write_config(configs, "Acer Swift Go")
+    os.remove(configs / "HP Victus 16.json")
+    assert catalog.refresh()
+    assert catalog.names() == ["Acer Swift Go", "GPD Win 4"]
+    assert catalog.entries["GPD Win 4"]["model"] == "GPD WIN4"
+    assert catalog.search("victus") == []
+
+
+def test_shared_catalog_is_not_rescanned_per_lookup(monkeypatch, tmp_path):
+    from src.app import nbfc_catalog
+
+    write_config(tmp_path, "GPD Win 4")
+    monkeypatch.setattr(
+        nbfc_catalog, "_catalog", NBFCCatalog([str(tmp_path)], cache_path=None)
+    )
+    scans = []
+    monkeypatch.setattr(os, "scandir", lambda *args: scans.append(args) or [])
+    for query in ("g", "gp", "gpd"):
+        nbfc_catalog.get_catalog().search(query)
+    assert scans == []
+
+
+def test_dmi_match_ranks_model_numbers_over_vendor(fake_hardware):
+    from src.app.nbfc_manager import NBFCManager
+
+    for name in ("GPD Win 4", "GPD Win Max 2", "GPD G1617-01", "HP Victus 16"):
+        fake_hardware.add_nbfc_config(name)
+    fake_hardware.set_dmi("GPD", "G1617-01", "G1617-01")
+    ranked = NBFCManager.get_recommended_candidates(fake_hardware.sysfs_root)
+    names = [name for name, _ in ranked]
+    assert names[0] == "GPD G1617-01"
+    assert "HP Victus 16" not in names
+    # Sharing only the vendor is not enough to be trusted
+    assert ranked[0][1] >= 0.5 > ranked[1][1]
+    assert (
+        NBFCManager.get_recommended_config(fake_hardware.sysfs_root)
+        == "GPD G1617-01"
+    )
+    assert fake_hardware.calls("pkexec") == []
+
+
+def test_unmatched_dmi_falls_back_to_nbfc(fake_hardware):
+    from src.app.nbfc_manager import NBFCManager
+
+    fake_hardware.add_nbfc_config("HP Victus 16")
+    fake_hardware.set_dmi("Micro-Star", "Modern 15", "MS-1552")
+    assert NBFCManager.get_recommended_candidates(fake_hardware.sysfs_root) == []
+    assert (
+        NBFCManager.get_recommended_config(fake_hardware.sysfs_root)
+        == "GPD Win Mini 2024"
+    )
+    assert fake_hardware.calls("nbfc")[-1] == ["config", "-r"]
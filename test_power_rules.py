@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for power source detection and the profile switching rules.
+Power supplies are simulated with a fake sysfs tree.
+"""
+
+import os
+
+from src.app.power_rules import read_ac_online, PowerRuleEngine
+
+
+def make_supply(root, name, supply_type, online=None):
+    supply = os.path.join(root, "class", "power_supply", name)
+    os.makedirs(supply, exist_ok=True)
+    with open(os.path.join(supply, "type"), "w") as f:
+        f.write(f"{supply_type}\n")
+    if online is not None:
+        with open(os.path.join(supply, "online"), "w") as f:
+            f.write(f"{online}\n")
+
+
+def test_read_ac_online(tmp_path):
+    root = str(tmp_path)
+    assert read_ac_online(root) is None
+
+    make_supply(root, "BAT0", "Battery")
+    make_supply(root, "ADP1", "Mains", online=0)
+    assert read_ac_online(root) is False
+
+    make_supply(root, "ucsi-source-psy-USBC000:001", "USB", online=1)
+    assert read_ac_online(root) is True
+
+
+def test_engine_waits_for_state_to_settle():
+    engine = PowerRuleEngine(settle_time=5, min_dwell=30)
+    assert engine.update(True, now=0) is None
+    assert engine.next_check(now=0) == 5
+    assert engine.update(True, now=4) is None
+    assert engine.update(True, now=5) == "ac"
+    assert engine.next_check(now=5) is None
+    # Repeated observations of the applied state are ignored
+    assert engine.update(True, now=100) is None
+
+
+def test_engine_ignores_flapping_charger():
+    engine = PowerRuleEngine(settle_time=5, min_dwell=30)
+    engine.update(False, now=0)
+    assert engine.update(False, now=5) == "battery"
+
+    # Charger bounces in and out faster than the settle time
+    for second in range(40, 50):
+        assert engine.update(second % 2 == 0, now=second) is None
+    assert engine.update(False, now=60) is None
+
+
+def test_engine_enforces_minimum_dwell():
+    engine = PowerRuleEngine(settle_time=1, min_dwell=30)
+    engine.update(True, now=0)
+    assert engine.update(True, now=1) == "ac"
+
+    engine.update(False, now=2)
+    assert engine.update(False, now=10) is None
+    assert engine.next_check(now=10) == 21
+    assert engine.update(False, now=31) == "battery"
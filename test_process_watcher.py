@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests of the application rules and the incremental process scan, run
+against a fake /proc.
+"""
+
+import os
+import re
+
+from src.app import process_watcher
+from src.app.process_watcher import ProcessRules, ProcessWatcher, required_literal
+
+# Far above any PID in use, so pidfd_open finds nothing to watch
+PID = 4190000
+
+
+def test_required_literal():
+    assert required_literal("steam_app_1234") == "steam_app_1234"
+    assert required_literal(r"Cyberpunk\s*2077\.exe") == "Cyberpunk"
+    assert required_literal(r"(game|other)\.exe$") == ".exe"
+    assert required_literal("colou?r") == "colo"
+    assert required_literal("[Ee]lden ?Ring") == "lden"
+    assert required_literal("factorio|minecraft") == ""
+    # Every match of the pattern contains its literal
+    for pattern, text in (
+        (r"Cyberpunk\s*2077\.exe", "Z:/games/Cyberpunk 2077.exe"),
+        ("[Ee]lden ?Ring", "eldenRing.exe"),
+        ("colou?r", "color"),
+    ):
+        match = re.search(pattern, text).group(0)
+        assert required_literal(pattern) in match
+
+
+def test_process_rules():
+    rules = ProcessRules(
+        [
+            {"name": "Gaming", "match-exe": ["Cyberpunk2077.exe"]},
+            {"name": "Bad", "match-cmdline": "("},
+            {"name": "Emulation", "match-cmdline": r"--rom\s+\S+\.iso"},
+            {"name": "Plain"},
+        ]
+    )
+    assert rules.match({"cyberpunk2077.exe"}, "") == "Gaming"
+    assert rules.match({"yuzu"}, "yuzu --rom /games/zelda.iso") == "Emulation"
+    assert rules.match({"yuzu"}, "yuzu --rom-dir /games") is None
+    assert not ProcessRules([{"name": "Plain"}])
+
+
+class FakeProfileManager:
+    def __init__(self):
+        self.applied = []
+
+    def current_settings(self):
+        return {"slow-limit": 15}
+
+    def apply_profile_by_name(self, name):
+        self.applied.append(name)
+        return True
+
+    def apply_settings(self, settings):
+        self.applied.append(settings)
+
+
+def start_process(proc_root, pid, comm, cmdline):
+    base = os.path.join(proc_root, str(pid))
+    os.makedirs(base)
+    with open(os.path.join(base, "comm"), "w") as f:
+        f.write(comm + "\n")
+    with open(os.path.join(base, "cmdline"), "wb") as f:
+        f.write(cmdline.replace(" ", "\0").encode() + b"\0")
+
+
+def stop_process(proc_root, pid):
+    base = os.path.join(proc_root, str(pid))
+    for name in os.listdir(base):
+        os.remove(os.path.join(base, name))
+    os.rmdir(base)
+
+
+def test_scan_only_reads_new_processes(qapp, tmp_path, monkeypatch):
+    proc_root = str(tmp_path)
+    for offset in range(20):
+        start_process(proc_root, PID + offset, "bash", "bash")
+    reads = []
+    read = process_watcher.read_process_identity
+    monkeypatch.setattr(
+        process_watcher,
+        "read_process_identity",
+        lambda pid, root: reads.append(pid) or read(pid, root),
+    )
+    manager = FakeProfileManager()
+    watcher = ProcessWatcher(manager, proc_root=proc_root)
+    watcher.set_profiles([{"name": "Gaming", "match-exe": ["game.exe"]}])
+    assert len(reads) == 20
+
+    start_process(proc_root, PID + 100, "game.exe", "Z:\\games\\game.exe")
+    watcher.scan()
+    assert reads[20:] == [PID + 100]
+    assert manager.applied == ["Gaming"]
+
+    stop_process(proc_root, PID + 100)
+    watcher.scan()
+    assert manager.applied == ["Gaming", {"slow-limit": 15}]
+    watcher.stop()
+
+
+def test_removed_rule_stops_applying(qapp, tmp_path):
+    proc_root = str(tmp_path)
+    start_process(proc_root, PID, "game.exe", "game.exe")
+    start_process(proc_root, PID + 1, "yuzu", "yuzu --rom zelda.iso")
+    manager = FakeProfileManager()
+    watcher = ProcessWatcher(manager, proc_root=proc_root)
+    gaming = {"name": "Gaming", "match-exe": ["game.exe"]}
+    emulation = {"name": "Emulation", "match-cmdline": r"\.iso"}
+    watcher.set_profiles([gaming, emulation])
+    assert watcher.active_profile == "Emulation"
+
+    # The later launch's rule goes away; the earlier match takes over
+    watcher.set_profiles([gaming])
+    assert watcher.matched == {PID: "Gaming"}
+    assert watcher.active_profile == "Gaming"
+
+    # Renamed rule: the running game switches to the new name
+    watcher.set_profiles([dict(gaming, name="Performance")])
+    assert watcher.active_profile == "Performance"
+
+    watcher.set_profiles([])
+    assert watcher.active_profile is None
+    assert manager.applied == [
+        "Emulation",
+        "Gaming",
+        "Performance",
+        {"slow-limit": 15},
+    ]
+    watcher.stop()
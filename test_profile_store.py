@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests of the mtime-indexed TDP profile store and its file watching.
+"""
+
+import json
+import os
+
+from fake_hardware import wait_for
+from src.app.profile_store import ProfileStore
+
+
+def write_profile(directory, file_name, **profile):
+    path = os.path.join(directory, file_name)
+    with open(path, "w") as f:
+        json.dump(profile, f)
+    return path
+
+
+def test_refresh_reparses_only_changed_files(tmp_path, monkeypatch):
+    write_profile(tmp_path, "a.json", name="Battery Saver", **{"slow-limit": 8})
+    path = write_profile(tmp_path, "b.json", name="Gaming", **{"slow-limit": 25})
+    store = ProfileStore(str(tmp_path), watch=False)
+    assert sorted(store.refresh()[0]) == ["Battery Saver", "Gaming"]
+    assert store.get("Gaming")["slow-limit"] == 25
+
+    parsed = []
+    parse = store._parse
+    monkeypatch.setattr(
+        store, "_parse", lambda name, path: parsed.append(name) or parse(name, path)
+    )
+    assert store.refresh() == ([], [], [])
+    assert parsed == []
+
+    write_profile(tmp_path, "b.json", name="Gaming", **{"slow-limit": 28})
+    os.utime(path, (1, 1))
+    assert store.refresh() == ([], [], ["Gaming"])
+    assert parsed == ["b.json"]
+    assert store.get("Gaming")["slow-limit"] == 28
+
+    # A renamed profile is reported as removed and added, under the new name
+    write_profile(tmp_path, "b.json", name="Turbo", **{"slow-limit": 28})
+    os.utime(path, (2, 2))
+    assert store.refresh() == (["Turbo"], ["Gaming"], [])
+    assert store.get("Gaming") is None
+    assert store.get("Turbo")["slow-limit"] == 28
+
+    os.remove(path)
+    assert store.refresh() == ([], ["Turbo"], [])
+    assert [profile["name"] for profile in store.profiles()] == ["Battery Saver"]
+
+
+def test_watcher_picks_up_external_changes(qapp, tmp_path):
+    store = ProfileStore(str(tmp_path))
+    store.refresh()
+    changes = []
+    store.profiles_changed.connect(lambda *change: changes.append(change))
+
+    write_profile(tmp_path, "quiet.json", name="Quiet", **{"slow-limit": 10})
+    assert wait_for(lambda: changes)
+    assert changes == [(["Quiet"], [], [])]
+    assert store.get("Quiet")["slow-limit"] == 10
+
+    os.remove(tmp_path / "quiet.json")
+    assert wait_for(lambda: len(changes) == 2)
+    assert changes[1] == ([], ["Quiet"], [])
+    assert store.get("Quiet") is None
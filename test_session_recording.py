@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests of session recording and replay against the fake hardware harness.
+"""
+
+import time
+
+from fake_hardware import wait_for
+from src.app import session_recording
+from src.app.energy import read_battery
+from src.app.sampler import Sampler, SysfsSensors
+from src.app.session_recording import SessionReplay
+from src.app.system_utils import TdpApplier, get_system_readings
+
+
+def test_replay_reproduces_recorded_readings(fake_hardware, tmp_path):
+    sampler = Sampler(sensors=SysfsSensors(fake_hardware.sysfs_root))
+    path = str(tmp_path / "session.jsonl")
+    session_recording.start_recording(path, sampler.sensors.paths())
+    recorded = []
+    try:
+        for temperature in (55.0, 71.5, 63.0):
+            fake_hardware.set_state(fan_speed=temperature - 20)
+            fake_hardware.set_temperature(temperature)
+            recorded.append((get_system_readings(), sampler.sample()["temperature"]))
+            time.sleep(0.05)
+    finally:
+        session_recording.stop_recording()
+
+    # Replayed on a machine without the sensors, with the hardware changed
+    fake_hardware.set_temperature(40.0)
+    calls = len(fake_hardware.calls())
+    replayed = Sampler(sensors=SysfsSensors(str(tmp_path / "elsewhere")))
+    replay = SessionReplay(path, speed=100)
+    replayed.sensors.use_paths(replay.context)
+    readings, samples, done = [], [], []
+    replay.finished.connect(lambda: done.append(True))
+    start = time.monotonic()
+    replay.start(
+        lambda: readings.append(get_system_readings()),
+        lambda: samples.append(replayed.sample()["temperature"]),
+    )
+    assert wait_for(lambda: done)
+    assert time.monotonic() - start < replay.duration()
+    assert list(zip(readings, samples)) == recorded
+    assert len(fake_hardware.calls()) == calls
+    assert session_recording.backend is None
+
+
+def test_replay_answers_applies_with_recorded_results(fake_hardware, tmp_path):
+    fake_hardware.script("ryzenadj", stderr="Unable to init SMU\n", exit_code=1)
+    path = str(tmp_path / "session.jsonl")
+    session_recording.start_recording(path)
+    results = []
+    try:
+        TdpApplier().apply({"slow-limit": 15}, lambda *result: results.append(result))
+        assert wait_for(lambda: results)
+    finally:
+        session_recording.stop_recording()
+
+    calls = len(fake_hardware.calls("pkexec"))
+    replay = SessionReplay(path, speed=100)
+    replay.start(lambda: None, lambda: None)
+    replayed = []
+    TdpApplier().apply({"slow-limit": 15}, lambda *result: replayed.append(result))
+    replay.stop()
+    assert replayed == results
+    assert "Unable to init SMU" in replayed[0][1]
+    assert len(fake_hardware.calls("pkexec")) == calls
+
+
+def test_replay_reads_the_recorded_battery(fake_hardware, tmp_path):
+    sampler = Sampler(sensors=SysfsSensors(fake_hardware.sysfs_root))
+    path = str(tmp_path / "session.jsonl")
+    session_recording.start_recording(path, sampler.sensors.paths())
+    recorded = []
+    try:
+        for energy in (40.0, 39.5):
+            fake_hardware.set_battery("Discharging", energy, 9.0)
+            sampler.sample()
+            recorded.append(read_battery(fake_hardware.sysfs_root))
+            time.sleep(0.05)
+    finally:
+        session_recording.stop_recording()
+
+    # The live battery is charging now; the replay still discharges
+    fake_hardware.set_battery("Charging", 20.0, 5.0)
+    replay = SessionReplay(path, speed=100)
+    batteries, done = [], []
+    replay.finished.connect(lambda: done.append(True))
+    replay.start(
+        lambda: None,
+        lambda: batteries.append(read_battery(fake_hardware.sysfs_root)),
+    )
+    assert wait_for(lambda: done)
+    assert batteries == recorded
+    assert batteries[0]["status"] == "Discharging"
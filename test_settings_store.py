@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests for write-behind settings persistence.
+"""
+
+from PyQt6.QtCore import QSettings
+
+from fake_hardware import wait_for
+from src.app.settings_store import SettingsStore
+
+
+def test_changes_are_batched_until_idle(qapp, tmp_path):
+    path = str(tmp_path / "settings.ini")
+    store = SettingsStore(QSettings(path, QSettings.Format.IniFormat), delay_ms=50)
+    for limit in (10, 12, 15):
+        store.set_value("tdp/fast_limit", limit)
+    store.set_value("fan/mode", "manual")
+
+    # Reads see pending values before anything is written
+    assert store.value("tdp/fast_limit", type=int) == 15
+    assert store.flushes == 0
+    assert wait_for(lambda: store.flushes == 1)
+
+    reread = QSettings(path, QSettings.Format.IniFormat)
+    assert reread.value("tdp/fast_limit", type=int) == 15
+    assert reread.value("fan/mode") == "manual"
+
+    store.flush()  # Nothing pending, so nothing written
+    assert store.flushes == 1
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for forwarding a second launch to the running instance.
+"""
+
+import os
+import socket
+import threading
+
+from PyQt6.QtCore import QDir
+
+from fake_hardware import wait_for
+from src.app.single_instance import InstanceServer, forward_to_running_instance
+
+
+def test_second_launch_is_forwarded(qapp, tmp_path):
+    name = f"rmc-test-{tmp_path.name}"
+    assert forward_to_running_instance([], name=name) is None
+
+    received = []
+
+    def handler(arguments):
+        received.append(arguments)
+        return "ok" if arguments == [] else "error: unknown"
+
+    server = InstanceServer(handler, name=name)
+    assert server.listen()
+    try:
+        replies = []
+        for arguments in ([], ["--apply-profile", "Missing"]):
+            # The launcher blocks, so it needs its own thread here
+            thread = threading.Thread(
+                target=lambda arguments=arguments: replies.append(
+                    forward_to_running_instance(arguments, name=name, timeout_ms=2000)
+                )
+            )
+            thread.start()
+            assert wait_for(lambda: not thread.is_alive())
+        assert replies == ["ok", "error: unknown"]
+        assert received == [[], ["--apply-profile", "Missing"]]
+    finally:
+        server.close()
+
+
+def test_racing_launch_does_not_take_over(qapp, tmp_path):
+    name = f"rmc-test-{tmp_path.name}"
+    first = InstanceServer(lambda arguments: "first", name=name)
+    assert first.listen()
+    second = InstanceServer(lambda arguments: "second", name=name)
+    try:
+        assert not second.listen()
+        replies = []
+        thread = threading.Thread(
+            target=lambda: replies.append(
+                forward_to_running_instance([], name=name, timeout_ms=2000)
+            )
+        )
+        thread.start()
+        assert wait_for(lambda: not thread.is_alive())
+        assert replies == ["first"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_stale_socket_is_taken_over(qapp, tmp_path):
+    name = f"rmc-test-{tmp_path.name}"
+    # A socket file left behind by a crashed instance
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(os.path.join(QDir.tempPath(), name))
+    stale.close()
+    server = InstanceServer(name=name)
+    try:
+        assert server.listen()
+    finally:
+        server.close()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for the compressed telemetry archive: round trip, range reads,
+compression ratio, refilling the rollups, truncated files and retention.
+"""
+
+import os
+import random
+
+import numpy as np
+
+from fake_hardware import wait_for
+from src.app.telemetry_archive import TelemetryArchive, _read_header
+from src.app.telemetry_history import TelemetryHistory, bucket_archive
+
+BASE = 1700000400  # A whole chunk, 22:20 UTC
+
+
+def record(archive, seconds, seed=1):
+    """Append a noisy 1 Hz trace; returns (times, temperatures, powers)."""
+    rng = random.Random(seed)
+    temperature, power = 60.0, 12.0
+    times, temperatures, powers = [], [], []
+    for i in range(seconds):
+        temperature = min(max(temperature + rng.gauss(0, 0.3), 40), 95)
+        power = max(3.0, power + rng.gauss(0, 0.5))
+        t = BASE + i + rng.uniform(-0.003, 0.003)
+        # k10temp reports in steps of 1/8 °C; fan speed has gaps
+        value = round(temperature * 8) / 8
+        archive.append(t, [value, power, None if i % 100 == 7 else 40.0])
+        times.append(t)
+        temperatures.append(value)
+        powers.append(power)
+    archive.flush()
+    return np.array(times), np.array(temperatures), np.array(powers)
+
+
+def test_round_trip_and_range_reads(tmp_path):
+    archive = TelemetryArchive(str(tmp_path))
+    times, temperatures, powers = record(archive, 3 * 3600)
+    # Chunks close every 10 minutes; the trace crosses midnight UTC
+    assert len(archive.files()) == 2
+
+    decoded, values = archive.read()
+    assert len(decoded) == len(times)
+    assert np.abs(decoded - times).max() <= 0.005
+    assert np.abs(values["temperature"] - temperatures).max() <= 0.05
+    assert np.abs(values["power"] - powers).max() <= 0.005
+    fan = values["fan_speed"]
+    assert np.isnan(fan[7]) and np.isnan(fan[107]) and fan[8] == 40.0
+
+    decoded, values = archive.read(BASE + 3600, BASE + 3660, names=("power",))
+    assert len(decoded) == 60 and list(values) == ["power"]
+    assert decoded[0] >= BASE + 3600 and decoded[-1] < BASE + 3660
+
+
+def test_archive_is_ten_times_smaller_than_raw(tmp_path):
+    archive = TelemetryArchive(str(tmp_path))
+    record(archive, 6 * 3600)
+    size = sum(os.path.getsize(path) for path in archive.files())
+    # Raw: an 8-byte timestamp and three 8-byte floats per sample
+    assert size * 10 < 6 * 3600 * 32
+
+
+def test_rollups_refilled_from_archive(tmp_path):
+    archive = TelemetryArchive(str(tmp_path))
+    times, temperatures, _ = record(archive, 3600)
+    history = TelemetryHistory()
+    history.load_buckets(bucket_archive(archive, history.layout(), now=BASE + 3600))
+
+    expected = TelemetryHistory(series=("temperature",))
+    for t, value in zip(times, np.round(temperatures * 10) / 10):
+        expected.add("temperature", t, value)
+    for start, end in ((BASE, BASE + 3600), (BASE + 600, BASE + 660)):
+        loaded = history.aggregate("temperature", start, end)
+        added = expected.aggregate("temperature", start, end)
+        assert loaded["count"] == added["count"]
+        assert loaded["max"] == added["max"]
+        assert abs(loaded["mean"] - added["mean"]) < 1e-6
+    # Live samples still go on top of the loaded buckets
+    history.add("temperature", BASE + 3599, 99.0)
+    assert history.aggregate("temperature", BASE, BASE + 3600)["max"] == 99.0
+
+
+def test_old_days_are_pruned(tmp_path):
+    archive = TelemetryArchive(str(tmp_path), retention_days=2)
+    for day in range(5):
+        archive.append(BASE + day * 86400, [50.0, 10.0, 30.0])
+        archive.flush()
+    archive.prune(now=BASE + 4 * 86400)
+    assert [os.path.basename(path) for path in archive.files()] == [
+        "2023-11-16.rmca",
+        "2023-11-17.rmca",
+        "2023-11-18.rmca",
+    ]
+
+
+def test_truncated_last_block_is_skipped(qapp, tmp_path):
+    archive = TelemetryArchive(str(tmp_path))
+    times, _, _ = record(archive, 3600)
+    (path,) = archive.files()
+    with open(path, "rb") as f:
+        data = f.read()
+    # Where the last block and its column data start
+    with open(path, "rb") as f:
+        while True:
+            last = f.tell()
+            header = _read_header(f)
+            data_start = f.tell()
+            f.seek(sum(column[4] for column in header[3]), os.SEEK_CUR)
+            if f.tell() == len(data):
+                break
+    complete = np.count_nonzero(times < BASE + 3000)
+
+    # A crash can cut the last block anywhere: in its header, in a column
+    # name or header, or in the compressed data
+    for cut in list(range(last + 1, data_start + 1)) + list(
+        range(data_start + 1, len(data), 17)
+    ):
+        with open(path, "wb") as f:
+            f.write(data[:cut])
+        decoded, _ = archive.read()
+        assert len(decoded) == complete
+
+    history = TelemetryHistory()
+    loaded = []
+    history.load_archive_async(archive, lambda: loaded.append(True))
+    assert wait_for(lambda: loaded)
+    assert history.pending_load is None
+
+
+def test_appending_after_a_truncated_block(tmp_path):
+    archive = TelemetryArchive(str(tmp_path))
+    times, _, _ = record(archive, 1800)
+    complete = np.count_nonzero(times < BASE + 1200)
+    (path,) = archive.files()
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, os.SEEK_END) - 20)
+
+    # A new process appends to the same day file
+    archive = TelemetryArchive(str(tmp_path))
+    for i in range(600):
+        archive.append(BASE + 1800 + i, [50.0, 10.0, 30.0])
+    archive.flush()
+    decoded, values = archive.read()
+    # The two complete blocks and the new one, without the cut block
+    assert len(decoded) == complete + 600
+    assert np.abs(decoded[:complete] - times[:complete]).max() <= 0.005
+    assert np.all(values["temperature"][-600:] == 50.0)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the telemetry exports: range export formats, the binary round
+trip, the background export and the live log.
+"""
+
+import json
+
+from fake_hardware import wait_for
+from src.app.fan_curve_simulator import load_temperature_csv
+from src.app.sampler import Sampler
+from src.app.telemetry_export import (
+    export_range,
+    export_range_async,
+    LiveExport,
+    read_binary,
+)
+from src.app.telemetry_history import TelemetryHistory
+
+BASE = 1700000040  # A whole minute
+
+
+def make_history(seconds, interval=5):
+    history = TelemetryHistory()
+    for t in range(0, seconds, interval):
+        history.add("temperature", BASE + t, 50.0 + (t // 60) % 40)
+        history.add("power", BASE + t, 10.0 + t % 7)
+    return history
+
+
+def test_csv_export_loads_as_temperature_trace(tmp_path):
+    history = make_history(600)
+    path = tmp_path / "history.csv"
+    assert export_range(history, str(path), BASE, BASE + 600, 60) == 10
+
+    times, temps = load_temperature_csv(str(path))
+    assert list(temps) == [50.0 + i for i in range(10)]
+    assert times[1] - times[0] == 60
+    # No fan speed was recorded, so its columns are empty
+    assert path.read_text().splitlines()[1].split(",")[4:7] == ["", "", ""]
+
+
+def test_binary_round_trip_is_compact(tmp_path):
+    history = make_history(86400, interval=10)
+    start, end = BASE, BASE + 86400
+    binary, jsonl = tmp_path / "history.rmct", tmp_path / "history.jsonl"
+    assert export_range(history, str(binary), start, end, 60) == 1440
+    export_range(history, str(jsonl), start, end, 60)
+
+    with open(jsonl) as f:
+        expected = [json.loads(line) for line in f]
+    decoded = list(read_binary(str(binary)))
+    assert len(decoded) == len(expected)
+    for (window, values), record in zip(decoded, expected):
+        assert window == record["time"]
+        assert set(values) == {"temperature", "power"}
+        low, high, mean = values["power"]
+        assert abs(mean - record["power"]["mean"]) <= 0.005
+        assert (low, high) == (record["power"]["min"], record["power"]["max"])
+    assert binary.stat().st_size * 10 < jsonl.stat().st_size
+
+
+def test_async_export_reports_back(qapp, tmp_path):
+    history = make_history(3600)
+    results = []
+    export_range_async(
+        history,
+        str(tmp_path / "history.jsonl"),
+        BASE,
+        BASE + 3600,
+        10,
+        lambda *result: results.append(result),
+    )
+    assert wait_for(lambda: results)
+    assert results == [(str(tmp_path / "history.jsonl"), 360, "")]
+
+    export_range_async(
+        history,
+        str(tmp_path / "missing" / "history.csv"),
+        BASE,
+        BASE + 3600,
+        10,
+        lambda *result: results.append(result),
+    )
+    assert wait_for(lambda: len(results) == 2)
+    assert results[1][1] == 0 and "No such file" in results[1][2]
+
+
+class FakeSensors:
+    def read_temperature(self):
+        return 61.5
+
+    def read_power(self):
+        return None
+
+
+def test_live_log_appends_samples(qapp, tmp_path):
+    sampler = Sampler(sensors=FakeSensors())
+    path = tmp_path / "log" / "telemetry.csv"
+    for _ in range(2):  # A restart appends without a second header
+        export = LiveExport(sampler, str(path), "csv")
+        export.start()
+        for _ in range(3):
+            sampler.sample()
+        export.stop()
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == "time,temperature,power,fan_speed"
+    assert len(lines) == 7
+    assert lines[1].split(",")[1:] == ["61.5", "", ""]
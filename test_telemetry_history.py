@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the rollup history: range aggregates against a brute-force scan,
+and ring wrap-around.
+"""
+
+import random
+
+from src.app.telemetry_history import RollupLevel, TelemetryHistory
+
+
+def scan(samples, start, end):
+    values = [value for t, value in samples if start <= t < end]
+    if not values:
+        return None
+    return min(values), max(values), sum(values) / len(values)
+
+
+def test_range_aggregates_match_raw_samples():
+    rng = random.Random(7)
+    history = TelemetryHistory(series=("temperature",))
+    samples = [(t * 2.0, rng.uniform(40, 95)) for t in range(3 * 3600)]
+    for t, value in samples:
+        history.add("temperature", t, value)
+
+    for _ in range(50):
+        # Whole minutes, so the rollups answer exactly
+        start = rng.randrange(0, 170) * 60
+        end = start + rng.randrange(1, 10) * 600
+        result = history.aggregate("temperature", start, end)
+        low, high, mean = scan(samples, start, end)
+        assert (result["min"], result["max"]) == (low, high)
+        assert abs(result["mean"] - mean) < 1e-9
+
+    rows = history.series_range("temperature", 3600, 7200, 60)
+    assert len(rows) == 60
+    assert rows[5][2] == scan(samples, 3900, 3960)[1]
+
+
+def test_ring_forgets_buckets_it_wrapped_over():
+    level = RollupLevel(10, 8)
+    level.add(0, 90.0)
+    level.add(75, 50.0)
+    # Bucket 0 is still in the ring (buckets 0..7)
+    assert level.query(0, 80) == (50.0, 90.0, 140.0, 2)
+    level.add(85, 55.0)  # Bucket 8 reuses bucket 0's slot
+    assert level.query(0, 90) == (50.0, 55.0, 105.0, 2)
+    assert not level.add(0, 99.0)
+    # A long gap empties everything
+    level.add(10000, 60.0)
+    assert level.query(0, 10010) == (60.0, 60.0, 60.0, 1)
+
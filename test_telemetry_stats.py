@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming quantile, windowed max and mean statistics.
+"""
+
+import random
+
+from src.app.telemetry_stats import P2Quantile, SeriesStats, WindowedQuantile
+
+
+def test_p2_quantile_tracks_exact_quantile():
+    rng = random.Random(42)
+    values = [rng.gauss(65, 8) for _ in range(20000)]
+    estimators = {p: P2Quantile(p) for p in (0.5, 0.95)}
+    for value in values:
+        for estimator in estimators.values():
+            estimator.add(value)
+    values.sort()
+    for p, estimator in estimators.items():
+        exact = values[int(p * (len(values) - 1))]
+        assert abs(estimator.value() - exact) < 0.5
+
+
+def test_windowed_statistics_forget_old_samples():
+    stats = SeriesStats(window=100)
+    values = [90.0] * 100 + [50.0 + t % 3 for t in range(100, 300)]
+    # A hot first window, then two cool ones
+    for t, value in enumerate(values):
+        stats.add(t, value)
+
+    summary = stats.summary()
+    assert summary["max"] == 52.0
+    assert 50.0 <= summary["p95"] <= 52.0
+    assert abs(summary["mean"] - sum(values) / len(values)) < 1e-9
+    # The moving mean has mostly caught up; the session mean has not
+    assert abs(summary["ewma"] - 51.0) < 2.0 < summary["mean"] - 51.0
+
+
+def test_windowed_quantile_covers_half_to_full_window():
+    quantile = WindowedQuantile(0.5, window=10)
+    for t in range(25):
+        quantile.add(t, float(t))
+    # Answered from the sketch started at t=15: median of 15..24
+    assert 19 <= quantile.value() <= 20
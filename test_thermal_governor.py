@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the thermal governor against a simulated APU.
+The plant is first order: temperature relaxes towards
+ambient + thermal resistance * power with a time constant, and the package
+draws what the workload asks for up to the applied slow-limit.
+"""
+
+from src.app.thermal_governor import ThermalGovernor
+
+
+def simulate(
+    governor,
+    demand,
+    ambient=30.0,
+    resistance=2.5,
+    time_constant=20.0,
+    duration=600.0,
+    dt=0.5,
+):
+    """Run the closed loop and return (temperatures, applied limits)."""
+    temperature = ambient
+    limit = governor.applied_limit
+    temperatures, limits = [], []
+    now = 0.0
+    while now < duration:
+        power = min(demand, limit)
+        steady = ambient + resistance * power
+        temperature += (steady - temperature) * dt / time_constant
+        new_limit = governor.step(temperature, power, now)
+        if new_limit is not None:
+            limit = new_limit
+            limits.append(new_limit)
+        temperatures.append(temperature)
+        now += dt
+    return temperatures, limits
+
+
+def test_holds_target_under_sustained_load():
+    governor = ThermalGovernor(75, min_limit=5, max_limit=30, start_limit=25)
+    temperatures, limits = simulate(governor, demand=30)
+
+    settled = temperatures[-400:]  # Last 200 s
+    assert max(abs(t - 75) for t in settled) < 1.5
+    # 75 °C at 2.5 °C/W over 30 °C ambient is 18 W
+    assert abs(governor.applied_limit - 18) <= 1
+    assert all(5 <= limit <= 30 for limit in limits)
+    # Few ryzenadj calls for 10 minutes of 2 Hz samples
+    assert len(limits) < 40
+
+
+def test_raises_limit_in_a_cool_room():
+    governor = ThermalGovernor(75, min_limit=5, max_limit=30, start_limit=15)
+    temperatures, _ = simulate(governor, demand=30, ambient=10)
+
+    assert governor.applied_limit > 15
+    assert abs(temperatures[-1] - 75) < 1.5
+
+
+def test_respects_bounds():
+    governor = ThermalGovernor(60, min_limit=12, max_limit=30, start_limit=25)
+    temperatures, limits = simulate(governor, demand=30, ambient=40)
+
+    # Even the minimum limit runs hotter than 60 °C here
+    assert governor.applied_limit == 12
+    assert min(limits) == 12
+
+
+def test_does_not_wind_up_on_light_load():
+    governor = ThermalGovernor(75, min_limit=5, max_limit=30, start_limit=15)
+    _, limits = simulate(governor, demand=8)
+
+    # Power never reaches the limit, so raising it would achieve nothing
+    assert limits == []
+    assert governor.applied_limit == 15
+
+
+def test_skips_missing_temperature():
+    governor = ThermalGovernor(75, min_limit=5, max_limit=30, start_limit=20)
+    assert governor.step(None, 20, now=0) is None
+    assert governor.step(90, 20, now=0.5) is None  # First real sample
+    assert governor.step(None, 20, now=1.0) is None
+
+
+def test_profile_saves_fractional_target(fake_hardware, tmp_path, monkeypatch):
+    import json
+
+    from PyQt6.QtWidgets import QInputDialog, QVBoxLayout, QWidget
+    from fake_hardware import wait_for
+    from src.app.profile_manager import ProfileManager
+
+    parent = QWidget()
+    QVBoxLayout(parent)
+    manager = ProfileManager()
+    manager.create_widgets(parent)
+    manager.profiles_directory = str(tmp_path)
+    monkeypatch.setattr(QInputDialog, "getText", lambda *args: ("Warm", True))
+    manager.fast_limit_entry.setText("30")
+    manager.slow_limit_entry.setText("20")
+    manager.governor_var.setEnabled(True)
+    manager.governor_var.setChecked(True)
+    manager.governor_target_entry.setText("80.5")
+    manager.save_profile()
+    path = tmp_path / "Warm.json"
+    assert wait_for(path.exists)
+    assert json.loads(path.read_text())["governor-target-temp"] == 80.5
+
+    # Bad input is reported instead of raising from the slot
+    path.unlink()
+    manager.governor_target_entry.setText("hot")
+    manager.save_profile()
+    assert "Target temperature must be a number" in manager.apply_status_label.text()
+    assert not path.exists()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for span tracing and the Chrome trace export.
+"""
+
+import json
+
+from fake_hardware import wait_for
+from src.app import tracing
+from src.app.system_utils import apply_tdp_settings
+
+
+def test_disabled_tracing_records_nothing():
+    tracing.disable()
+    tracing.clear()
+    with tracing.span("ignored"):
+        pass
+    assert len(tracing._events) == 0
+
+
+def test_ring_buffer_keeps_latest_spans():
+    tracing.enable(capacity=3)
+    tracing.clear()
+    try:
+        for i in range(5):
+            with tracing.span(f"span {i}"):
+                pass
+        assert [event[0] for event in tracing._events] == [
+            "span 2",
+            "span 3",
+            "span 4",
+        ]
+    finally:
+        tracing.disable()
+        tracing.enable(capacity=tracing.DEFAULT_CAPACITY)
+        tracing.disable()
+
+
+def test_process_spans_exported(fake_hardware, tmp_path):
+    fake_hardware.delay("ryzenadj", 0.1)
+    tracing.enable()
+    tracing.clear()
+    try:
+        done = []
+        apply_tdp_settings(
+            {"slow-limit": 15}, lambda success, message: done.append(success)
+        )
+        assert wait_for(lambda: done)
+    finally:
+        tracing.disable()
+
+    path = tmp_path / "trace.json"
+    assert tracing.export_chrome_trace(str(path)) == 2
+    with open(path) as f:
+        events = [e for e in json.load(f)["traceEvents"] if e["ph"] == "X"]
+    by_name = {event["name"]: event for event in events}
+    assert by_name["pkexec ryzenadj"]["tid"] == tracing.PROCESS_TRACK
+    # The process span covers the scripted latency; the call itself does not
+    assert by_name["pkexec ryzenadj"]["dur"] >= 100000
+    assert by_name["apply_tdp_settings"]["dur"] < by_name["pkexec ryzenadj"]["dur"]